@@ -24,6 +24,7 @@ from PySide.QtGui import QApplication, QSplashScreen, QPixmap
 import logging
 
 from ceed import version
+from ceed import startupprofile
 
 class SplashScreen(QSplashScreen):
     def __init__(self):
@@ -53,8 +54,9 @@ class Application(QApplication):
 
             # in case we are in the developer's mode,
             # lets compile all UI files to ensure they are up to date
-            from ceed import compileuifiles
-            compileuifiles.main()
+            with startupprofile.phase("Compiling .ui files"):
+                from ceed import compileuifiles
+                compileuifiles.main()
 
             logging.debug("All .ui files recompiled!")
 
@@ -79,9 +81,11 @@ class Application(QApplication):
 
         # (we potentially have to compile all UI files first before this is imported,
         # otherwise out of date compiled .py layouts might be used!)
-        from ceed import mainwindow
+        with startupprofile.phase("Importing the main window"):
+            from ceed import mainwindow
 
-        self.mainWindow = mainwindow.MainWindow(self)
+        with startupprofile.phase("MainWindow.__init__"):
+            self.mainWindow = mainwindow.MainWindow(self)
         self.mainWindow.show()
         self.mainWindow.raise_()
         if showSplash:
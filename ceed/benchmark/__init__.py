@@ -0,0 +1,113 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+
+"""Benchmarking helpers shared by the benchmark suites in this package.
+
+Suites time operations with measure, collect the results in a Report
+and write it out as JSON so that runs can be compared over time (in CI
+for example).
+"""
+
+# NOTE: Suites should be runnable headless, this package must not depend on
+#       PySide or PyCEGUI by itself!
+
+import json
+import platform
+import timeit
+import sys
+
+def measure(function, repeat = 3):
+    """Calls function repeat times and returns the durations in seconds"""
+
+    ret = []
+    for _ in xrange(repeat):
+        start = timeit.default_timer()
+        function()
+        ret.append(timeit.default_timer() - start)
+
+    return ret
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+
+    if len(values) % 2 == 1:
+        return values[middle]
+
+    return (values[middle - 1] + values[middle]) / 2.0
+
+class Report(object):
+    """Results of one benchmark run"""
+
+    def __init__(self, suite):
+        self.suite = suite
+        self.environment = {
+            "python": sys.version.split(" ", 1)[0],
+            "platform": platform.platform()
+        }
+        self.parameters = {}
+        self.results = []
+
+    def addTiming(self, name, durations, bytes_ = 0, elements = 0, **extra):
+        """Adds timing of one operation, throughput is computed from the best
+        duration. Extra keyword arguments are stored in the result verbatim.
+        """
+
+        best = min(durations)
+
+        result = {
+            "name": name,
+            "repeat": len(durations),
+            "best": best,
+            "median": median(durations),
+            "bytes": bytes_,
+            "elements": elements,
+            "MBps": bytes_ / best / 1000000.0 if best > 0 else None,
+            "elementsPerSecond": elements / best if best > 0 else None
+        }
+        result.update(extra)
+
+        self.results.append(result)
+        return result
+
+    def addError(self, name, error, **extra):
+        """Records that an operation failed, the run carries on with other operations"""
+
+        result = {
+            "name": name,
+            "error": "%s: %s" % (error.__class__.__name__, error)
+        }
+        result.update(extra)
+
+        self.results.append(result)
+        return result
+
+    def toDict(self):
+        return {
+            "suite": self.suite,
+            "environment": self.environment,
+            "parameters": self.parameters,
+            "results": self.results
+        }
+
+    def write(self, outputFile):
+        json.dump(self.toDict(), outputFile, indent = 4, sort_keys = True)
+        outputFile.write("\n")
@@ -0,0 +1,454 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+
+"""Performance benchmark of the compatibility layers on generated documents.
+
+Generates synthetic layouts, looknfeels, imagesets and schemes in CEGUI 0.7
+formats, derives the other formats from them and times type guessing, every
+layer in every direction (tree based and streamed where supported) and all
+multi-step Manager.transform chains.
+
+Run it with:
+ python -m ceed.benchmark.compatibility --scale 0.1 --output results.json
+"""
+
+from ceed import benchmark
+from ceed import xmlbackend
+from ceed import compatibility
+from ceed.compatibility import ceguihelpers
+
+from io import BytesIO
+import argparse
+import sys
+import logging
+
+# window types are chosen so that all the special cases of property migration get hit
+LAYOUT_WINDOW_TYPES = [
+    "TaharezLook/FrameWindow",
+    "TaharezLook/Button",
+    "TaharezLook/StaticImage",
+    "TaharezLook/ImageButton",
+    "TaharezLook/Editbox",
+    "TaharezLook/ListHeaderSegment",
+    "DefaultWindow"
+]
+
+# (name, value) of properties as they appear in 0.7 layouts
+LAYOUT_PROPERTIES = [
+    ("UnifiedAreaRect", "{{0.1,0},{0.1,0},{0.9,0},{0.9,0}}"),
+    ("UnifiedMinSize", "{{0,10},{0,10}}"),
+    ("UnifiedMaxSize", "{{1,0},{1,0}}"),
+    ("Text", "Generated text"),
+    ("Tooltip", "Generated tooltip"),
+    ("RiseOnClick", "False"),
+    ("ZOrderChangeEnabled", "True"),
+    ("MouseButtonDownAutoRepeat", "False"),
+    ("Alpha", "0.8"),
+    ("Visible", "True"),
+    ("Image", "set:TaharezLook image:ClientBrush"),
+    ("NormalImage", "set:TaharezLook image:ButtonLeftNormal"),
+    ("HoverImage", "set:TaharezLook image:ButtonLeftHighlight"),
+    ("PushedImage", "set:TaharezLook image:ButtonLeftPushed"),
+    ("NSSizingCursorImage", "set:TaharezLook image:MouseNoSoCursor"),
+    ("MovingCursorImage", "set:TaharezLook image:MouseMoveCursor")
+]
+
+def generateLayout(depth = 6, fanOut = 5, propertiesPerWindow = 8):
+    """Generates a CEGUI 0.7 layout (CEGUI layout 3) with a full window tree
+    of given depth and fan out, returns it as string.
+    """
+
+    root = xmlbackend.Element("GUILayout")
+
+    counter = [0]
+    def createWindow(parent, parentName, level):
+        index = counter[0]
+        counter[0] += 1
+
+        name = "Window%i" % (index) if parentName is None else "%s/Window%i" % (parentName, index)
+
+        window = xmlbackend.SubElement(parent, "Window")
+        window.set("Type", LAYOUT_WINDOW_TYPES[index % len(LAYOUT_WINDOW_TYPES)])
+        window.set("Name", name)
+
+        for i in xrange(propertiesPerWindow):
+            propertyName, propertyValue = LAYOUT_PROPERTIES[(index + i) % len(LAYOUT_PROPERTIES)]
+
+            property_ = xmlbackend.SubElement(window, "Property")
+            property_.set("Name", propertyName)
+            property_.set("Value", propertyValue)
+
+        if index % 7 == 0:
+            event = xmlbackend.SubElement(window, "Event")
+            event.set("Name", "Clicked")
+            event.set("Function", "onClicked%i" % (index))
+
+        if index % 11 == 0:
+            autoWindow = xmlbackend.SubElement(window, "AutoWindow")
+            autoWindow.set("NameSuffix", "__auto_titlebar__")
+
+            property_ = xmlbackend.SubElement(autoWindow, "Property")
+            property_.set("Name", "Text")
+            property_.set("Value", "Auto window text")
+
+        if level < depth:
+            for _ in xrange(fanOut):
+                createWindow(window, name, level + 1)
+
+    createWindow(root, None, 1)
+
+    return ceguihelpers.prettyPrintXMLElement(root)
+
+def _createDim(parent, type_, index):
+    dim = xmlbackend.SubElement(parent, "Dim")
+    dim.set("type", type_)
+
+    absoluteDim = xmlbackend.SubElement(dim, "AbsoluteDim")
+    absoluteDim.set("value", str(index % 13))
+
+    if index % 3 == 0:
+        # a DimOperator tail tree, these get restructured by the 6 -> 7 layer
+        dimOperator = xmlbackend.SubElement(absoluteDim, "DimOperator")
+        dimOperator.set("op", "Add")
+
+        imageDim = xmlbackend.SubElement(dimOperator, "ImageDim")
+        imageDim.set("imageset", "TaharezLook")
+        imageDim.set("image", "Image%i" % (index))
+        imageDim.set("dimension", "Width")
+
+def _createArea(parent, index):
+    area = xmlbackend.SubElement(parent, "Area")
+    for i, type_ in enumerate(["LeftEdge", "TopEdge", "RightEdge", "BottomEdge"]):
+        _createDim(area, type_, index + i)
+
+def generateLookNFeel(widgetLookCount = 300, childrenPerWidgetLook = 4, sectionsPerWidgetLook = 6):
+    """Generates a CEGUI 0.7 looknfeel (CEGUI looknfeel 6) with given number
+    of WidgetLooks, returns it as string.
+    """
+
+    root = xmlbackend.Element("Falagard")
+
+    for index in xrange(widgetLookCount):
+        widgetLook = xmlbackend.SubElement(root, "WidgetLook")
+        widgetLook.set("name", "%s%i" % (LAYOUT_WINDOW_TYPES[index % len(LAYOUT_WINDOW_TYPES)], index))
+
+        propertyDefinition = xmlbackend.SubElement(widgetLook, "PropertyDefinition")
+        propertyDefinition.set("name", "GeneratedColour")
+        propertyDefinition.set("initialValue", "FFFFFFFF")
+        propertyDefinition.set("redrawOnWrite", "true")
+
+        for i in xrange(4):
+            propertyName, propertyValue = LAYOUT_PROPERTIES[(index + i) % len(LAYOUT_PROPERTIES)]
+
+            property_ = xmlbackend.SubElement(widgetLook, "Property")
+            property_.set("name", propertyName)
+            property_.set("value", propertyValue)
+
+        for i in xrange(childrenPerWidgetLook):
+            child = xmlbackend.SubElement(widgetLook, "Child")
+            child.set("type", LAYOUT_WINDOW_TYPES[(index + i) % len(LAYOUT_WINDOW_TYPES)])
+            child.set("nameSuffix", "__auto_child%i__" % (i))
+
+            _createArea(child, index + i)
+
+            property_ = xmlbackend.SubElement(child, "Property")
+            property_.set("name", "UnifiedAreaRect" if i % 2 == 0 else "Tooltip")
+            property_.set("value", "{{0,0},{0,0},{1,0},{1,0}}")
+
+        for i in xrange(sectionsPerWidgetLook):
+            imagerySection = xmlbackend.SubElement(widgetLook, "ImagerySection")
+            imagerySection.set("name", "Carat" if i == 0 else "Section%i" % (i))
+
+            imageryComponent = xmlbackend.SubElement(imagerySection, "ImageryComponent")
+            _createArea(imageryComponent, index + i)
+
+            image = xmlbackend.SubElement(imageryComponent, "Image")
+            image.set("imageset", "TaharezLook")
+            image.set("image", "Image%i" % (i))
+
+            frameComponent = xmlbackend.SubElement(imagerySection, "FrameComponent")
+            _createArea(frameComponent, index + i + 1)
+            for type_ in ["LeftEdge", "RightEdge", "Background"]:
+                image = xmlbackend.SubElement(frameComponent, "Image")
+                image.set("type", type_)
+                image.set("imageset", "TaharezLook")
+                image.set("image", "Frame%s" % (type_))
+
+        stateImagery = xmlbackend.SubElement(widgetLook, "StateImagery")
+        stateImagery.set("name", "Enabled")
+        layer = xmlbackend.SubElement(stateImagery, "Layer")
+        for i in xrange(sectionsPerWidgetLook):
+            section = xmlbackend.SubElement(layer, "Section")
+            section.set("section", "Section%i" % (i))
+
+    return ceguihelpers.prettyPrintXMLElement(root)
+
+def generateImageset(imageCount = 20000):
+    """Generates a CEGUI 0.7 imageset (CEGUI imageset 1) with given number
+    of images, returns it as string.
+    """
+
+    root = xmlbackend.Element("Imageset")
+    root.set("Name", "Generated")
+    root.set("Imagefile", "Generated.png")
+    root.set("NativeHorzRes", "1024")
+    root.set("NativeVertRes", "768")
+    root.set("AutoScaled", "false")
+
+    for index in xrange(imageCount):
+        image = xmlbackend.SubElement(root, "Image")
+        image.set("Name", "Image%i" % (index))
+        image.set("XPos", str((index * 16) % 4096))
+        image.set("YPos", str(((index * 16) // 4096) * 16))
+        image.set("Width", "16")
+        image.set("Height", "16")
+
+    return ceguihelpers.prettyPrintXMLElement(root)
+
+def generateScheme(mappingCount = 500):
+    """Generates a CEGUI 0.7 scheme (CEGUI scheme 4) with given number
+    of falagard mappings, returns it as string.
+    """
+
+    root = xmlbackend.Element("GUIScheme")
+    root.set("Name", "Generated")
+
+    imageset = xmlbackend.SubElement(root, "Imageset")
+    imageset.set("Name", "Generated")
+    imageset.set("Filename", "Generated.imageset")
+
+    font = xmlbackend.SubElement(root, "Font")
+    font.set("Name", "DejaVuSans-10")
+    font.set("Filename", "DejaVuSans-10.font")
+
+    looknfeel = xmlbackend.SubElement(root, "LookNFeel")
+    looknfeel.set("Filename", "Generated.looknfeel")
+
+    windowRendererSet = xmlbackend.SubElement(root, "WindowRendererSet")
+    windowRendererSet.set("Filename", "CEGUIFalagardWRBase")
+
+    for index in xrange(mappingCount):
+        windowType = "Generated/Widget%i" % (index)
+
+        if index % 5 == 0:
+            windowAlias = xmlbackend.SubElement(root, "WindowAlias")
+            windowAlias.set("Alias", "%sAlias" % (windowType))
+            windowAlias.set("Target", "CEGUI/Checkbox")
+
+        falagardMapping = xmlbackend.SubElement(root, "FalagardMapping")
+        falagardMapping.set("WindowType", windowType)
+        falagardMapping.set("TargetType", "CEGUI/Checkbox" if index % 3 == 0 else "CEGUI/PushButton")
+        falagardMapping.set("Renderer", "Falagard/SystemButton" if index % 4 == 0 else "Falagard/Button")
+        falagardMapping.set("LookNFeel", windowType)
+
+    return ceguihelpers.prettyPrintXMLElement(root)
+
+def countElements(data):
+    """Returns the number of elements in given XML data, 0 if it isn't XML"""
+
+    if not data.lstrip().startswith("<"):
+        return 0
+
+    return data.count("<") - data.count("</") - data.count("<?") - data.count("<!")
+
+class Suite(object):
+    """Runs the benchmark for all categories and collects the results in a Report"""
+
+    def __init__(self, scale = 1.0, repeat = 3, stream = True):
+        self.scale = scale
+        self.repeat = repeat
+        self.stream = stream
+
+        self.report = benchmark.Report("compatibility")
+        self.report.environment["xmlBackend"] = xmlbackend.backend
+        self.report.parameters["scale"] = scale
+        self.report.parameters["repeat"] = repeat
+
+    def scaled(self, count):
+        return max(1, int(round(count * self.scale)))
+
+    def generateDocuments(self):
+        """Returns list of (category, manager, type, data) of all
+        generated source documents
+        """
+
+        from ceed.compatibility import layout as layout_compat
+        from ceed.compatibility import looknfeel as looknfeel_compat
+        from ceed.compatibility import imageset as imageset_compat
+        from ceed.compatibility import scheme as scheme_compat
+
+        # the window count grows exponentially with depth, scale the fan out instead
+        layoutFanOut = max(1, int(round(5 * self.scale ** (1.0 / 5))))
+
+        return [
+            ("layout", layout_compat.manager, layout_compat.cegui.CEGUILayout3, generateLayout(depth = 6, fanOut = layoutFanOut)),
+            ("looknfeel", looknfeel_compat.manager, looknfeel_compat.cegui.CEGUILookNFeel6, generateLookNFeel(self.scaled(300))),
+            ("imageset", imageset_compat.manager, imageset_compat.cegui.CEGUIImageset1, generateImageset(self.scaled(20000))),
+            ("scheme", scheme_compat.manager, scheme_compat.cegui.CEGUIScheme4, generateScheme(self.scaled(500)))
+        ]
+
+    def deriveDocuments(self, manager, sourceType, data):
+        """Converts given data to all types reachable from sourceType,
+        returns a dict mapping type to data
+        """
+
+        ret = {sourceType: data}
+
+        pending = [sourceType]
+        while len(pending) > 0:
+            type_ = pending.pop()
+
+            for layer in manager.layers:
+                if layer.getSourceType() != type_ or layer.getTargetType() in ret:
+                    continue
+
+                try:
+                    ret[layer.getTargetType()] = layer.transform(ret[type_])
+                    pending.append(layer.getTargetType())
+
+                except Exception as e:
+                    logging.warning("Can't derive '%s' from '%s': %s", layer.getTargetType(), type_, e)
+
+        return ret
+
+    def timeGuessType(self, category, manager, type_, data):
+        extension = ""
+        for detector in manager.detectors:
+            if detector.getType() == type_:
+                extension = sorted(detector.getPossibleExtensions())[0]
+
+        result = {"value": None}
+        def guess():
+            try:
+                result["value"] = manager.guessType(data, "generated.%s" % (extension))
+            except compatibility.MultiplePossibleTypesError as e:
+                result["value"] = e.possibleTypes
+            except compatibility.NoPossibleTypesError:
+                result["value"] = []
+
+        durations = benchmark.measure(guess, self.repeat)
+        self.report.addTiming("guessType", durations, len(data), countElements(data),
+                              category = category, source = type_, guessed = result["value"])
+
+    def timeLayer(self, category, layer, data):
+        sourceType = layer.getSourceType()
+        targetType = layer.getTargetType()
+
+        output = {"value": ""}
+        def transform():
+            output["value"] = layer.transform(data)
+
+        try:
+            durations = benchmark.measure(transform, self.repeat)
+
+        except Exception as e:
+            self.report.addError("layer", e, category = category, source = sourceType, target = targetType,
+                                 layer = layer.__class__.__name__)
+            return
+
+        elements = max(countElements(data), countElements(output["value"]))
+        self.report.addTiming("layer", durations, len(data), elements,
+                              category = category, source = sourceType, target = targetType,
+                              layer = layer.__class__.__name__)
+
+        # only time streaming for layers that actually stream
+        if self.stream and type(layer).transformStream.__func__ is not compatibility.Layer.transformStream.__func__:
+            def transformStream():
+                layer.transformStream(BytesIO(data), BytesIO())
+
+            durations = benchmark.measure(transformStream, self.repeat)
+            self.report.addTiming("layerStream", durations, len(data), elements,
+                                  category = category, source = sourceType, target = targetType,
+                                  layer = layer.__class__.__name__)
+
+    def timeChain(self, category, manager, sourceType, targetType, data, hops):
+        output = {"value": ""}
+        def transform():
+            output["value"] = manager.transform(sourceType, targetType, data)
+
+        try:
+            durations = benchmark.measure(transform, self.repeat)
+
+        except Exception as e:
+            self.report.addError("chain", e, category = category, source = sourceType, target = targetType, hops = hops)
+            return
+
+        elements = max(countElements(data), countElements(output["value"]))
+        self.report.addTiming("chain", durations, len(data), elements,
+                              category = category, source = sourceType, target = targetType, hops = hops)
+
+    def run(self):
+        for category, manager, sourceType, sourceData in self.generateDocuments():
+            logging.info("Benchmarking '%s' compatibility layers", category)
+
+            documents = self.deriveDocuments(manager, sourceType, sourceData)
+
+            for type_, data in sorted(documents.iteritems()):
+                if isinstance(data, unicode):
+                    documents[type_] = data = data.encode("utf-8")
+
+                self.report.parameters["%s (%s)" % (category, type_)] = {"bytes": len(data), "elements": countElements(data)}
+                self.timeGuessType(category, manager, type_, data)
+
+            for layer in manager.layers:
+                if layer.getSourceType() in documents:
+                    self.timeLayer(category, layer, documents[layer.getSourceType()])
+
+            for sourceType_ in sorted(documents):
+                for targetType in sorted(documents):
+                    if sourceType_ == targetType:
+                        continue
+
+                    try:
+                        hops = len(manager.findTransformPath(sourceType_, targetType))
+                    except compatibility.LayerNotFoundError:
+                        continue
+
+                    # single hops are already timed as layers
+                    if hops > 1:
+                        self.timeChain(category, manager, sourceType_, targetType, documents[sourceType_], hops)
+
+        return self.report
+
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmarks compatibility layers on generated documents")
+
+    parser.add_argument("--scale", type = float, default = 1.0,
+                        help = "Size of the generated documents relative to the default (3906 windows, 300 WidgetLooks, 20000 images, 500 mappings)")
+    parser.add_argument("--repeat", type = int, default = 3,
+                        help = "How many times to repeat each operation, the best time is used for throughput")
+    parser.add_argument("--xmlBackend", type = str, default = None,
+                        help = "XML backend to use (lxml or cElementTree), the default one is used if omitted")
+    parser.add_argument("--noStream", action = "store_true", default = False,
+                        help = "Don't time streaming transformations")
+    parser.add_argument("--output", type = argparse.FileType("w"), default = sys.stdout,
+                        help = "Where to write the JSON report, standard output is used if omitted")
+
+    args = parser.parse_args()
+
+    if args.xmlBackend is not None:
+        xmlbackend.select(args.xmlBackend)
+
+    report = Suite(args.scale, args.repeat, not args.noStream).run()
+    report.write(args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,729 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+
+"""Pure python stand-in for the parts of PyCEGUI the editors use on the window tree.
+
+Lets editor code be run (benchmarked) without a GPU or a CEGUI build. Windows
+keep their properties as strings, only geometry is interpreted. Nothing is
+rendered, there are no looknfeels, window renderers or events.
+
+Call install before anything imports PyCEGUI, this module is then imported
+in its place (similar to what ceed.fake does for file paths). Call uninstall
+when done, the fake would otherwise stay in place for good.
+"""
+
+from xml.etree import cElementTree as ElementTree
+
+import re
+import sys
+import types
+
+# modules install replaced (None if there were none) and names of modules imported before it,
+# both are None unless the fake is installed
+_replacedModules = None
+_modulesBeforeInstall = None
+
+def install():
+    """Makes "import PyCEGUI" import this module, returns this module"""
+
+    global _replacedModules
+    global _modulesBeforeInstall
+
+    if _replacedModules is None:
+        _replacedModules = dict((name, sys.modules.get(name)) for name in ["PyCEGUI", "PyCEGUIOpenGLRenderer"])
+        _modulesBeforeInstall = set(sys.modules.keys())
+
+    module = sys.modules[__name__]
+    sys.modules["PyCEGUI"] = module
+
+    if "PyCEGUIOpenGLRenderer" not in sys.modules:
+        renderer = types.ModuleType("PyCEGUIOpenGLRenderer")
+        renderer.OpenGLRenderer = None
+        sys.modules["PyCEGUIOpenGLRenderer"] = renderer
+
+    return module
+
+def uninstall():
+    """Undoes install, restores the modules it replaced.
+
+    Editor modules imported since install are forgotten as well, they hold the fake
+    and will be imported again (with whatever PyCEGUI is there then) when needed.
+    """
+
+    global _replacedModules
+    global _modulesBeforeInstall
+
+    if _replacedModules is None:
+        return
+
+    for name, module in _replacedModules.iteritems():
+        if module is None:
+            sys.modules.pop(name, None)
+
+        else:
+            sys.modules[name] = module
+
+    for name in set(sys.modules.keys()).difference(_modulesBeforeInstall):
+        if name != "ceed" and not name.startswith("ceed."):
+            continue
+
+        del sys.modules[name]
+
+        # "from package import module" would find the attribute of the package otherwise
+        packageName, _, moduleName = name.rpartition(".")
+        if sys.modules.get(packageName) is not None and hasattr(sys.modules[packageName], moduleName):
+            delattr(sys.modules[packageName], moduleName)
+
+    _replacedModules = None
+    _modulesBeforeInstall = None
+
+class AlreadyExistsException(RuntimeError):
+    pass
+
+class UnknownObjectException(RuntimeError):
+    pass
+
+class Logger(object):
+    def __init__(self):
+        pass
+
+class UDim(object):
+    __slots__ = ("d_scale", "d_offset")
+
+    def __init__(self, scale = 0.0, offset = 0.0):
+        self.d_scale = float(scale)
+        self.d_offset = float(offset)
+
+    def __add__(self, other):
+        return UDim(self.d_scale + other.d_scale, self.d_offset + other.d_offset)
+
+    def __sub__(self, other):
+        return UDim(self.d_scale - other.d_scale, self.d_offset - other.d_offset)
+
+    def __mul__(self, other):
+        if isinstance(other, UDim):
+            return UDim(self.d_scale * other.d_scale, self.d_offset * other.d_offset)
+
+        return UDim(self.d_scale * other, self.d_offset * other)
+
+    def __eq__(self, other):
+        return isinstance(other, UDim) and self.d_scale == other.d_scale and self.d_offset == other.d_offset
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        return "{%g,%g}" % (self.d_scale, self.d_offset)
+
+class UVector2(object):
+    __slots__ = ("d_x", "d_y")
+
+    def __init__(self, x = None, y = None):
+        self.d_x = x if x is not None else UDim()
+        self.d_y = y if y is not None else UDim()
+
+    def __add__(self, other):
+        return UVector2(self.d_x + other.d_x, self.d_y + other.d_y)
+
+    def __sub__(self, other):
+        return UVector2(self.d_x - other.d_x, self.d_y - other.d_y)
+
+    def __eq__(self, other):
+        return isinstance(other, UVector2) and self.d_x == other.d_x and self.d_y == other.d_y
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        return "{%s,%s}" % (self.d_x, self.d_y)
+
+class USize(object):
+    __slots__ = ("d_width", "d_height")
+
+    def __init__(self, width = None, height = None):
+        self.d_width = width if width is not None else UDim()
+        self.d_height = height if height is not None else UDim()
+
+    def __add__(self, other):
+        return USize(self.d_width + other.d_width, self.d_height + other.d_height)
+
+    def __sub__(self, other):
+        return USize(self.d_width - other.d_width, self.d_height - other.d_height)
+
+    def __eq__(self, other):
+        return isinstance(other, USize) and self.d_width == other.d_width and self.d_height == other.d_height
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        return "{%s,%s}" % (self.d_width, self.d_height)
+
+class Vector2f(object):
+    __slots__ = ("d_x", "d_y")
+
+    def __init__(self, x = 0.0, y = 0.0):
+        self.d_x = x
+        self.d_y = y
+
+    def __add__(self, other):
+        return Vector2f(self.d_x + other.d_x, self.d_y + other.d_y)
+
+    def __sub__(self, other):
+        return Vector2f(self.d_x - other.d_x, self.d_y - other.d_y)
+
+class Sizef(object):
+    __slots__ = ("d_width", "d_height")
+
+    def __init__(self, width = 0.0, height = 0.0):
+        self.d_width = width
+        self.d_height = height
+
+class Rectf(object):
+    __slots__ = ("d_min", "d_max")
+
+    def __init__(self, position, size):
+        self.d_min = position
+        self.d_max = Vector2f(position.d_x + size.d_width, position.d_y + size.d_height)
+
+    def getPosition(self):
+        return Vector2f(self.d_min.d_x, self.d_min.d_y)
+
+    def getSize(self):
+        return Sizef(self.d_max.d_x - self.d_min.d_x, self.d_max.d_y - self.d_min.d_y)
+
+    def getWidth(self):
+        return self.d_max.d_x - self.d_min.d_x
+
+    def getHeight(self):
+        return self.d_max.d_y - self.d_min.d_y
+
+class CachedRectf(object):
+    """Windows compute their rectangles when asked, there is nothing to cache"""
+
+    def __init__(self, compute):
+        self.compute = compute
+
+    def get(self):
+        return self.compute()
+
+    def getFresh(self, skipAllPixelAlignment = False):
+        return self.compute()
+
+class HorizontalAlignment(object):
+    HA_LEFT = 0
+    HA_CENTRE = 1
+    HA_RIGHT = 2
+
+class VerticalAlignment(object):
+    VA_TOP = 0
+    VA_CENTRE = 1
+    VA_BOTTOM = 2
+
+class CoordConverter(object):
+    @staticmethod
+    def asAbsolute(udim, base, pixelAlign = True):
+        return udim.d_scale * base + udim.d_offset
+
+    @staticmethod
+    def alignToPixels(value):
+        return float(int(value + 0.5))
+
+_numberPattern = re.compile(r"[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?")
+
+def _parseNumbers(value, count):
+    numbers = [float(number) for number in _numberPattern.findall(value)]
+    if len(numbers) != count:
+        raise ValueError("Expected %i numbers in '%s'" % (count, value))
+
+    return numbers
+
+class PropertyIterator(object):
+    def __init__(self, names):
+        self.names = names
+        self.index = 0
+
+    def isAtEnd(self):
+        return self.index >= len(self.names)
+
+    def getCurrentKey(self):
+        return self.names[self.index]
+
+    def next(self):
+        self.index += 1
+
+class Window(object):
+    # property name -> default value, geometry properties are handled separately
+    propertyDefaults = {
+        "Alpha": "1",
+        "Disabled": "false",
+        "Font": "",
+        "Text": "",
+        "Tooltip": "",
+        "Visible": "true",
+        "InheritsAlpha": "true",
+        "ClippedByParent": "true",
+        "MousePassThroughEnabled": "false"
+    }
+
+    geometryProperties = ["Area", "Position", "Size", "MinSize", "MaxSize"]
+    geometryDefaults = {
+        "Area": "{{0,0},{0,0},{0,0},{0,0}}",
+        "Position": "{{0,0},{0,0}}",
+        "Size": "{{0,0},{0,0}}",
+        "MinSize": "{{0,0},{0,0}}",
+        "MaxSize": "{{0,0},{0,0}}"
+    }
+
+    def __init__(self, type_, name):
+        self.type = type_
+        self.name = name
+
+        self.parent = None
+        self.children = []
+        self.autoWindow = False
+
+        self.position = UVector2()
+        self.size = USize()
+        self.minSize = USize()
+        self.maxSize = USize()
+        self.horizontalAlignment = HorizontalAlignment.HA_LEFT
+        self.verticalAlignment = VerticalAlignment.VA_TOP
+
+        self.properties = dict(self.propertyDefaults)
+
+    def getName(self):
+        return self.name
+
+    def setName(self, name):
+        if self.parent is not None and self.parent.isChild(name):
+            raise AlreadyExistsException("Window '%s' already exists" % (name))
+
+        self.name = name
+
+    def getType(self):
+        return self.type
+
+    def getNamePath(self):
+        if self.parent is None:
+            return self.name
+
+        return self.parent.getNamePath() + "/" + self.name
+
+    def isAutoWindow(self):
+        return self.autoWindow
+
+    def setAutoWindow(self, autoWindow):
+        self.autoWindow = autoWindow
+
+    def isNonClient(self):
+        return False
+
+    def getParent(self):
+        return self.parent
+
+    def getChildCount(self):
+        return len(self.children)
+
+    def getChildAtIdx(self, index):
+        return self.children[index]
+
+    def findChild(self, name):
+        for child in self.children:
+            if child.name == name:
+                return child
+
+        return None
+
+    def getChild(self, path):
+        window = self
+        for name in path.split("/"):
+            window = window.findChild(name)
+            if window is None:
+                raise UnknownObjectException("Child '%s' of '%s' doesn't exist" % (path, self.getNamePath()))
+
+        return window
+
+    def isChild(self, path):
+        try:
+            self.getChild(path)
+            return True
+
+        except UnknownObjectException:
+            return False
+
+    def addChild(self, window):
+        if window.parent is self:
+            return
+
+        if self.findChild(window.name) is not None:
+            raise AlreadyExistsException("Window '%s' already has a child called '%s'" % (self.getNamePath(), window.name))
+
+        if window.parent is not None:
+            window.parent.removeChild(window)
+
+        window.parent = self
+        self.children.append(window)
+
+    def removeChild(self, window):
+        if window.parent is self:
+            self.children.remove(window)
+            window.parent = None
+
+    def swapChildPositions(self, firstIndex, secondIndex):
+        self.children[firstIndex], self.children[secondIndex] = self.children[secondIndex], self.children[firstIndex]
+
+    def getPositionOfChild(self, window):
+        return self.children.index(window)
+
+    def moveToFront(self):
+        if self.parent is not None:
+            self.parent.children.remove(self)
+            self.parent.children.append(self)
+
+    def update(self, elapsed):
+        pass
+
+    def getPosition(self):
+        return self.position
+
+    def setPosition(self, position):
+        self.position = position
+
+    def getSize(self):
+        return self.size
+
+    def setSize(self, size):
+        self.size = size
+
+    def getMinSize(self):
+        return self.minSize
+
+    def getMaxSize(self):
+        return self.maxSize
+
+    def getHorizontalAlignment(self):
+        return self.horizontalAlignment
+
+    def setHorizontalAlignment(self, alignment):
+        self.horizontalAlignment = alignment
+
+    def getVerticalAlignment(self):
+        return self.verticalAlignment
+
+    def setVerticalAlignment(self, alignment):
+        self.verticalAlignment = alignment
+
+    def getParentPixelSize(self):
+        if self.parent is None:
+            return System.getSingleton().displaySize
+
+        return self.parent.getPixelSize()
+
+    def getPixelSize(self):
+        return self.computeOuterRect().getSize()
+
+    def computeOuterRect(self):
+        if self.parent is None:
+            displaySize = System.getSingleton().displaySize
+            parentRect = Rectf(Vector2f(), displaySize)
+        else:
+            parentRect = self.parent.computeOuterRect()
+
+        parentWidth = parentRect.getWidth()
+        parentHeight = parentRect.getHeight()
+
+        width = CoordConverter.asAbsolute(self.size.d_width, parentWidth)
+        height = CoordConverter.asAbsolute(self.size.d_height, parentHeight)
+        x = CoordConverter.asAbsolute(self.position.d_x, parentWidth)
+        y = CoordConverter.asAbsolute(self.position.d_y, parentHeight)
+
+        if self.horizontalAlignment == HorizontalAlignment.HA_CENTRE:
+            x += (parentWidth - width) * 0.5
+        elif self.horizontalAlignment == HorizontalAlignment.HA_RIGHT:
+            x += parentWidth - width
+
+        if self.verticalAlignment == VerticalAlignment.VA_CENTRE:
+            y += (parentHeight - height) * 0.5
+        elif self.verticalAlignment == VerticalAlignment.VA_BOTTOM:
+            y += parentHeight - height
+
+        return Rectf(Vector2f(parentRect.d_min.d_x + x, parentRect.d_min.d_y + y), Sizef(width, height))
+
+    def getUnclippedOuterRect(self):
+        return CachedRectf(self.computeOuterRect)
+
+    def getUnclippedInnerRect(self):
+        return CachedRectf(self.computeOuterRect)
+
+    def getChildContentArea(self, nonClient = False):
+        return CachedRectf(self.computeOuterRect)
+
+    def getPropertyNames(self):
+        return self.geometryProperties + sorted(self.properties.iterkeys())
+
+    def getPropertyIterator(self):
+        return PropertyIterator(self.getPropertyNames())
+
+    def isPropertyPresent(self, name):
+        return name in self.geometryProperties or name in self.properties
+
+    def isPropertyBannedFromXML(self, name):
+        # Area is written instead
+        return name in ("Position", "Size")
+
+    def getPropertyDefault(self, name):
+        if name in self.geometryDefaults:
+            return self.geometryDefaults[name]
+
+        return self.propertyDefaults.get(name, "")
+
+    def isPropertyDefault(self, name):
+        return self.getProperty(name) == self.getPropertyDefault(name)
+
+    def getProperty(self, name):
+        if name == "Area":
+            return "{%s,%s,%s,%s}" % (self.position.d_x, self.position.d_y,
+                                      self.position.d_x + self.size.d_width, self.position.d_y + self.size.d_height)
+        elif name == "Position":
+            return str(self.position)
+        elif name == "Size":
+            return str(self.size)
+        elif name == "MinSize":
+            return str(self.minSize)
+        elif name == "MaxSize":
+            return str(self.maxSize)
+
+        if name not in self.properties:
+            raise UnknownObjectException("There is no property named '%s'" % (name))
+
+        return self.properties[name]
+
+    def setProperty(self, name, value):
+        if name == "Area":
+            left, leftOffset, top, topOffset, right, rightOffset, bottom, bottomOffset = _parseNumbers(value, 8)
+            self.position = UVector2(UDim(left, leftOffset), UDim(top, topOffset))
+            self.size = USize(UDim(right - left, rightOffset - leftOffset), UDim(bottom - top, bottomOffset - topOffset))
+        elif name in ("Position", "Size", "MinSize", "MaxSize"):
+            a, b, c, d = _parseNumbers(value, 4)
+            if name == "Position":
+                self.position = UVector2(UDim(a, b), UDim(c, d))
+            elif name == "Size":
+                self.size = USize(UDim(a, b), UDim(c, d))
+            elif name == "MinSize":
+                self.minSize = USize(UDim(a, b), UDim(c, d))
+            else:
+                self.maxSize = USize(UDim(a, b), UDim(c, d))
+        else:
+            self.properties[name] = value
+
+class DefaultWindow(Window):
+    pass
+
+class LayoutContainer(Window):
+    pass
+
+class SequentialLayoutContainer(LayoutContainer):
+    pass
+
+class HorizontalLayoutContainer(SequentialLayoutContainer):
+    pass
+
+class VerticalLayoutContainer(SequentialLayoutContainer):
+    pass
+
+class GridLayoutContainer(LayoutContainer):
+    pass
+
+class ScrollablePane(Window):
+    CONTENT_PANE_NAME = "__auto_container__"
+
+    def __init__(self, type_, name):
+        super(ScrollablePane, self).__init__(type_, name)
+
+        contentPane = DefaultWindow("ScrolledContainer", self.CONTENT_PANE_NAME)
+        contentPane.setAutoWindow(True)
+        contentPane.setSize(USize(UDim(1, 0), UDim(1, 0)))
+        Window.addChild(self, contentPane)
+
+    def getContentPane(self):
+        return self.findChild(self.CONTENT_PANE_NAME)
+
+    def addChild(self, window):
+        # same as in CEGUI, children go to the content pane
+        if window.isAutoWindow():
+            Window.addChild(self, window)
+        else:
+            self.getContentPane().addChild(window)
+
+class TabControl(Window):
+    TAB_PANE_NAME = "__auto_TabPane__"
+
+    def __init__(self, type_, name):
+        super(TabControl, self).__init__(type_, name)
+
+        tabPane = DefaultWindow("DefaultWindow", self.TAB_PANE_NAME)
+        tabPane.setAutoWindow(True)
+        tabPane.setSize(USize(UDim(1, 0), UDim(1, 0)))
+        Window.addChild(self, tabPane)
+
+    def getTabPane(self):
+        return self.findChild(self.TAB_PANE_NAME)
+
+    def getTabCount(self):
+        return self.getTabPane().getChildCount()
+
+    def getTabContentsAtIndex(self, index):
+        return self.getTabPane().getChildAtIdx(index)
+
+    def addTab(self, window):
+        self.getTabPane().addChild(window)
+
+    def addChild(self, window):
+        if window.isAutoWindow():
+            Window.addChild(self, window)
+        else:
+            self.addTab(window)
+
+class WindowManager(object):
+    instance = None
+
+    # window type suffix -> window class, everything else is a plain Window
+    windowClasses = [
+        ("HorizontalLayoutContainer", HorizontalLayoutContainer),
+        ("VerticalLayoutContainer", VerticalLayoutContainer),
+        ("GridLayoutContainer", GridLayoutContainer),
+        ("ScrollablePane", ScrollablePane),
+        ("TabControl", TabControl),
+        ("DefaultWindow", DefaultWindow)
+    ]
+
+    @classmethod
+    def getSingleton(cls):
+        if cls.instance is None:
+            cls.instance = WindowManager()
+
+        return cls.instance
+
+    def __init__(self):
+        self.windowCount = 0
+
+    def createWindow(self, type_, name = ""):
+        if name == "":
+            name = "__cewin_uid_%i" % (self.windowCount)
+        self.windowCount += 1
+
+        for suffix, class_ in self.windowClasses:
+            if type_.endswith(suffix):
+                return class_(type_, name)
+
+        return Window(type_, name)
+
+    def destroyWindow(self, window):
+        if window.parent is not None:
+            window.parent.removeChild(window)
+
+    def getLayoutAsString(self, window):
+        layout = ElementTree.Element("GUILayout", {"version": "4"})
+        self.writeWindow(layout, window)
+
+        return ElementTree.tostring(layout)
+
+    def writeWindow(self, parentElement, window):
+        element = ElementTree.SubElement(parentElement, "Window", {"type": window.getType(), "name": window.getName()})
+        self.writeWindowContents(element, window)
+
+    def writeWindowContents(self, element, window):
+        for name in window.getPropertyNames():
+            if not window.isPropertyBannedFromXML(name) and not window.isPropertyDefault(name):
+                ElementTree.SubElement(element, "Property", {"name": name, "value": window.getProperty(name)})
+
+        for child in window.children:
+            if child.isAutoWindow():
+                autoElement = ElementTree.Element("AutoWindow", {"namePath": child.getName()})
+                self.writeWindowContents(autoElement, child)
+
+                if len(autoElement) > 0:
+                    element.append(autoElement)
+
+            else:
+                self.writeWindow(element, child)
+
+    def loadLayoutFromString(self, code):
+        if isinstance(code, unicode):
+            code = code.encode("utf-8")
+
+        layout = ElementTree.fromstring(code)
+        windows = [element for element in layout if element.tag == "Window"]
+        if len(windows) != 1:
+            raise RuntimeError("Layout has to contain exactly one root window")
+
+        return self.readWindow(windows[0])
+
+    def readWindow(self, element):
+        window = self.createWindow(element.get("type"), element.get("name"))
+        self.readWindowContents(element, window)
+
+        return window
+
+    def readWindowContents(self, element, window):
+        for child in element:
+            if child.tag == "Property":
+                window.setProperty(child.get("name"), child.get("value") if "value" in child.attrib else (child.text or ""))
+
+            elif child.tag == "Window":
+                window.addChild(self.readWindow(child))
+
+            elif child.tag == "AutoWindow":
+                self.readWindowContents(child, window.getChild(child.get("namePath")))
+
+class GUIContext(object):
+    def __init__(self):
+        self.rootWindow = None
+
+    def setRootWindow(self, window):
+        self.rootWindow = window
+
+    def getRootWindow(self):
+        return self.rootWindow
+
+    def markAsDirty(self):
+        pass
+
+class System(object):
+    instance = None
+
+    @classmethod
+    def getSingleton(cls):
+        if cls.instance is None:
+            cls.instance = System()
+
+        return cls.instance
+
+    def __init__(self):
+        self.displaySize = Sizef(800, 600)
+        self.defaultGUIContext = GUIContext()
+
+    def getDefaultGUIContext(self):
+        return self.defaultGUIContext
+
+    def notifyDisplaySizeChanged(self, size):
+        self.displaySize = size
@@ -0,0 +1,345 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+
+"""Performance benchmark of layout editing operations on generated widget trees.
+
+Widgets are pure python stand-ins (see fakecegui), neither a GPU nor a CEGUI build
+is needed. Operations on the window tree alone (spatial index, code diffs,
+top-most selected paths) don't need PySide either and are always timed.
+Serialisation, manipulators and the widget hierarchy need PySide, these operations
+are reported as errors if it can't be imported. Undo commands and the property
+inspector need the whole layout editor (and a main window), they aren't covered.
+
+Run it with:
+ python -m ceed.benchmark.layout --depth 4 --fanOut 12 --output results.json
+"""
+
+from ceed import benchmark
+from ceed import spatialindex
+from ceed import widgetpaths
+from ceed.benchmark import fakecegui
+
+import argparse
+import logging
+import math
+import os
+import shutil
+import sys
+import tempfile
+
+# types of widgets without children
+LEAF_WIDGET_TYPES = [
+    "TaharezLook/Button",
+    "TaharezLook/StaticText",
+    "TaharezLook/Editbox",
+    "TaharezLook/Checkbox",
+    "TaharezLook/StaticImage"
+]
+
+# (name, value) of properties set on generated widgets besides Area
+WIDGET_PROPERTIES = [
+    ("Text", "Generated text"),
+    ("Tooltip", "Generated tooltip"),
+    ("Alpha", "0.8"),
+    ("Font", "DejaVuSans-10"),
+    ("MousePassThroughEnabled", "true")
+]
+
+def generateWidgetTree(depth = 4, fanOut = 12, propertiesPerWidget = 3):
+    """Generates a tree of fakecegui windows of given depth and fan out, returns the root
+
+    Windows that have children are mostly FrameWindows, some of them are layout
+    containers and scrollable panes (on the last level with children) to hit
+    the special cases of manipulator handling.
+    """
+
+    windowManager = fakecegui.WindowManager.getSingleton()
+
+    counter = [0]
+    def createWindow(level, indexInParent, siblingCount):
+        index = counter[0]
+        counter[0] += 1
+
+        if level == depth:
+            type_ = LEAF_WIDGET_TYPES[index % len(LEAF_WIDGET_TYPES)]
+        elif index % 7 == 3:
+            type_ = "VerticalLayoutContainer"
+        elif level == depth - 1 and index % 5 == 2:
+            type_ = "TaharezLook/ScrollablePane"
+        else:
+            type_ = "TaharezLook/FrameWindow"
+
+        window = windowManager.createWindow(type_, "Widget%i" % (index))
+
+        # children are laid out in columns so that they don't overlap
+        left = float(indexInParent) / siblingCount
+        right = float(indexInParent + 1) / siblingCount
+        window.setProperty("Area", "{{%g,2},{0.1,2},{%g,-2},{0.9,-2}}" % (left, right))
+
+        for i in xrange(propertiesPerWidget):
+            name, value = WIDGET_PROPERTIES[(index + i) % len(WIDGET_PROPERTIES)]
+            window.setProperty(name, value)
+
+        if level < depth:
+            for i in xrange(fanOut):
+                window.addChild(createWindow(level + 1, i, fanOut))
+
+        return window
+
+    return createWindow(1, 0, 1)
+
+def generateLayout(depth = 4, fanOut = 12, propertiesPerWidget = 3):
+    """Generates a layout (CEGUI layout 4) with a widget tree of given depth and fan out, returns it as string"""
+
+    root = generateWidgetTree(depth, fanOut, propertiesPerWidget)
+    return fakecegui.WindowManager.getSingleton().getLayoutAsString(root)
+
+def getAllWindows(window):
+    """Returns list of given window and all its descendants, auto windows included"""
+
+    ret = [window]
+    for child in window.children:
+        ret.extend(getAllWindows(child))
+
+    return ret
+
+class Suite(object):
+    """Runs the benchmark on one generated widget tree and collects the results in a Report"""
+
+    def __init__(self, depth = 4, fanOut = 12, repeat = 3, maximumPaths = 1000):
+        self.depth = depth
+        self.fanOut = fanOut
+        self.repeat = repeat
+        self.maximumPaths = maximumPaths
+
+        self.report = benchmark.Report("layout")
+        self.report.parameters["depth"] = depth
+        self.report.parameters["fanOut"] = fanOut
+        self.report.parameters["repeat"] = repeat
+
+        self.application = None
+        self.settingsDirectory = None
+
+    def time(self, name, function, elements, **extra):
+        """Times given function, records an error instead if it raises"""
+
+        try:
+            durations = benchmark.measure(function, self.repeat)
+
+        except Exception as e:
+            self.report.addError(name, e, **extra)
+            return False
+
+        self.report.addTiming(name, durations, 0, elements, **extra)
+        return True
+
+    def getSamplePaths(self, windows):
+        """Returns evenly spread paths of non-auto windows relative to the root"""
+
+        paths = [window.getNamePath().split("/", 1)[1] for window in windows[1:] if not window.isAutoWindow()]
+        step = max(1, int(math.ceil(float(len(paths)) / self.maximumPaths)))
+
+        return paths[::step]
+
+    def timeWindowTree(self, root, paths):
+        def getChildren():
+            for path in paths:
+                root.getChild(path)
+
+        self.time("getChildByPath", getChildren, len(paths))
+
+        # selecting everything, most of the paths have ancestors in the selection
+        self.time("topMostPaths", lambda: widgetpaths.getTopMostPaths(paths), len(paths))
+
+    def timeSpatialIndex(self, count):
+        # a grid of count siblings under one parent
+        columns = max(1, int(math.sqrt(count)))
+        rects = [((i % columns) * 30.0, (i // columns) * 30.0, (i % columns) * 30.0 + 25.0, (i // columns) * 30.0 + 25.0)
+                 for i in xrange(count)]
+
+        index = spatialindex.SpatialIndex()
+        def build():
+            index.clear()
+            for i, rect in enumerate(rects):
+                index.update(i, rect)
+
+        def query():
+            for left, top, right, bottom in rects:
+                index.query((left - 10, top - 10, right + 10, bottom + 10))
+
+        def snap():
+            for i, (left, top, _, _) in enumerate(rects):
+                index.findNearestVerticalEdge(left + 3, 4, i)
+                index.findNearestHorizontalEdge(top + 3, 4, i)
+
+        self.time("spatialIndexBuild", build, count)
+        self.time("spatialIndexQuery", query, count)
+        self.time("spatialIndexSnap", snap, count)
+
+    def timeCodeDiff(self, root, windowCount):
+        code = fakecegui.WindowManager.getSingleton().getLayoutAsString(root)
+        self.report.parameters["layoutBytes"] = len(code)
+
+        # a one property edit, the common case when switching from Code mode back to Visual
+        edited = code.replace('value="Generated text"', 'value="Edited text"', 1)
+
+        def diff():
+            from ceed import layoutdiff
+            layoutdiff.diffLayouts(code, edited)
+
+        self.time("codeDiff", diff, windowCount)
+
+    def timeSerialisation(self, root, windowCount):
+        data = {}
+
+        def serialise():
+            from ceed.cegui import widgethelpers
+            data["value"] = widgethelpers.SerialisationData(root)
+
+        if not self.time("serialise", serialise, windowCount):
+            return
+
+        from ceed.cegui import widgethelpers
+
+        def encode():
+            data["encoded"] = widgethelpers.SerialisationData.encodeList([data["value"]])
+
+        def decode():
+            widgethelpers.SerialisationData.decodeList(data["encoded"])
+
+        if self.time("encodeSerialisationData", encode, windowCount):
+            self.report.parameters["encodedSerialisationDataBytes"] = len(data["encoded"])
+            self.time("decodeSerialisationData", decode, windowCount)
+
+    def initialiseQt(self):
+        """Creates the application and settings the manipulators and the hierarchy need"""
+
+        from PySide import QtCore
+        from PySide import QtGui
+        from ceed import settings
+
+        if QtCore.QCoreApplication.instance() is None:
+            # nothing is shown, an application without GUI works without a display
+            self.application = QtGui.QApplication(sys.argv, False)
+
+        if settings.Settings.instance is None:
+            # default values are used, nothing is read or written
+            self.settingsDirectory = tempfile.mkdtemp(prefix = "ceed-benchmark-")
+            settings.Settings(QtCore.QSettings(os.path.join(self.settingsDirectory, "settings.ini"), QtCore.QSettings.IniFormat))
+
+    def timeManipulators(self, root, windowCount, paths):
+        manipulators = {}
+
+        def create():
+            from ceed.cegui import widgethelpers
+            manipulators["root"] = widgethelpers.Manipulator(None, root)
+
+        try:
+            self.initialiseQt()
+
+        except Exception as e:
+            self.report.addError("createManipulators", e)
+            return
+
+        if not self.time("createManipulators", create, windowCount):
+            return
+
+        from ceed.cegui import widgethelpers
+        rootManipulator = manipulators["root"]
+
+        self.time("updateFromWidget", lambda: rootManipulator.updateFromWidget(), windowCount)
+        self.time("updateFromWidgetSkippingUnchanged", lambda: rootManipulator.updateFromWidget(skipUnchangedSubtrees = True), windowCount)
+
+        def getManipulators():
+            for path in paths:
+                rootManipulator.getManipulatorByPath(path)
+
+        self.time("getManipulatorByPathWalk", getManipulators, len(paths))
+
+        try:
+            scene = widgethelpers.GraphicsScene(None)
+            scene.addItem(rootManipulator)
+            scene.indexManipulator(rootManipulator)
+
+        except Exception as e:
+            self.report.addError("getManipulatorByPathIndexed", e)
+
+        else:
+            self.time("getManipulatorByPathIndexed", getManipulators, len(paths))
+
+        models = {}
+
+        def constructHierarchy():
+            from ceed.editors.layout import visual
+            models["value"] = visual.WidgetHierarchyTreeModel(None)
+            models["value"].setRootManipulator(rootManipulator)
+
+        if self.time("constructHierarchy", constructHierarchy, windowCount):
+            self.time("synchroniseHierarchy", lambda: models["value"].setRootManipulator(rootManipulator), windowCount)
+
+    def run(self):
+        logging.info("Generating a widget tree of depth %i with fan out %i", self.depth, self.fanOut)
+
+        root = generateWidgetTree(self.depth, self.fanOut)
+        windows = getAllWindows(root)
+        paths = self.getSamplePaths(windows)
+
+        self.report.parameters["widgets"] = len(windows)
+        self.report.parameters["paths"] = len(paths)
+
+        # editor modules have to import the fake
+        fakecegui.install()
+
+        try:
+            self.timeWindowTree(root, paths)
+            self.timeSpatialIndex(len(windows))
+            self.timeCodeDiff(root, len(windows))
+            self.timeSerialisation(root, len(windows))
+            self.timeManipulators(root, len(windows), paths)
+
+        finally:
+            if self.settingsDirectory is not None:
+                shutil.rmtree(self.settingsDirectory, True)
+                self.settingsDirectory = None
+
+            fakecegui.uninstall()
+
+        return self.report
+
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmarks layout editing operations on generated widget trees")
+
+    parser.add_argument("--depth", type = int, default = 4,
+                        help = "Depth of the generated widget tree, the root is at depth 1")
+    parser.add_argument("--fanOut", type = int, default = 12,
+                        help = "Number of children of each widget that isn't a leaf")
+    parser.add_argument("--repeat", type = int, default = 3,
+                        help = "How many times to repeat each operation, the best time is used for throughput")
+    parser.add_argument("--output", type = argparse.FileType("w"), default = sys.stdout,
+                        help = "Where to write the JSON report, standard output is used if omitted")
+
+    args = parser.parse_args()
+
+    report = Suite(args.depth, args.fanOut, args.repeat).run()
+    report.write(args.output)
+
+if __name__ == "__main__":
+    main()
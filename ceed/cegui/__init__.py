@@ -25,6 +25,8 @@ from PySide import QtOpenGL
 from OpenGL import GL
 
 import os.path
+import threading
+import bisect
 
 import PyCEGUI
 import PyCEGUIOpenGLRenderer
@@ -65,6 +67,73 @@ class GLContextProvider(object):
 
         raise NotImplementedError("All classes inheriting GLContextProvider must override GLContextProvider.makeGLContextCurrent")
 
+class LazySchemes(object):
+    """State of on demand scheme loading, see Instance.syncToProject.
+
+    Only the schemes themselves are prepared when synchronising, the rest is loaded
+    by Instance.ensureSchemesLoaded when an editor needs it.
+    """
+
+    def __init__(self, project, schemeIndex, preparedSchemes, resourceDirectories):
+        from ceed.compatibility import resources
+
+        self.project = project
+        self.schemeIndex = schemeIndex
+        # normalised path -> PreparedResource
+        self.preparedResources = dict(preparedSchemes)
+        # what was loaded so far, schemes that weren't loaded yet have no scheme references
+        self.manifest = resources.ResourceManifest(resourceDirectories, project.CEGUIVersion)
+        self.registry = resources.ResourceRegistry()
+
+        self.prefetchThread = None
+        self.prefetchedResources = {}
+
+    def startPrefetch(self, schemeFilePaths):
+        """Prepares resources referenced by given schemes in a background thread.
+
+        Only reading and converting happens in the background, handing the data
+        over to CEGUI has to wait until the schemes are needed (it has to happen in the GL thread).
+        """
+
+        from ceed.compatibility import resources
+
+        resourcesToPrepare = []
+        for schemeFilePath in schemeFilePaths:
+            for kind, filename, resourceGroup in resources.getSchemeReferences(self.preparedResources[schemeFilePath].nativeData):
+                resourcesToPrepare.append((kind, resources.normalisePath(self.project.getResourceFilePath(filename, resourceGroup))))
+
+        if len(resourcesToPrepare) == 0:
+            return
+
+        ceguiVersion = self.project.CEGUIVersion
+
+        def prefetch():
+            try:
+                # one process is enough, nobody is waiting for this yet
+                for preparedResource in resources.prepareResources(resourcesToPrepare, ceguiVersion, jobs = 1):
+                    self.prefetchedResources[preparedResource.path] = preparedResource
+
+            except Exception:
+                # whatever wasn't prefetched is prepared when it's needed, errors are reported then
+                pass
+
+        self.prefetchThread = threading.Thread(name = "CEED scheme prefetch", target = prefetch)
+        self.prefetchThread.daemon = True
+        self.prefetchThread.start()
+
+    def finishPrefetch(self):
+        """Waits for the prefetch to finish and makes its results available"""
+
+        if self.prefetchThread is None:
+            return
+
+        self.prefetchThread.join()
+        self.prefetchThread = None
+
+        for path, preparedResource in self.prefetchedResources.iteritems():
+            self.preparedResources.setdefault(path, preparedResource)
+        self.prefetchedResources = {}
+
 class Instance(object):
     """Encapsulates a running CEGUI instance.
 
@@ -79,6 +148,17 @@ class Instance(object):
 
         self.initialised = False
         self.lastRenderTimeDelta = 0
+        # durations of frames rendered by graphics scenes of this instance, see qtgraphics
+        self.frameTimings = frametiming.FrameTimingRecorder()
+
+        # ResourceManifest of what was loaded by the last syncToProject, None if nothing was
+        self.manifest = None
+        # LazySchemes if schemes of the synchronised project are loaded on demand, None otherwise
+        self.lazySchemes = None
+        # created when the first preview is rendered, see getPreviewImageCache
+        self.previewImageCache = None
+        # cached results of the getAvailable* methods, see getCatalogueEntry
+        self.catalogue = {}
 
     def setGLContextProvider(self, contextProvider):
         """CEGUI instance might need an OpenGL context provider to make sure the right context is active
@@ -103,16 +183,17 @@ class Instance(object):
         """
 
         if not self.initialised:
-            self.makeGLContextCurrent()
+            with startupprofile.phase("Instance.ensureIsInitialised"):
+                self.makeGLContextCurrent()
 
-            # we don't want CEGUI Exceptions to output to stderr every time
-            # they are constructed
-            PyCEGUI.Exception.setStdErrEnabled(False)
-            # FBOs are for sure supported at this point because CEED uses them internally
-            PyCEGUIOpenGLRenderer.OpenGLRenderer.bootstrapSystem(PyCEGUIOpenGLRenderer.OpenGLRenderer.TTT_FBO)
-            self.initialised = True
+                # we don't want CEGUI Exceptions to output to stderr every time
+                # they are constructed
+                PyCEGUI.Exception.setStdErrEnabled(False)
+                # FBOs are for sure supported at this point because CEED uses them internally
+                PyCEGUIOpenGLRenderer.OpenGLRenderer.bootstrapSystem(PyCEGUIOpenGLRenderer.OpenGLRenderer.TTT_FBO)
+                self.initialised = True
 
-            self.setDefaultResourceGroups()
+                self.setDefaultResourceGroups()
 
     def setResourceGroupDirectory(self, resourceGroup, absoluteDirPath):
         """Sets given resourceGroup to look into given absoluteDirPath
@@ -160,6 +241,12 @@ class Instance(object):
             parser.setProperty("SchemaDefaultResourceGroup", "xml_schemas")
 
     def cleanCEGUIResources(self):
+        self.manifest = None
+        self.lazySchemes = None
+        self.invalidateCatalogue()
+        if self.previewImageCache is not None:
+            self.previewImageCache.clear()
+
         # destroy all previous resources (if any)
         if self.initialised:
             PyCEGUI.WindowManager.getSingleton().destroyAllWindows()
@@ -179,8 +266,32 @@ class Instance(object):
             PyCEGUI.System.getSingleton().addStandardWindowFactories()
             PyCEGUI.System.getSingleton().getRenderer().destroyAllTextures()
 
-    def syncToProject(self, project, mainWindow = None):
+    def destroyAllWindows(self):
+        PyCEGUI.WindowManager.getSingleton().destroyAllWindows()
+        # we need to ensure all windows are destroyed, dangling pointers would
+        # make us segfault later otherwise
+        PyCEGUI.WindowManager.getSingleton().cleanDeadPool()
+
+    def getProjectResourceDirectories(self, project):
+        """Returns dict mapping resource groups to absolute directories of given project"""
+
+        return {
+            "imagesets": project.getAbsolutePathOf(project.imagesetsPath),
+            "fonts": project.getAbsolutePathOf(project.fontsPath),
+            "schemes": project.getAbsolutePathOf(project.schemesPath),
+            "looknfeels": project.getAbsolutePathOf(project.looknfeelsPath),
+            "layouts": project.getAbsolutePathOf(project.layoutsPath),
+            "xml_schemas": project.getAbsolutePathOf(project.xmlSchemasPath)
+        }
+
+    def syncToProject(self, project, mainWindow = None, forceFull = False):
         """Synchronises the instance with given project, respecting it's paths and resources
+
+        If the instance was synchronised with the same project settings and scheme files before,
+        only resources whose files changed since then are recreated, unless forceFull is True.
+
+        With the "cegui/resources/lazy_scheme_loading" setting, schemes are only indexed and
+        loaded when they are first needed, see ensureSchemesLoaded.
         """
 
         progress = QtGui.QProgressDialog(mainWindow)
@@ -203,7 +314,40 @@ class Instance(object):
             progress.reset()
             raise IOError("Can't list scheme path '%s'" % (absoluteSchemesPath))
 
+        from ceed.compatibility import resources
+
+        resourceDirectories = self.getProjectResourceDirectories(project)
+        schemeFilePaths = [resources.normalisePath(project.getResourceFilePath(schemeFile, "schemes")) for schemeFile in schemeFiles]
+
+        try:
+            if settings.getEntry("cegui/resources/lazy_scheme_loading").value:
+                self.syncSchemeIndex(project, schemeFilePaths, resourceDirectories, progress)
+
+            elif not forceFull and self.manifest is not None and self.manifest.isCompatibleWith(resourceDirectories, project.CEGUIVersion, schemeFilePaths):
+                self.syncChangedResources(project, progress)
+
+            else:
+                self.syncAllResources(project, schemeFiles, resourceDirectories, progress)
+
+        except:
+            self.cleanCEGUIResources()
+            raise
+
+        finally:
+            # put SchemeManager into the default state again
+            PyCEGUI.SchemeManager.getSingleton().setAutoLoadResources(True)
+            self.invalidateCatalogue()
+
+            progress.reset()
+            QtGui.QApplication.instance().processEvents()
+
+    def syncAllResources(self, project, schemeFiles, resourceDirectories, progress):
+        """Destroys all resources and loads all schemes of given project with everything they reference"""
+
+        from ceed.compatibility import resources
+
         progress.setMinimum(0)
+        # the preparation stage adds its own steps once it knows how many resources there are
         progress.setMaximum(2 + 9 * len(schemeFiles))
 
         progress.setLabelText("Purging all resources...")
@@ -217,192 +361,474 @@ class Instance(object):
         progress.setValue(1)
         QtGui.QApplication.instance().processEvents()
 
-        self.setResourceGroupDirectory("imagesets", project.getAbsolutePathOf(project.imagesetsPath))
-        self.setResourceGroupDirectory("fonts", project.getAbsolutePathOf(project.fontsPath))
-        self.setResourceGroupDirectory("schemes", project.getAbsolutePathOf(project.schemesPath))
-        self.setResourceGroupDirectory("looknfeels", project.getAbsolutePathOf(project.looknfeelsPath))
-        self.setResourceGroupDirectory("layouts", project.getAbsolutePathOf(project.layoutsPath))
-        self.setResourceGroupDirectory("xml_schemas", project.getAbsolutePathOf(project.xmlSchemasPath))
+        for resourceGroup, absoluteDirPath in resourceDirectories.iteritems():
+            self.setResourceGroupDirectory(resourceGroup, absoluteDirPath)
 
-        progress.setLabelText("Recreating all schemes...")
+        progress.setLabelText("Preparing resources...")
         progress.setValue(2)
         QtGui.QApplication.instance().processEvents()
 
-        # we will load resources manually to be able to use the compatibility layer machinery
-        PyCEGUI.SchemeManager.getSingleton().setAutoLoadResources(False)
+        def updatePreparationProgress(preparedResource, remaining):
+            progress.setMaximum(progress.value() + 1 + remaining + 9 * len(schemeFiles))
+            progress.setValue(progress.value() + 1)
+            progress.setLabelText("Preparing resources...\n\n%s" % (os.path.basename(preparedResource.path)))
 
-        from ceed import compatibility
-        import ceed.compatibility.scheme as scheme_compatibility
-        import ceed.compatibility.imageset as imageset_compatibility
-        import ceed.compatibility.font as font_compatibility
-        import ceed.compatibility.looknfeel as looknfeel_compatibility
+            QtGui.QApplication.instance().processEvents()
 
-        try:
-            for schemeFile in schemeFiles:
-                def updateProgress(message):
-                    progress.setValue(progress.value() + 1)
-                    progress.setLabelText("Recreating all schemes... (%s)\n\n%s" % (schemeFile, message))
+        schemeFilePaths = [resources.normalisePath(project.getResourceFilePath(schemeFile, PyCEGUI.Scheme.getDefaultResourceGroup())) for schemeFile in schemeFiles]
+        preparedResources = self.prepareProjectResources(project, schemeFilePaths, updatePreparationProgress)
+        if preparedResources is None:
+            return
 
-                    QtGui.QApplication.instance().processEvents()
+        manifest = resources.ResourceManifest(resourceDirectories, project.CEGUIVersion)
+        registry = resources.ResourceRegistry()
 
-                updateProgress("Parsing the scheme file")
-                schemeFilePath = project.getResourceFilePath(schemeFile, PyCEGUI.Scheme.getDefaultResourceGroup())
-                rawData = open(schemeFilePath, "r").read()
-                rawDataType = scheme_compatibility.manager.EditorNativeType
+        for schemeFile, schemeFilePath in zip(schemeFiles, schemeFilePaths):
+            def updateProgress(message):
+                progress.setValue(progress.value() + 1)
+                progress.setLabelText("Recreating all schemes... (%s)\n\n%s" % (schemeFile, message))
 
-                try:
-                    rawDataType = scheme_compatibility.manager.guessType(rawData, schemeFilePath)
+                QtGui.QApplication.instance().processEvents()
 
-                except compatibility.NoPossibleTypesError:
-                    QtGui.QMessageBox.warning(None, "Scheme doesn't match any known data type", "The scheme '%s' wasn't recognised by CEED as any scheme data type known to it. Please check that the data isn't corrupted. CEGUI instance synchronisation aborted!" % (schemeFilePath))
-                    return
+            self.loadScheme(project, schemeFilePath, preparedResources, manifest, registry, updateProgress)
 
-                except compatibility.MultiplePossibleTypesError as e:
-                    suitableVersion = scheme_compatibility.manager.getSuitableDataTypeForCEGUIVersion(project.CEGUIVersion)
+        self.manifest = manifest
 
-                    if suitableVersion not in e.possibleTypes:
-                        QtGui.QMessageBox.warning(None, "Incorrect scheme data type", "The scheme '%s' checked out as some potential data types, however not any of these is suitable for your project's target CEGUI version '%s', please check your project settings! CEGUI instance synchronisation aborted!" % (schemeFilePath, suitableVersion))
-                        return
+        self.reportNameConflicts(registry.conflicts)
 
-                    rawDataType = suitableVersion
+    def syncSchemeIndex(self, project, schemeFilePaths, resourceDirectories, progress):
+        """Destroys all resources and only indexes schemes of given project, they are loaded
+        later on when needed. Recently used skins are prepared in the background.
+        """
 
-                nativeData = scheme_compatibility.manager.transform(rawDataType, scheme_compatibility.manager.EditorNativeType, rawData)
-                scheme = PyCEGUI.SchemeManager.getSingleton().createFromString(nativeData)
+        from ceed.compatibility import resources
 
-                # NOTE: This is very CEGUI implementation specific unfortunately!
-                #
-                #       However I am not really sure how to do this any better.
+        progress.setMinimum(0)
+        progress.setMaximum(2 + len(schemeFilePaths))
 
-                updateProgress("Loading XML imagesets")
-                xmlImagesetIterator = scheme.getXMLImagesets()
-                while not xmlImagesetIterator.isAtEnd():
-                    loadableUIElement = xmlImagesetIterator.getCurrentValue()
-                    imagesetFilePath = project.getResourceFilePath(loadableUIElement.filename, loadableUIElement.resourceGroup if loadableUIElement.resourceGroup != "" else PyCEGUI.ImageManager.getImagesetDefaultResourceGroup())
-                    imagesetRawData = open(imagesetFilePath, "r").read()
-                    imagesetRawDataType = imageset_compatibility.manager.EditorNativeType
+        progress.setLabelText("Purging all resources...")
+        progress.setValue(0)
+        QtGui.QApplication.instance().processEvents()
 
-                    try:
-                        imagesetRawDataType = imageset_compatibility.manager.guessType(imagesetRawData, imagesetFilePath)
+        self.cleanCEGUIResources()
 
-                    except compatibility.NoPossibleTypesError:
-                        QtGui.QMessageBox.warning(None, "Imageset doesn't match any known data type", "The imageset '%s' wasn't recognised by CEED as any imageset data type known to it. Please check that the data isn't corrupted. CEGUI instance synchronisation aborted!" % (imagesetFilePath))
-                        return
+        progress.setLabelText("Setting resource paths...")
+        progress.setValue(1)
+        QtGui.QApplication.instance().processEvents()
 
-                    except compatibility.MultiplePossibleTypesError as e:
-                        suitableVersion = imageset_compatibility.manager.getSuitableDataTypeForCEGUIVersion(project.CEGUIVersion)
+        for resourceGroup, absoluteDirPath in resourceDirectories.iteritems():
+            self.setResourceGroupDirectory(resourceGroup, absoluteDirPath)
 
-                        if suitableVersion not in e.possibleTypes:
-                            QtGui.QMessageBox.warning(None, "Incorrect imageset data type", "The imageset '%s' checked out as some potential data types, however none of these is suitable for your project's target CEGUI version '%s', please check your project settings! CEGUI instance synchronisation aborted!" % (imagesetFilePath, suitableVersion))
-                            return
+        progress.setLabelText("Indexing schemes...")
+        progress.setValue(2)
+        QtGui.QApplication.instance().processEvents()
 
-                        imagesetRawDataType = suitableVersion
+        preparedSchemes = {}
+        for preparedResource in resources.prepareResources([(resources.SCHEME, schemeFilePath) for schemeFilePath in schemeFilePaths], project.CEGUIVersion):
+            if preparedResource.hasError():
+                QtGui.QMessageBox.warning(None, preparedResource.errorTitle, preparedResource.errorMessage)
+                return
 
-                    imagesetNativeData = imageset_compatibility.manager.transform(imagesetRawDataType, imageset_compatibility.manager.EditorNativeType, imagesetRawData)
+            preparedSchemes[preparedResource.path] = preparedResource
 
-                    PyCEGUI.ImageManager.getSingleton().loadImagesetFromString(imagesetNativeData)
-                    xmlImagesetIterator.next()
+            progress.setValue(progress.value() + 1)
+            progress.setLabelText("Indexing schemes...\n\n%s" % (os.path.basename(preparedResource.path)))
+            QtGui.QApplication.instance().processEvents()
 
-                updateProgress("Loading image file imagesets")
-                scheme.loadImageFileImagesets()
+        schemeIndex = resources.SchemeIndex()
+        # sorted to make the scheme that provides something when more of them do predictable
+        for schemeFilePath in sorted(schemeFilePaths):
+            schemeIndex.addScheme(resources.indexScheme(schemeFilePath, preparedSchemes[schemeFilePath].nativeData))
 
-                updateProgress("Loading fonts")
-                fontIterator = scheme.getFonts()
-                while not fontIterator.isAtEnd():
-                    loadableUIElement = fontIterator.getCurrentValue()
-                    fontFilePath = project.getResourceFilePath(loadableUIElement.filename, loadableUIElement.resourceGroup if loadableUIElement.resourceGroup != "" else PyCEGUI.Font.getDefaultResourceGroup())
-                    fontRawData = open(fontFilePath, "r").read()
-                    fontRawDataType = font_compatibility.manager.EditorNativeType
+        lazySchemes = LazySchemes(project, schemeIndex, preparedSchemes, resourceDirectories)
 
-                    try:
-                        fontRawDataType = font_compatibility.manager.guessType(fontRawData, fontFilePath)
+        prefetchedSchemes = set()
+        recentSkins = recentlyused.RecentlyUsed(QtGui.QApplication.instance().qsettings, "skins").getRecentlyUsed()
+        for skin in recentSkins[:settings.getEntry("cegui/resources/prefetched_skins").value]:
+            prefetchedSchemes.update(schemeIndex.getSchemesOfSkin(skin))
 
-                    except compatibility.NoPossibleTypesError:
-                        QtGui.QMessageBox.warning(None, "Font doesn't match any known data type", "The font '%s' wasn't recognised by CEED as any font data type known to it. Please check that the data isn't corrupted. CEGUI instance synchronisation aborted!" % (fontFilePath))
-                        return
+        lazySchemes.startPrefetch(sorted(prefetchedSchemes))
 
-                    except compatibility.MultiplePossibleTypesError as e:
-                        suitableVersion = font_compatibility.manager.getSuitableDataTypeForCEGUIVersion(project.CEGUIVersion)
+        self.lazySchemes = lazySchemes
 
-                        if suitableVersion not in e.possibleTypes:
-                            QtGui.QMessageBox.warning(None, "Incorrect font data type", "The font '%s' checked out as some potential data types, however none of these is suitable for your project's target CEGUI version '%s', please check your project settings! CEGUI instance synchronisation aborted!" % (fontFilePath, suitableVersion))
-                            return
+    def ensureSchemesLoaded(self, schemeFilePaths):
+        """Loads schemes at given normalised paths with everything they reference unless they
+        are loaded already. Does nothing unless schemes are loaded on demand, see syncToProject.
+        """
 
-                        fontRawDataType = suitableVersion
+        lazySchemes = self.lazySchemes
+        if lazySchemes is None:
+            return
 
-                    fontNativeData = font_compatibility.manager.transform(fontRawDataType, font_compatibility.manager.EditorNativeType, fontRawData)
+        schemeFilePaths = [schemeFilePath for schemeFilePath in schemeFilePaths if schemeFilePath not in lazySchemes.manifest.schemeReferences]
+        if len(schemeFilePaths) == 0:
+            return
 
-                    PyCEGUI.FontManager.getSingleton().createFromString(fontNativeData)
-                    fontIterator.next()
+        lazySchemes.finishPrefetch()
 
-                updateProgress("Loading looknfeels")
-                looknfeelIterator = scheme.getLookNFeels()
-                while not looknfeelIterator.isAtEnd():
-                    loadableUIElement = looknfeelIterator.getCurrentValue()
-                    looknfeelFilePath = project.getResourceFilePath(loadableUIElement.filename, loadableUIElement.resourceGroup if loadableUIElement.resourceGroup != "" else PyCEGUI.WidgetLookManager.getDefaultResourceGroup())
-                    looknfeelRawData = open(looknfeelFilePath, "r").read()
-                    looknfeelRawDataType = looknfeel_compatibility.manager.EditorNativeType
-                    try:
-                        looknfeelRawDataType = looknfeel_compatibility.manager.guessType(looknfeelRawData, looknfeelFilePath)
+        self.ensureIsInitialised()
+        self.makeGLContextCurrent()
 
-                    except compatibility.NoPossibleTypesError:
-                        QtGui.QMessageBox.warning(None, "LookNFeel doesn't match any known data type", "The looknfeel '%s' wasn't recognised by CEED as any looknfeel data type known to it. Please check that the data isn't corrupted. CEGUI instance synchronisation aborted!" % (looknfeelFilePath))
-                        return
+        conflictCount = len(lazySchemes.registry.conflicts)
 
-                    except compatibility.MultiplePossibleTypesError as e:
-                        suitableVersion = looknfeel_compatibility.manager.getSuitableDataTypeForCEGUIVersion(project.CEGUIVersion)
+        try:
+            for schemeFilePath in schemeFilePaths:
+                self.loadScheme(lazySchemes.project, schemeFilePath, lazySchemes.preparedResources,
+                                lazySchemes.manifest, lazySchemes.registry, lambda message: None)
 
-                        if suitableVersion not in e.possibleTypes:
-                            QtGui.QMessageBox.warning(None, "Incorrect looknfeel data type", "The looknfeel '%s' checked out as some potential data types, however none of these is suitable for your project's target CEGUI version '%s', please check your project settings! CEGUI instance synchronisation aborted!" % (looknfeelFilePath, suitableVersion))
-                            return
+        finally:
+            PyCEGUI.SchemeManager.getSingleton().setAutoLoadResources(True)
+            self.invalidateCatalogue()
 
-                        looknfeelRawDataType = suitableVersion
+        recentSkins = recentlyused.RecentlyUsed(QtGui.QApplication.instance().qsettings, "skins")
+        for schemeFilePath in schemeFilePaths:
+            for skin in lazySchemes.schemeIndex.entries[schemeFilePath].getSkins():
+                recentSkins.addRecentlyUsed(skin)
 
-                    looknfeelNativeData = looknfeel_compatibility.manager.transform(looknfeelRawDataType, looknfeel_compatibility.manager.EditorNativeType, looknfeelRawData)
+        self.reportNameConflicts(lazySchemes.registry.conflicts[conflictCount:])
 
-                    PyCEGUI.WidgetLookManager.getSingleton().parseLookNFeelSpecificationFromString(looknfeelNativeData)
-                    looknfeelIterator.next()
+    def ensureWidgetTypeAvailable(self, widgetType):
+        """Makes sure the scheme providing given widget type is loaded, see ensureSchemesLoaded"""
 
-                updateProgress("Loading window renderer factory modules")
-                scheme.loadWindowRendererFactories()
-                updateProgress("Loading window factories")
-                scheme.loadWindowFactories()
-                updateProgress("Loading factory aliases")
-                scheme.loadFactoryAliases()
-                updateProgress("Loading falagard mappings")
-                scheme.loadFalagardMappings()
+        if self.lazySchemes is None:
+            return
 
-        except:
+        schemeFilePath = self.lazySchemes.schemeIndex.getSchemeOfWindowType(widgetType)
+        if schemeFilePath is not None:
+            self.ensureSchemesLoaded([schemeFilePath])
+
+    def ensureResourcesReferencedBy(self, nativeData):
+        """Makes sure all schemes providing widget types, fonts and images that given native
+        layout or looknfeel data use are loaded, see ensureSchemesLoaded
+        """
+
+        if self.lazySchemes is None:
+            return
+
+        self.ensureSchemesLoaded(self.lazySchemes.schemeIndex.getSchemesReferencedBy(nativeData))
+
+    def syncChangedResources(self, project, progress):
+        """Recreates only resources whose files changed since they were loaded, along
+        with the schemes and looknfeels that depend on them, see ResourceManifest.planResync
+        """
+
+        from ceed.compatibility import resources
+
+        progress.setMinimum(0)
+        progress.setMaximum(0)
+        progress.setLabelText("Looking for changed resources...")
+        QtGui.QApplication.instance().processEvents()
+
+        manifest = self.manifest
+        plan = manifest.planResync(manifest.getChangedPaths())
+        if plan.isEmpty():
+            return
+
+        progress.setLabelText("Preparing changed resources...")
+        QtGui.QApplication.instance().processEvents()
+
+        # windows may point to anything we are about to destroy
+        self.destroyAllWindows()
+
+        preparedResources = self.prepareProjectResources(project, plan.schemes, additionalResources =
+                                                         [(resources.IMAGESET, path) for path in plan.imagesets] +
+                                                         [(resources.FONT, path) for path in plan.fonts] +
+                                                         [(resources.LOOKNFEEL, path) for path in plan.looknfeels])
+        if preparedResources is None:
+            # the user was told what's wrong, the instance is only partially in sync now
             self.cleanCEGUIResources()
-            raise
+            return
 
-        finally:
-            # put SchemeManager into the default state again
-            PyCEGUI.SchemeManager.getSingleton().setAutoLoadResources(True)
+        # everything that stays loaded, recreated resources are registered again as they are loaded
+        recreatedPaths = set(plan.schemes + plan.imagesets + plan.fonts + plan.looknfeels)
+        for schemeFilePath in plan.schemes:
+            recreatedPaths.update(manifest.schemeReferences[schemeFilePath])
+
+        registry = resources.ResourceRegistry()
+        for path, entry in manifest.entries.iteritems():
+            if path not in recreatedPaths:
+                registry.register(entry.kind, path, entry.names)
+
+        progress.setMaximum(len(plan.imagesets) + len(plan.fonts) + len(plan.looknfeels) + 10 * len(plan.schemes))
+        progress.setValue(0)
+
+        def updateProgress(message):
+            progress.setValue(progress.value() + 1)
+            progress.setLabelText("Recreating changed resources...\n\n%s" % (message))
 
-            progress.reset()
             QtGui.QApplication.instance().processEvents()
 
+        for schemeFilePath in plan.schemes:
+            updateProgress("Destroying scheme '%s'" % (os.path.basename(schemeFilePath)))
+
+            # CEGUI unloads imagesets, fonts and factories of the scheme but leaves its WidgetLooks alone
+            for path in manifest.schemeReferences[schemeFilePath]:
+                if path in manifest.entries and manifest.entries[path].kind == resources.LOOKNFEEL:
+                    self.eraseWidgetLooks(manifest.entries[path].names)
+
+            PyCEGUI.SchemeManager.getSingleton().destroy(manifest.entries[schemeFilePath].names[0])
+
+        for path in plan.imagesets:
+            updateProgress("Reloading imageset '%s'" % (os.path.basename(path)))
+
+            manifest.recreateResource(preparedResources[path], registry,
+                                      PyCEGUI.ImageManager.getSingleton().destroyImageCollection,
+                                      PyCEGUI.ImageManager.getSingleton().loadImagesetFromString)
+
+        for path in plan.fonts:
+            updateProgress("Reloading font '%s'" % (os.path.basename(path)))
+
+            # one font file can define several fonts
+            manifest.recreateResource(preparedResources[path], registry,
+                                      PyCEGUI.FontManager.getSingleton().destroy,
+                                      PyCEGUI.FontManager.getSingleton().createFromString)
+
+        for schemeFilePath in plan.schemes:
+            def updateSchemeProgress(message):
+                updateProgress("%s\n\n%s" % (os.path.basename(schemeFilePath), message))
+
+            self.loadScheme(project, schemeFilePath, preparedResources, manifest, registry, updateSchemeProgress)
+
+        # looknfeels go last, WidgetLooks resolve images when they are parsed
+        for path in plan.looknfeels:
+            updateProgress("Reloading looknfeel '%s'" % (os.path.basename(path)))
+
+            self.eraseWidgetLooks(manifest.entries[path].names)
+            if registry.register(resources.LOOKNFEEL, path, preparedResources[path].names):
+                PyCEGUI.WidgetLookManager.getSingleton().parseLookNFeelSpecificationFromString(preparedResources[path].nativeData)
+            manifest.addResource(preparedResources[path])
+
+        # recreated schemes might have stopped referencing some resources
+        manifest.removeUnreferencedResources()
+
+        self.reportNameConflicts(registry.conflicts)
+
+    def reportNameConflicts(self, conflicts):
+        """Warns the user about resources that weren't loaded because of conflicting names,
+        see ResourceRegistry
+        """
+
+        if len(conflicts) == 0:
+            return
+
+        maximumListed = 20
+        details = "\n".join(" - %s" % (conflict) for conflict in conflicts[:maximumListed])
+        if len(conflicts) > maximumListed:
+            details += "\n - ... and %i more" % (len(conflicts) - maximumListed)
+
+        QtGui.QMessageBox.warning(None, "Conflicting resource names",
+                                  "Some resources of the project define the same names as resources loaded before them, "
+                                  "CEGUI would replace the previous definitions so they were left out:\n\n%s" % (details))
+
+    def eraseWidgetLooks(self, names):
+        widgetLookManager = PyCEGUI.WidgetLookManager.getSingleton()
+
+        for name in names:
+            if widgetLookManager.isWidgetLookAvailable(name):
+                widgetLookManager.eraseWidgetLook(name)
+
+    def loadScheme(self, project, schemeFilePath, preparedResources, manifest, registry, updateProgress):
+        """Creates scheme at given path and loads everything it references from preparedResources,
+        see prepareProjectResources. Records everything that was loaded in given manifest.
+
+        Resources already in given ResourceRegistry are reused, resources with conflicting
+        names are left out (the registry remembers them).
+
+        updateProgress is called with a message before each of the 9 steps.
+        """
+
+        from ceed.compatibility import resources
+
+        def getNativeData(kind, filePath):
+            """Returns native data of given resource, None if it's not supposed to be loaded"""
+
+            filePath = resources.normalisePath(filePath)
+            if kind != resources.SCHEME:
+                referencedPaths.append(filePath)
+
+            if registry.isRegistered(filePath):
+                return None
+
+            preparedResource = preparedResources.get(filePath)
+            if preparedResource is None:
+                # the scheme references something we didn't anticipate, prepare it right here
+                preparedResource = resources.prepareResource(kind, filePath, project.CEGUIVersion)
+
+            if preparedResource.hasError():
+                raise RuntimeError(preparedResource.errorMessage)
+
+            if not registry.register(kind, filePath, preparedResource.names):
+                return None
+
+            manifest.addResource(preparedResource)
+
+            return preparedResource.nativeData
+
+        referencedPaths = []
+
+        # we will load resources manually to be able to use the compatibility layer machinery
+        PyCEGUI.SchemeManager.getSingleton().setAutoLoadResources(False)
+
+        updateProgress("Parsing the scheme file")
+        schemeNativeData = getNativeData(resources.SCHEME, schemeFilePath)
+        if schemeNativeData is None:
+            # another scheme of the same name is loaded already
+            manifest.setSchemeReferences(schemeFilePath, [])
+            return
+
+        scheme = PyCEGUI.SchemeManager.getSingleton().createFromString(schemeNativeData)
+
+        # NOTE: This is very CEGUI implementation specific unfortunately!
+        #
+        #       However I am not really sure how to do this any better.
+
+        updateProgress("Loading XML imagesets")
+        xmlImagesetIterator = scheme.getXMLImagesets()
+        while not xmlImagesetIterator.isAtEnd():
+            loadableUIElement = xmlImagesetIterator.getCurrentValue()
+            imagesetFilePath = project.getResourceFilePath(loadableUIElement.filename, loadableUIElement.resourceGroup if loadableUIElement.resourceGroup != "" else PyCEGUI.ImageManager.getImagesetDefaultResourceGroup())
+
+            nativeData = getNativeData(resources.IMAGESET, imagesetFilePath)
+            if nativeData is not None:
+                PyCEGUI.ImageManager.getSingleton().loadImagesetFromString(nativeData)
+            xmlImagesetIterator.next()
+
+        updateProgress("Loading image file imagesets")
+        scheme.loadImageFileImagesets()
+
+        updateProgress("Loading fonts")
+        fontIterator = scheme.getFonts()
+        while not fontIterator.isAtEnd():
+            loadableUIElement = fontIterator.getCurrentValue()
+            fontFilePath = project.getResourceFilePath(loadableUIElement.filename, loadableUIElement.resourceGroup if loadableUIElement.resourceGroup != "" else PyCEGUI.Font.getDefaultResourceGroup())
+
+            nativeData = getNativeData(resources.FONT, fontFilePath)
+            if nativeData is not None:
+                PyCEGUI.FontManager.getSingleton().createFromString(nativeData)
+            fontIterator.next()
+
+        updateProgress("Loading looknfeels")
+        looknfeelIterator = scheme.getLookNFeels()
+        while not looknfeelIterator.isAtEnd():
+            loadableUIElement = looknfeelIterator.getCurrentValue()
+            looknfeelFilePath = project.getResourceFilePath(loadableUIElement.filename, loadableUIElement.resourceGroup if loadableUIElement.resourceGroup != "" else PyCEGUI.WidgetLookManager.getDefaultResourceGroup())
+
+            nativeData = getNativeData(resources.LOOKNFEEL, looknfeelFilePath)
+            if nativeData is not None:
+                PyCEGUI.WidgetLookManager.getSingleton().parseLookNFeelSpecificationFromString(nativeData)
+            looknfeelIterator.next()
+
+        updateProgress("Loading window renderer factory modules")
+        scheme.loadWindowRendererFactories()
+        updateProgress("Loading window factories")
+        scheme.loadWindowFactories()
+        updateProgress("Loading factory aliases")
+        scheme.loadFactoryAliases()
+        updateProgress("Loading falagard mappings")
+        scheme.loadFalagardMappings()
+
+        manifest.setSchemeReferences(schemeFilePath, referencedPaths)
+
+    def prepareProjectResources(self, project, schemeFilePaths, progressCallback = None, additionalResources = []):
+        """Reads, detects data types of and converts schemes at given absolute paths and all
+        resources they reference to the native data types, in parallel worker processes. Nothing
+        is handed over to CEGUI yet, that has to happen serially in the GL thread.
+
+        additionalResources is a list of (kind, absolutePath) tuples of resources that should
+        be prepared as well. progressCallback is called with each PreparedResource and the number
+        of resources that remain to be prepared.
+
+        Returns a dict mapping absolute file paths to PreparedResources, or None if any of
+        the resources can't be used. The user is warned about the reason in that case.
+        """
+
+        from ceed.compatibility import resources
+
+        def prepare(resourcesToPrepare):
+            ret = {}
+
+            for preparedResource in resources.prepareResources(resourcesToPrepare, project.CEGUIVersion):
+                if preparedResource.hasError():
+                    QtGui.QMessageBox.warning(None, preparedResource.errorTitle, preparedResource.errorMessage)
+                    return None
+
+                ret[preparedResource.path] = preparedResource
+
+                if progressCallback is not None:
+                    progressCallback(preparedResource, len(resourcesToPrepare) - len(ret))
+
+            return ret
+
+        preparedSchemes = prepare([(resources.SCHEME, schemeFilePath) for schemeFilePath in schemeFilePaths])
+        if preparedSchemes is None:
+            return None
+
+        # schemes often share resources, each of them is prepared only once
+        referencedResources = []
+        seenPaths = set()
+
+        for kind, filePath in additionalResources:
+            if filePath not in seenPaths:
+                seenPaths.add(filePath)
+                referencedResources.append((kind, filePath))
+
+        for schemeFilePath in schemeFilePaths:
+            for kind, filename, resourceGroup in resources.getSchemeReferences(preparedSchemes[schemeFilePath].nativeData):
+                filePath = resources.normalisePath(project.getResourceFilePath(filename, resourceGroup))
+
+                if filePath not in seenPaths:
+                    seenPaths.add(filePath)
+                    referencedResources.append((kind, filePath))
+
+        preparedReferences = prepare(referencedResources)
+        if preparedReferences is None:
+            return None
+
+        preparedReferences.update(preparedSchemes)
+        return preparedReferences
+
+    def invalidateCatalogue(self):
+        """Forgets cached results of the getAvailable* methods, has to be called whenever
+        schemes, imagesets or fonts are created or destroyed
+        """
+
+        self.catalogue = {}
+
+    def getCatalogueEntry(self, name, query):
+        """Returns cached result of given query, calling it only if it isn't cached"""
+
+        if name not in self.catalogue:
+            self.catalogue[name] = query()
+
+        return self.catalogue[name]
+
     def getAvailableSkins(self):
         """Retrieves skins (as strings representing their names) that are available
         from the set of schemes that were loaded.
 
+        The result is cached until the next synchronisation, don't modify it.
+
         see syncToProject
         """
 
-        skins = []
+        return self.getCatalogueEntry("skins", self.queryAvailableSkins)
+
+    def queryAvailableSkins(self):
+        if self.lazySchemes is not None:
+            # skins of schemes that weren't loaded yet are listed as well
+            return self.lazySchemes.schemeIndex.getSkins()
+
+        from ceed.editors.looknfeel.tabbed_editor import LookNFeelTabbedEditor
+        ceedInternalEditingPrefix = LookNFeelTabbedEditor.getEditorIDStringPrefix()
+
+        skins = set()
 
         it = PyCEGUI.WindowFactoryManager.getSingleton().getFalagardMappingIterator()
         while not it.isAtEnd():
             currentSkin = it.getCurrentValue().d_windowType.split('/')[0]
 
-            from ceed.editors.looknfeel.tabbed_editor import LookNFeelTabbedEditor
-            ceedInternalEditingPrefix = LookNFeelTabbedEditor.getEditorIDStringPrefix()
-            ceedInternalLNF = False
-            if currentSkin.startswith(ceedInternalEditingPrefix):
-                ceedInternalLNF = True
-
-            if currentSkin not in skins and not ceedInternalLNF:
-                skins.append(currentSkin)
+            if not currentSkin.startswith(ceedInternalEditingPrefix):
+                skins.add(currentSkin)
 
             it.next()
 
@@ -412,9 +838,15 @@ class Instance(object):
         """Retrieves fonts (as strings representing their names) that are available
         from the set of schemes that were loaded.
 
+        Schemes loaded on demand only contribute their fonts once they are loaded.
+        The result is cached until the next synchronisation, don't modify it.
+
         see syncToProject
         """
 
+        return self.getCatalogueEntry("fonts", self.queryAvailableFonts)
+
+    def queryAvailableFonts(self):
         fonts = []
 
         it = PyCEGUI.FontManager.getSingleton().getIterator()
@@ -428,9 +860,15 @@ class Instance(object):
         """Retrieves images (as strings representing their names) that are available
         from the set of schemes that were loaded.
 
+        Schemes loaded on demand only contribute their images once they are loaded.
+        The result is cached until the next synchronisation, don't modify it.
+
         see syncToProject
         """
 
+        return self.getCatalogueEntry("images", self.queryAvailableImages)
+
+    def queryAvailableImages(self):
         images = []
 
         it = PyCEGUI.ImageManager.getSingleton().getIterator()
@@ -440,17 +878,54 @@ class Instance(object):
 
         return sorted(images)
 
+    def getAvailableImagesWithPrefix(self, prefix, limit = None):
+        """Retrieves sorted names of available images starting with given prefix,
+        at most limit of them if it isn't None.
+
+        Looks the images up in the sorted list of all images instead of scanning it,
+        useful for filtering image names as the user types.
+
+        see getAvailableImages
+        """
+
+        images = self.getAvailableImages()
+
+        ret = []
+
+        index = bisect.bisect_left(images, prefix)
+        while index < len(images) and images[index].startswith(prefix):
+            if limit is not None and len(ret) >= limit:
+                break
+
+            ret.append(images[index])
+            index += 1
+
+        return ret
+
     def getAvailableWidgetsBySkin(self):
         """Retrieves all mappings (string names) of all widgets that can be created
 
+        The result is cached until the next synchronisation, don't modify it.
+
         see syncToProject
         """
 
+        return self.getCatalogueEntry("widgetsBySkin", self.queryAvailableWidgetsBySkin)
+
+    def queryAvailableWidgetsBySkin(self):
         ret = {}
         ret["__no_skin__"] = ["DefaultWindow", "DragContainer",
                               "VerticalLayoutContainer", "HorizontalLayoutContainer",
                               "GridLayoutContainer"]
 
+        if self.lazySchemes is not None:
+            # widgets of schemes that weren't loaded yet are listed as well
+            ret.update(self.lazySchemes.schemeIndex.getWidgetsBySkin())
+            return ret
+
+        from ceed.editors.looknfeel.tabbed_editor import LookNFeelTabbedEditor
+        ceedInternalEditingPrefix = LookNFeelTabbedEditor.getEditorIDStringPrefix()
+
         it = PyCEGUI.WindowFactoryManager.getSingleton().getFalagardMappingIterator()
         while not it.isAtEnd():
             #base = it.getCurrentValue().d_baseType
@@ -460,13 +935,7 @@ class Instance(object):
             look = mappedType[0]
             widget = mappedType[1]
 
-            from ceed.editors.looknfeel.tabbed_editor import LookNFeelTabbedEditor
-            ceedInternalEditingPrefix = LookNFeelTabbedEditor.getEditorIDStringPrefix()
-            ceedInternalLNF = False
-            if look.startswith(ceedInternalEditingPrefix):
-                ceedInternalLNF = True
-
-            if not ceedInternalLNF:
+            if not look.startswith(ceedInternalEditingPrefix):
                 # insert empty list for the look if it's a new look
                 if not look in ret:
                     ret[look] = []
@@ -482,13 +951,54 @@ class Instance(object):
 
         return ret
 
+    def getPreviewImageCache(self):
+        """Returns PreviewImageCache used by getWidgetPreviewImage, respecting the disk cache setting"""
+
+        diskDirectory = None
+        if settings.getEntry("cegui/resources/preview_disk_cache").value:
+            diskDirectory = os.path.join(QtGui.QDesktopServices.storageLocation(QtGui.QDesktopServices.CacheLocation), "widget_previews")
+
+        if self.previewImageCache is None or self.previewImageCache.diskDirectory != diskDirectory:
+            self.previewImageCache = previewcache.PreviewImageCache(diskDirectory = diskDirectory)
+
+        return self.previewImageCache
+
+    def getWidgetPreviewSourceHash(self, widgetType):
+        """Returns hash of the resource files the look of given widget type comes from,
+        None if they aren't known (the preview can't be cached in that case)
+        """
+
+        manifest = self.lazySchemes.manifest if self.lazySchemes is not None else self.manifest
+        if manifest is None:
+            return None
+
+        windowFactoryManager = PyCEGUI.WindowFactoryManager.getSingleton()
+
+        widgetType = windowFactoryManager.getDereferencedAlias(widgetType)
+        if not windowFactoryManager.isFalagardMappedType(widgetType):
+            return None
+
+        return manifest.getWidgetLookSourceHash(windowFactoryManager.getMappedLookForType(widgetType))
+
     def getWidgetPreviewImage(self, widgetType, previewWidth = 128, previewHeight = 64):
         """Renders and retrieves a widget preview image (as QImage).
 
-        This is useful for various widget selection lists as a preview.
+        This is useful for various widget selection lists as a preview. Previews are
+        cached, they are only rendered again when the resources they come from change.
         """
 
         self.ensureIsInitialised()
+        self.ensureWidgetTypeAvailable(widgetType)
+
+        cacheKey = None
+        sourceHash = self.getWidgetPreviewSourceHash(widgetType)
+        if sourceHash is not None:
+            cacheKey = previewcache.PreviewImageCache.makeKey(widgetType, previewWidth, previewHeight, sourceHash)
+
+            cachedImage = self.getPreviewImageCache().get(cacheKey)
+            if cachedImage is not None:
+                return cachedImage
+
         self.makeGLContextCurrent()
 
         system = PyCEGUI.System.getSingleton()
@@ -523,4 +1033,14 @@ class Instance(object):
             temporaryFBO.release()
             PyCEGUI.WindowManager.getSingleton().destroyWindow(widgetInstance)
 
-        return temporaryFBO.toImage()
+        image = temporaryFBO.toImage()
+        if cacheKey is not None:
+            self.getPreviewImageCache().put(cacheKey, image)
+
+        return image
+
+from ceed import settings
+from ceed import recentlyused
+from ceed import frametiming
+from ceed import startupprofile
+from ceed.cegui import previewcache
@@ -79,6 +79,16 @@ class DebugInfo(QtGui.QDialog):
         self.currentFPSBox = self.findChild(QtGui.QLineEdit, "currentFPSBox")
         self.currentRenderTimeBox = self.findChild(QtGui.QLineEdit, "currentRenderTimeBox")
 
+        self.frameTimingsView = self.findChild(QtGui.QPlainTextEdit, "frameTimingsView")
+        # the summary is a plain text table
+        monospaceFont = QtGui.QFont("Monospace")
+        monospaceFont.setStyleHint(QtGui.QFont.TypeWriter)
+        self.frameTimingsView.setFont(monospaceFont)
+        self.resetFrameTimingsButton = self.findChild(QtGui.QPushButton, "resetFrameTimingsButton")
+        self.resetFrameTimingsButton.clicked.connect(self.slot_resetFrameTimings)
+        self.exportFrameTimingsButton = self.findChild(QtGui.QPushButton, "exportFrameTimingsButton")
+        self.exportFrameTimingsButton.clicked.connect(self.slot_exportFrameTimings)
+
         self.errors = 0
         self.errorsBox = self.findChild(QtGui.QLineEdit, "errorsBox")
 
@@ -156,8 +166,25 @@ font-size: 10px;
 
         self.currentFPSBox.setText("%0.6f" % (1.0 / lastRenderDelta))
 
+        self.frameTimingsView.setPlainText(self.containerWidget.ceguiInstance.frameTimings.formatSummary())
+
         QtCore.QTimer.singleShot(500, self.updateFPSTick)
 
+    def slot_resetFrameTimings(self):
+        self.containerWidget.ceguiInstance.frameTimings.reset()
+
+    def slot_exportFrameTimings(self):
+        fileName, _ = QtGui.QFileDialog.getSaveFileName(self, "Export frame timings", "frame_timings.csv", "CSV files (*.csv)")
+        if fileName == "":
+            return
+
+        try:
+            with open(fileName, "w") as f:
+                self.containerWidget.ceguiInstance.frameTimings.export(f)
+
+        except IOError as e:
+            QtGui.QMessageBox.warning(self, "Can't export frame timings", "Writing '%s' failed: %s" % (fileName, e))
+
 # we import here to avoid circular dependencies (GraphicsView has to be defined at this point)
 import ceed.ui.ceguicontainerwidget
 
@@ -185,6 +212,8 @@ class ContainerWidget(QtGui.QWidget):
         self.ui.setupUi(self)
 
         self.currentParentWidget = None
+        # scene activate created because none was given, it's thrown away on deactivate
+        self.temporaryScene = None
 
         self.debugInfo = DebugInfo(self)
         self.view = self.findChild(qtgraphics.GraphicsView, "view")
@@ -248,6 +277,7 @@ class ContainerWidget(QtGui.QWidget):
 
         if scene is None:
             scene = qtgraphics.GraphicsScene(self.ceguiInstance)
+            self.temporaryScene = scene
 
         self.currentParentWidget.setUpdatesEnabled(False)
         self.view.setScene(scene)
@@ -285,6 +315,11 @@ class ContainerWidget(QtGui.QWidget):
         # back to the defaults
         self.setViewFeatures()
         self.view.setScene(None)
+        if self.temporaryScene is not None:
+            # editors keep their scenes (and the FBOs of them) across deactivate/activate and release
+            # them when they are destroyed, nothing else references the temporary scene though
+            self.temporaryScene.releaseFBO()
+            self.temporaryScene = None
 
         if self.currentParentWidget.layout():
             self.currentParentWidget.layout().removeWidget(self)
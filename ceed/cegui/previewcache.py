@@ -0,0 +1,94 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+from PySide import QtGui
+
+import collections
+import hashlib
+import os
+
+class PreviewImageCache(object):
+    """Caches rendered widget preview images, see cegui.Instance.getWidgetPreviewImage
+
+    Images are kept in memory, the least recently used ones are dropped first when
+    there are too many of them. If diskDirectory is given, images are also stored there
+    as PNG files so that they survive restarting the application.
+
+    Keys contain a hash of the resource files the preview was rendered from, previews
+    of changed resources are therefore never returned and the cache doesn't need to
+    be invalidated when resources change.
+    """
+
+    def __init__(self, maximumEntries = 512, diskDirectory = None):
+        self.maximumEntries = maximumEntries
+        self.diskDirectory = diskDirectory
+
+        # key -> QImage, in the order of use, least recently used first
+        self.images = collections.OrderedDict()
+
+    @staticmethod
+    def makeKey(widgetType, width, height, sourceHash):
+        return (widgetType, width, height, sourceHash)
+
+    def getDiskPath(self, key):
+        return os.path.join(self.diskDirectory, "%s.png" % (hashlib.md5(repr(key)).hexdigest()))
+
+    def get(self, key):
+        """Returns cached QImage of given key, None if there is none"""
+
+        image = self.images.pop(key, None)
+
+        if image is None and self.diskDirectory is not None:
+            diskPath = self.getDiskPath(key)
+            if os.path.exists(diskPath):
+                image = QtGui.QImage(diskPath)
+                if image.isNull():
+                    image = None
+
+        if image is not None:
+            self.images[key] = image
+            self.trim()
+
+        return image
+
+    def put(self, key, image):
+        self.images.pop(key, None)
+        self.images[key] = image
+        self.trim()
+
+        if self.diskDirectory is not None:
+            try:
+                if not os.path.exists(self.diskDirectory):
+                    os.makedirs(self.diskDirectory)
+
+                image.save(self.getDiskPath(key), "PNG")
+
+            except (IOError, OSError):
+                # the disk cache is just an optimisation, it's fine if it can't be written
+                pass
+
+    def trim(self):
+        while len(self.images) > self.maximumEntries:
+            self.images.popitem(last = False)
+
+    def clear(self):
+        """Forgets all images held in memory, the disk cache stays intact"""
+
+        self.images.clear()
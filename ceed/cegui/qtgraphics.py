@@ -31,6 +31,7 @@ import PyCEGUI
 from ceed import resizable
 from ceed import cegui
 from ceed import qtwidgets
+from ceed import frametiming
 
 class GraphicsScene(QtGui.QGraphicsScene):
     """A scene that draws CEGUI as it's background.
@@ -53,8 +54,14 @@ class GraphicsScene(QtGui.QGraphicsScene):
 
         self.timeOfLastRender = time.time()
         self.lastDelta = 0
+        self.timeOfLastTimePulse = time.time()
 
         self.fbo = None
+        # if False, the FBO holds what CEGUI would render and it's just drawn again
+        self.ceguiDirty = True
+        # display list drawing the FBO texture and the FBO size it was compiled for, see drawFBO
+        self.fboDisplayList = None
+        self.fboDisplayListSize = None
 
         self.checkerWidth = settings.getEntry("cegui/background/checker_width")
         self.checkerHeight = settings.getEntry("cegui/background/checker_height")
@@ -69,7 +76,136 @@ class GraphicsScene(QtGui.QGraphicsScene):
         if not lazyUpdate:
             PyCEGUI.System.getSingleton().notifyDisplaySizeChanged(self.ceguiDisplaySize)
 
+        # the FBO can be reused unless its size has to change
+        if self.fbo is not None and self.fbo.size() != self.getDesiredFBOSize():
+            self.releaseFBO()
+
+        self.ceguiDirty = True
+
+    def releaseFBO(self):
+        """Releases the FBO and the display list drawing it, they are created again when needed.
+
+        Call this when the scene is about to be thrown away, nothing frees the GL resources otherwise.
+        Scenes that are only hidden for a while should keep them, recreating them is not cheap.
+        """
+
+        if self.fbo is None and self.fboDisplayList is None:
+            return
+
+        # the FBO is freed when the last reference goes away, the context has to be current for that too
+        self.ceguiInstance.makeGLContextCurrent()
+
+        if self.fboDisplayList is not None:
+            GL.glDeleteLists(self.fboDisplayList, 1)
+
+            self.fboDisplayList = None
+            self.fboDisplayListSize = None
+
         self.fbo = None
+        self.ceguiDirty = True
+
+    def getDesiredFBOSize(self):
+        return QtCore.QSize(math.ceil(self.ceguiDisplaySize.d_width), math.ceil(self.ceguiDisplaySize.d_height))
+
+    def markCEGUIDirty(self):
+        """Makes the next drawBackground render CEGUI again instead of reusing the last rendering.
+
+        CEGUI knows when its windows change, this is needed for changes it doesn't track
+        (mouse cursor movement for example).
+        """
+
+        self.ceguiDirty = True
+        self.update()
+
+    def injectTimePulse(self):
+        system = PyCEGUI.System.getSingleton()
+
+        delta = time.time() - self.timeOfLastTimePulse
+        system.injectTimePulse(delta)
+        system.getDefaultGUIContext().injectTimePulse(delta)
+        self.timeOfLastTimePulse = time.time()
+
+    def hasRunningAnimations(self):
+        animationManager = PyCEGUI.AnimationManager.getSingleton()
+
+        for i in xrange(animationManager.getNumAnimationInstances()):
+            if animationManager.getAnimationInstanceAtIdx(i).isRunning():
+                return True
+
+        return False
+
+    def isCEGUIDirty(self):
+        """Checks whether CEGUI has to be rendered again, see markCEGUIDirty"""
+
+        if self.ceguiDirty or self.fbo is None:
+            return True
+
+        # property edits, moved and resized widgets, ... invalidate the windows which marks the context dirty
+        if PyCEGUI.System.getSingleton().getDefaultGUIContext().isDirty():
+            return True
+
+        return self.hasRunningAnimations()
+
+    def needsRendering(self):
+        """Lets time pass in CEGUI (animations, tooltips, ...) and checks whether
+        that or anything else requires rendering it again
+        """
+
+        if not self.ceguiInstance.initialised:
+            return False
+
+        self.injectTimePulse()
+
+        return self.isCEGUIDirty()
+
+    def drawFBO(self):
+        """Draws a quad of the FBO size textured with the currently bound texture.
+
+        The quad is compiled into a display list which is only recompiled when the FBO size changes.
+        """
+
+        size = (self.fbo.size().width(), self.fbo.size().height())
+
+        if self.fboDisplayList is None:
+            self.fboDisplayList = GL.glGenLists(1)
+            self.fboDisplayListSize = None
+
+        if self.fboDisplayListSize != size:
+            width, height = size
+
+            GL.glNewList(self.fboDisplayList, GL.GL_COMPILE)
+            GL.glBegin(GL.GL_TRIANGLES)
+
+            # top left
+            GL.glTexCoord2f(0, 1)
+            GL.glVertex3f(0, 0, 0)
+
+            # top right
+            GL.glTexCoord2f(1, 1)
+            GL.glVertex3f(width, 0, 0)
+
+            # bottom right
+            GL.glTexCoord2f(1, 0)
+            GL.glVertex3f(width, height, 0)
+
+            # bottom right
+            GL.glTexCoord2f(1, 0)
+            GL.glVertex3f(width, height, 0)
+
+            # bottom left
+            GL.glTexCoord2f(0, 0)
+            GL.glVertex3f(0, height, 0)
+
+            # top left
+            GL.glTexCoord2f(0, 1)
+            GL.glVertex3f(0, 0, 0)
+
+            GL.glEnd()
+            GL.glEndList()
+
+            self.fboDisplayListSize = size
+
+        GL.glCallList(self.fboDisplayList)
 
     def drawBackground(self, painter, rect):
         """We override this and draw CEGUI instead of the whole background.
@@ -90,11 +226,8 @@ class GraphicsScene(QtGui.QGraphicsScene):
 
             return
 
-        system = PyCEGUI.System.getSingleton()
         self.lastDelta = time.time() - self.timeOfLastRender
         self.ceguiInstance.lastRenderTimeDelta = self.lastDelta
-        system.injectTimePulse(self.lastDelta)
-        system.getDefaultGUIContext().injectTimePulse(self.lastDelta)
         self.timeOfLastRender = time.time()
 
         painter.setPen(QtGui.QPen(QtCore.Qt.transparent))
@@ -106,30 +239,47 @@ class GraphicsScene(QtGui.QGraphicsScene):
 
         self.ceguiInstance.ensureIsInitialised()
 
-        if self.ceguiDisplaySize != PyCEGUI.System.getSingleton().getRenderer().getDisplaySize():
-            # FIXME: Change when multi root is in CEGUI core
-            PyCEGUI.System.getSingleton().notifyDisplaySizeChanged(self.ceguiDisplaySize)
+        frameTimings = self.ceguiInstance.frameTimings
 
-        # markAsDirty is called on the default GUI context to work around potential issues with dangling
-        # references in the rendering code for some versions of CEGUI.
-        system.getDefaultGUIContext().markAsDirty()
+        system = PyCEGUI.System.getSingleton()
+        phaseStart = time.time()
+        self.injectTimePulse()
+        frameTimings.addPhaseTime(frametiming.TIME_PULSE, time.time() - phaseStart)
+
+        if self.ceguiDisplaySize != system.getRenderer().getDisplaySize():
+            # FIXME: Change when multi root is in CEGUI core
+            system.notifyDisplaySizeChanged(self.ceguiDisplaySize)
+            self.ceguiDirty = True
 
         # we have to render to FBO and then scale/translate that since CEGUI doesn't allow
         # scaling the whole rendering root directly
 
-        # this makes sure the FBO is the correct size
-        if not self.fbo:
-            desiredSize = QtCore.QSize(math.ceil(self.ceguiDisplaySize.d_width), math.ceil(self.ceguiDisplaySize.d_height))
-            self.fbo = QtOpenGL.QGLFramebufferObject(desiredSize, GL.GL_TEXTURE_2D)
+        # CEGUI is only rendered again if something changed, the FBO is drawn either way
+        if self.isCEGUIDirty():
+            # markAsDirty is called on the default GUI context to work around potential issues with dangling
+            # references in the rendering code for some versions of CEGUI.
+            system.getDefaultGUIContext().markAsDirty()
 
-        self.fbo.bind()
+            # this makes sure the FBO is the correct size
+            if not self.fbo:
+                self.fbo = QtOpenGL.QGLFramebufferObject(self.getDesiredFBOSize(), GL.GL_TEXTURE_2D)
 
-        GL.glClearColor(0, 0, 0, 0)
-        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+            phaseStart = time.time()
 
-        system.renderAllGUIContexts()
+            self.fbo.bind()
 
-        self.fbo.release()
+            GL.glClearColor(0, 0, 0, 0)
+            GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+
+            system.renderAllGUIContexts()
+
+            self.fbo.release()
+
+            self.ceguiDirty = False
+
+            frameTimings.addPhaseTime(frametiming.CEGUI_RENDERING, time.time() - phaseStart)
+
+        phaseStart = time.time()
 
         # the stretch and translation should be done automatically by QPainter at this point so just
         # this code will do
@@ -142,43 +292,9 @@ class GraphicsScene(QtGui.QGraphicsScene):
         GL.glEnable(GL.GL_BLEND)
         GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
 
-        # TODO: I was told that this is the slowest method to draw with OpenGL,
-        #       with which I certainly agree.
-        #
-        #       No profiling has been done at all and I don't suspect this to be
-        #       a painful performance problem.
-        #
-        #       Still, changing this to a less pathetic rendering method would be great.
-
-        GL.glBegin(GL.GL_TRIANGLES)
-
-        # top left
-        GL.glTexCoord2f(0, 1)
-        GL.glVertex3f(0, 0, 0)
-
-        # top right
-        GL.glTexCoord2f(1, 1)
-        GL.glVertex3f(self.fbo.size().width(), 0, 0)
-
-        # bottom right
-        GL.glTexCoord2f(1, 0)
-        GL.glVertex3f(self.fbo.size().width(), self.fbo.size().height(), 0)
-
-        # bottom right
-        GL.glTexCoord2f(1, 0)
-        GL.glVertex3f(self.fbo.size().width(), self.fbo.size().height(), 0)
+        self.drawFBO()
 
-        # bottom left
-        GL.glTexCoord2f(0, 0)
-        GL.glVertex3f(0, self.fbo.size().height(), 0)
-
-        # top left
-        GL.glTexCoord2f(0, 1)
-        GL.glVertex3f(0, 0, 0)
-
-        system.getDefaultGUIContext().markAsDirty()
-
-        GL.glEnd()
+        frameTimings.addPhaseTime(frametiming.FBO_BLIT, time.time() - phaseStart)
 
         painter.endNativePainting()
 
@@ -215,27 +331,75 @@ class GraphicsView(resizable.GraphicsView, cegui.GLContextProvider):
         self.continuousRendering = True
         # only applies when we are rendering continuously, it's the max FPS that we will try to achieve
         self.continuousRenderingTargetFPS = 60
+        # when rendering continuously and nothing changes, CEGUI is checked for changes this often (in milliseconds),
+        # nothing is repainted until something does change
+        self.continuousRenderingIdleInterval = 50
+        # whether continueRendering is already scheduled
+        self.continuousRenderingScheduled = False
 
     def makeGLContextCurrent(self):
         self.viewport().makeCurrent()
 
+    def paintEvent(self, event):
+        scene = self.scene()
+        if scene is None:
+            super(GraphicsView, self).paintEvent(event)
+            return
+
+        # the scene adds times of the CEGUI phases, the rest of the frame is Qt painting
+        frameTimings = scene.ceguiInstance.frameTimings
+        frameTimings.beginFrame()
+        frameStart = time.time()
+
+        try:
+            super(GraphicsView, self).paintEvent(event)
+
+        finally:
+            frameTimings.endFrame(time.time() - frameStart)
+
     def drawBackground(self, painter, rect):
         super(GraphicsView, self).drawBackground(painter, rect)
 
         if self.continuousRendering:
-            if self.continuousRenderingTargetFPS <= 0:
-                self.updateSelfAndScene()
+            if not self.continuousRenderingScheduled:
+                self.continuousRenderingScheduled = True
 
-            else:
-                # * 1000 because QTimer thinks in milliseconds
-                lastDelta = self.scene().lastDelta if self.scene() is not None else 0
-                QtCore.QTimer.singleShot(max(0, ((1.0 / self.continuousRenderingTargetFPS) - lastDelta) * 1000),
-                                         self.updateSelfAndScene)
+                if self.continuousRenderingTargetFPS <= 0:
+                    QtCore.QTimer.singleShot(0, self.continueRendering)
+
+                else:
+                    # * 1000 because QTimer thinks in milliseconds
+                    lastDelta = self.scene().lastDelta if self.scene() is not None else 0
+                    QtCore.QTimer.singleShot(max(0, ((1.0 / self.continuousRenderingTargetFPS) - lastDelta) * 1000),
+                                             self.continueRendering)
 
         else:
             # we don't mark ourselves as dirty if user didn't request continuous rendering
             pass
 
+    def continueRendering(self):
+        """Repaints if CEGUI changed since the last frame, otherwise checks again later"""
+
+        self.continuousRenderingScheduled = False
+
+        scene = self.scene()
+        if not self.continuousRendering or scene is None:
+            return
+
+        if scene.needsRendering():
+            # drawBackground schedules the next frame
+            self.updateSelfAndScene()
+
+        else:
+            # an idle layout doesn't need to be repainted at all
+            self.continuousRenderingScheduled = True
+            QtCore.QTimer.singleShot(self.continuousRenderingIdleInterval, self.continueRendering)
+
+    def markSceneCEGUIDirty(self):
+        scene = self.scene()
+        if scene is not None:
+            scene.markCEGUIDirty()
+
     def updateSelfAndScene(self):
         self.update()
 
@@ -249,6 +413,8 @@ class GraphicsView(resizable.GraphicsView, cegui.GLContextProvider):
         if self.injectInput:
             point = self.mapToScene(QtCore.QPoint(event.x(), event.y()))
             handled = PyCEGUI.System.getSingleton().getDefaultGUIContext().injectMousePosition(point.x(), point.y())
+            # the mouse cursor moved even if CEGUI didn't handle the event
+            self.markSceneCEGUIDirty()
 
         if not handled:
             super(GraphicsView, self).mouseMoveEvent(event)
@@ -274,6 +440,7 @@ class GraphicsView(resizable.GraphicsView, cegui.GLContextProvider):
 
             if button is not None:
                 handled = PyCEGUI.System.getSingleton().getDefaultGUIContext().injectMouseButtonDown(button)
+                self.markSceneCEGUIDirty()
 
         if not handled:
             super(GraphicsView, self).mousePressEvent(event)
@@ -286,6 +453,7 @@ class GraphicsView(resizable.GraphicsView, cegui.GLContextProvider):
 
             if button is not None:
                 handled = PyCEGUI.System.getSingleton().getDefaultGUIContext().injectMouseButtonUp(button)
+                self.markSceneCEGUIDirty()
 
         if not handled:
             super(GraphicsView, self).mouseReleaseEvent(event)
@@ -499,6 +667,8 @@ class GraphicsView(resizable.GraphicsView, cegui.GLContextProvider):
             if len(char) > 0:
                 handled = handled or PyCEGUI.System.getSingleton().getDefaultGUIContext().injectChar(ord(char[0]))
 
+            self.markSceneCEGUIDirty()
+
         if not handled:
             super(GraphicsView, self).keyPressEvent(event)
 
@@ -510,6 +680,7 @@ class GraphicsView(resizable.GraphicsView, cegui.GLContextProvider):
 
             if button is not None:
                 handled = PyCEGUI.System.getSingleton().getDefaultGUIContext().injectKeyUp(button)
+                self.markSceneCEGUIDirty()
 
         if not handled:
             super(GraphicsView, self).keyPressEvent(event)
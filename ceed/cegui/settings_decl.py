@@ -45,3 +45,20 @@ def declare(settings):
                            help_ = "Second of the alternating colours to use. (use the same as first to get a solid background)",
                            defaultValue = QtGui.QColor(QtCore.Qt.lightGray), widgetHint = "colour",
                            sortingWeight = 4)
+
+    resources = category.createSection(name = "resources", label = "Project resources")
+
+    resources.createEntry(name = "lazy_scheme_loading", type_ = bool, label = "Load schemes on demand",
+                          help_ = "Only index schemes when synchronising with the project and load each of them (with its imagesets, fonts and looknfeels) when an editor first needs a widget, font or image from it.\nSpeeds up opening projects with many skins. Fonts and images of schemes that weren't loaded yet aren't offered in property editors.",
+                          defaultValue = False, widgetHint = "checkbox",
+                          sortingWeight = 1)
+
+    resources.createEntry(name = "prefetched_skins", type_ = int, label = "Prefetched recently used skins",
+                          help_ = "How many of the most recently used skins are prepared in the background right after synchronising when schemes are loaded on demand.",
+                          defaultValue = 2, widgetHint = "int",
+                          sortingWeight = 2)
+
+    resources.createEntry(name = "preview_disk_cache", type_ = bool, label = "Cache widget previews on disk",
+                          help_ = "Keep rendered widget previews in the user's cache directory so that they don't have to be rendered again after restarting.\nPreviews are always cached in memory.",
+                          defaultValue = False, widgetHint = "checkbox",
+                          sortingWeight = 3)
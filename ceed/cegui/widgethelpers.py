@@ -22,10 +22,14 @@ from PySide import QtCore
 from PySide import QtGui
 
 from ceed import resizable
+from ceed import spatialindex
 from ceed.cegui import qtgraphics
 import PyCEGUI
 
 import math
+import cPickle
+import cStringIO
+import zlib
 
 # This module contains helping classes for CEGUI widget handling
 
@@ -36,6 +40,66 @@ class GraphicsScene(qtgraphics.GraphicsScene):
     def __init__(self, ceguiInstance):
         super(GraphicsScene, self).__init__(ceguiInstance)
 
+        # widget name path -> Manipulator, see getIndexedManipulator
+        self.manipulatorsByPath = {}
+
+    def indexManipulator(self, manipulator, recursive = True):
+        """Adds given manipulator (and its descendants if recursive) to the index of manipulators
+        by widget paths, lookups of indexed manipulators don't have to walk the manipulator tree.
+
+        Call this after manipulators are created, renamed or reparented. Manipulators that were
+        renamed or reparented are removed from their old paths first.
+        """
+
+        manipulators = [manipulator]
+        if recursive:
+            manipulators.extend(manipulator.getAllDescendantManipulators())
+
+        for manipulator in manipulators:
+            self.unindexManipulator(manipulator, False)
+
+            if manipulator.widget is not None:
+                manipulator.indexedPath = manipulator.widget.getNamePath()
+                self.manipulatorsByPath[manipulator.indexedPath] = manipulator
+
+    def unindexManipulator(self, manipulator, recursive = True):
+        """Removes given manipulator (and its descendants if recursive) from the index of manipulators"""
+
+        manipulators = [manipulator]
+        if recursive:
+            manipulators.extend(manipulator.getAllDescendantManipulators())
+
+        for manipulator in manipulators:
+            if manipulator.indexedPath is not None:
+                if self.manipulatorsByPath.get(manipulator.indexedPath) is manipulator:
+                    del self.manipulatorsByPath[manipulator.indexedPath]
+
+                manipulator.indexedPath = None
+
+    def clearManipulatorIndex(self):
+        for manipulator in self.manipulatorsByPath.itervalues():
+            manipulator.indexedPath = None
+
+        self.manipulatorsByPath = {}
+
+    def getIndexedManipulator(self, widgetPath):
+        """Returns manipulator of given widget path from the index, None if it isn't indexed
+
+        The index is only a shortcut, callers have to fall back to walking the manipulator tree
+        when this returns None. Entries that got out of date (widget renamed behind our back,
+        manipulator removed from the scene) are dropped and not returned.
+        """
+
+        manipulator = self.manipulatorsByPath.get(widgetPath)
+        if manipulator is None:
+            return None
+
+        if manipulator.scene() is not self or manipulator.widget is None or manipulator.widget.getNamePath() != widgetPath:
+            self.unindexManipulator(manipulator, False)
+            return None
+
+        return manipulator
+
 class Manipulator(resizable.ResizableRectItem):
     """This is a rectangle that is synchronised with given CEGUI widget,
     it provides moving and resizing functionality
@@ -57,6 +121,17 @@ class Manipulator(resizable.ResizableRectItem):
                       QtGui.QGraphicsItem.ItemSendsGeometryChanges)
 
         self.widget = widget
+        # widget path this manipulator is indexed under in the scene, see GraphicsScene.indexManipulator
+        self.indexedPath = None
+        # position of the client area relative to the widget, see updateGeometryFromWidget
+        self.lastClientAreaOffset = None
+        # rectangles of child manipulators in local coordinates, see updateSpatialIndexEntry
+        self.childIndex = spatialindex.SpatialIndex()
+        # manipulator whose childIndex contains this manipulator
+        self.spatiallyIndexedIn = None
+        # child manipulators reaching outside of the rectangle of this manipulator,
+        # themselves or through their descendants, see updateOverhangingEntry
+        self.overhangingChildren = set()
 
         if recursive:
             self.createChildManipulators(True, skipAutoWidgets)
@@ -83,7 +158,8 @@ class Manipulator(resizable.ResizableRectItem):
         """
 
         ret = Manipulator(self, childWidget, recursive, skipAutoWidgets)
-        ret.updateFromWidget()
+        # children of the new manipulator have been updated when they were created
+        ret.updateFromWidget(skipUnchangedSubtrees = True)
         return ret
 
     def getFunctionsChildCountAndChildGet(self):
@@ -172,7 +248,12 @@ class Manipulator(resizable.ResizableRectItem):
                 parentWidget.removeChild(self.widget)
 
         # detach from the parent manipulator
-        self.scene().removeItem(self)
+        scene = self.scene()
+        if isinstance(scene, GraphicsScene):
+            # descendants have unindexed themselves already if recursive
+            scene.unindexManipulator(self, not recursive)
+        self.removeSpatialIndexEntry()
+        scene.removeItem(self)
 
         if detachWidget and destroyWidget:
             PyCEGUI.WindowManager.getSingleton().destroyWindow(self.widget)
@@ -196,6 +277,12 @@ class Manipulator(resizable.ResizableRectItem):
         Throws LookupError on failure.
         """
 
+        scene = self.scene()
+        if isinstance(scene, GraphicsScene):
+            manipulator = scene.getIndexedManipulator(self.widget.getNamePath() + "/" + widgetPath)
+            if manipulator is not None:
+                return manipulator
+
         if isinstance(self.widget, PyCEGUI.TabControl) or isinstance(self.widget, PyCEGUI.ScrollablePane):
             manipulator = self.getManipulatorFromChildContainerByPath(widgetPath)
             if manipulator is not None:
@@ -260,20 +347,23 @@ class Manipulator(resizable.ResizableRectItem):
 
         return ret
 
-    def updateFromWidget(self, callUpdate = False, updateAncestorLCs = False):
+    def updateFromWidget(self, callUpdate = False, updateAncestorLCs = False, skipUnchangedSubtrees = False):
         """Updates this manipulator with associated widget properties. Mainly
         position and size.
 
         callUpdate - if True we also call update on the widget itself before
                      querying its properties
         updateParentLCs - if True we update ancestor layout containers
+        skipUnchangedSubtrees - if True, descendants of manipulators whose size and
+                                client area didn't change are not updated. Only use this
+                                if nothing but sizes of ancestors could have changed
+                                (display size change, freshly created manipulators)
+
+        The whole subtree is updated in one batch, see updateGeometryFromWidget
         """
 
         assert(self.widget is not None)
 
-        if callUpdate:
-            self.widget.update(0.0)
-
         if updateAncestorLCs:
             # We are trying to find a topmost LC (in case of nested LCs) and
             # recursively update it
@@ -291,27 +381,149 @@ class Manipulator(resizable.ResizableRectItem):
                 # updateAncestorLCs = False
                 return
 
+        # moving lots of items with the BSP index in place updates the index for each
+        # of them, it's cheaper to drop it and have it rebuilt once afterwards
+        scene = self.scene()
+        suspendIndex = scene is not None and self.parentItem() is None and \
+                       scene.itemIndexMethod() == QtGui.QGraphicsScene.BspTreeIndex
+
+        if suspendIndex:
+            scene.setItemIndexMethod(QtGui.QGraphicsScene.NoIndex)
+
+        try:
+            # the stack holds (manipulator, whether its children can be skipped if unchanged)
+            stack = [(self, False)]
+            while len(stack) > 0:
+                manipulator, skipIfUnchanged = stack.pop()
+
+                changed = manipulator.updateGeometryFromWidget(callUpdate)
+                if skipIfUnchanged and not changed:
+                    continue
+
+                for item in manipulator.childItems():
+                    if isinstance(item, Manipulator):
+                        # if we are updating top to bottom we don't need to update ancestor
+                        # layout containers, they will already be updated
+                        stack.append((item, skipUnchangedSubtrees and not isinstance(item.widget, PyCEGUI.LayoutContainer)))
+
+        finally:
+            if suspendIndex:
+                scene.setItemIndexMethod(QtGui.QGraphicsScene.BspTreeIndex)
+
+    def updateGeometryFromWidget(self, callUpdate = False):
+        """Updates position and size of just this manipulator from its widget
+
+        Returns True if the size or client area of the widget changed since the last
+        update, geometry of descendants might have changed in that case.
+        """
+
+        if callUpdate:
+            self.widget.update(0.0)
+
         unclippedOuterRect = self.widget.getUnclippedOuterRect().getFresh(True)
         pos = unclippedOuterRect.getPosition()
         size = unclippedOuterRect.getSize()
 
+        innerPos = self.widget.getUnclippedInnerRect().getFresh(True).getPosition() - pos
+
         parentWidget = self.widget.getParent()
         if parentWidget:
             parentUnclippedOuterRect = parentWidget.getUnclippedOuterRect().get()
             pos -= parentUnclippedOuterRect.getPosition()
 
+        newPos = QtCore.QPointF(pos.d_x, pos.d_y)
+        newRect = QtCore.QRectF(0, 0, size.d_width, size.d_height)
+
+        # setRect is expensive (resize handles get updated), don't call it unless we have to
         self.ignoreGeometryChanges = True
-        self.setPos(QtCore.QPointF(pos.d_x, pos.d_y))
-        self.setRect(QtCore.QRectF(0, 0, size.d_width, size.d_height))
+        if self.pos() != newPos:
+            self.setPos(newPos)
+        changed = self.rect() != newRect
+        if changed:
+            self.setRect(newRect)
+
+            # children that were inside might be sticking out now and vice versa
+            for child in list(self.childIndex.rects.iterkeys()):
+                child.updateOverhangingEntry()
         self.ignoreGeometryChanges = False
 
-        for item in self.childItems():
-            if not isinstance(item, Manipulator):
-                continue
+        clientAreaOffset = (innerPos.d_x, innerPos.d_y)
+        changed = changed or clientAreaOffset != self.lastClientAreaOffset
+        self.lastClientAreaOffset = clientAreaOffset
+
+        self.updateSpatialIndexEntry()
+
+        return changed
+
+    def updateSpatialIndexEntry(self, rect = None):
+        """Puts this manipulator into the spatial index of its parent manipulator or
+        moves it there.
+
+        rect - rectangle of this manipulator in parent's coordinates,
+               current geometry is used if None
+        """
 
-            # if we are updating top to bottom we don't need to update ancestor
-            # layout containers, they will already be updated
-            item.updateFromWidget(callUpdate, False)
+        parent = self.parentItem()
+        if self.spatiallyIndexedIn is not None and self.spatiallyIndexedIn is not parent:
+            self.removeSpatialIndexEntry()
+
+        if not isinstance(parent, Manipulator):
+            return
+
+        if rect is None:
+            rect = self.mapRectToParent(self.rect())
+
+        parent.childIndex.update(self, (rect.left(), rect.top(), rect.right(), rect.bottom()))
+        self.spatiallyIndexedIn = parent
+
+        self.updateOverhangingEntry()
+
+    def removeSpatialIndexEntry(self):
+        if self.spatiallyIndexedIn is not None:
+            parent = self.spatiallyIndexedIn
+
+            parent.childIndex.remove(self)
+            self.spatiallyIndexedIn = None
+
+            if self in parent.overhangingChildren:
+                parent.overhangingChildren.discard(self)
+                parent.updateOverhangingEntry()
+
+    def updateOverhangingEntry(self):
+        """Puts this manipulator into overhangingChildren of its parent if it or any of its
+        descendants reach outside of the parent's rectangle, removes it from there otherwise.
+
+        Spatial queries of children (see getManipulatorsAbove) only find children intersecting
+        the query rectangle, overhanging children have to be looked into regardless.
+        """
+
+        parent = self.spatiallyIndexedIn
+        if parent is None:
+            return
+
+        left, top, right, bottom = parent.childIndex.getRect(self)
+        parentRect = parent.rect()
+
+        overhangs = len(self.overhangingChildren) > 0 or \
+                    left < parentRect.left() or top < parentRect.top() or right > parentRect.right() or bottom > parentRect.bottom()
+
+        if overhangs == (self in parent.overhangingChildren):
+            return
+
+        if overhangs:
+            parent.overhangingChildren.add(self)
+        else:
+            parent.overhangingChildren.discard(self)
+
+        # whether the parent overhangs its own parent might have changed as well
+        if len(parent.overhangingChildren) == (1 if overhangs else 0):
+            parent.updateOverhangingEntry()
+
+    def getChildManipulatorsIn(self, rect):
+        """Returns child manipulators whose rectangles intersect given rectangle (in local coordinates)"""
+
+        return [item for item in self.childIndex.query((rect.left(), rect.top(), rect.right(), rect.bottom()))
+                if item.parentItem() is self]
 
     def moveToFront(self):
         self.widget.moveToFront()
@@ -395,6 +607,8 @@ class Manipulator(resizable.ResizableRectItem):
     def notifyResizeProgress(self, newPos, newRect):
         super(Manipulator, self).notifyResizeProgress(newPos, newRect)
 
+        self.updateSpatialIndexEntry(QtCore.QRectF(newPos, newRect.size()))
+
         # absolute pixel deltas
         pixelDeltaPos = newPos - self.resizeOldPos
         pixelDeltaSize = newRect.size() - self.resizeOldRect.size()
@@ -442,6 +656,7 @@ class Manipulator(resizable.ResizableRectItem):
 
         self.widget.setPosition(self.preResizePos + processedDeltaPos)
         self.widget.setSize(self.preResizeSize + deltaSize)
+        self.scene().markCEGUIDirty()
 
         self.lastResizeNewPos = newPos
         self.lastResizeNewRect = newRect
@@ -453,7 +668,6 @@ class Manipulator(resizable.ResizableRectItem):
 
         for item in self.childItems():
             if isinstance(item, Manipulator):
-                item.updateFromWidget()
                 item.setVisible(True)
 
         parent = self.widget.getParent()
@@ -480,6 +694,9 @@ class Manipulator(resizable.ResizableRectItem):
     def notifyMoveProgress(self, newPos):
         super(Manipulator, self).notifyMoveProgress(newPos)
 
+        # the item hasn't been moved yet at this point
+        self.updateSpatialIndexEntry(self.rect().translated(newPos))
+
         # absolute pixel deltas
         pixelDeltaPos = newPos - self.moveOldPos
 
@@ -496,6 +713,7 @@ class Manipulator(resizable.ResizableRectItem):
             deltaPos = PyCEGUI.UVector2(PyCEGUI.UDim(pixelDeltaPos.x() / baseSize.d_width, 0), PyCEGUI.UDim(pixelDeltaPos.y() / baseSize.d_height, 0))
 
         self.widget.setPosition(self.preMovePos + deltaPos)
+        self.scene().markCEGUIDirty()
 
         self.lastMoveNewPos = newPos
 
@@ -506,7 +724,6 @@ class Manipulator(resizable.ResizableRectItem):
 
         for item in self.childItems():
             if isinstance(item, Manipulator):
-                item.updateFromWidget()
                 item.setVisible(True)
 
         self.lastMoveNewPos = None
@@ -523,15 +740,109 @@ class Manipulator(resizable.ResizableRectItem):
         # undecidable otherwise
         assert(item.scene() == self.scene())
 
-        # FIXME: nasty nasty way to do this
-        for i in self.scene().items():
-            if i is self:
-                return True
-            if i is item:
+        def getAncestry(item):
+            """Returns list of items from the topmost ancestor down to given item"""
+
+            ret = []
+            while item is not None:
+                ret.append(item)
+                item = item.parentItem()
+
+            ret.reverse()
+            return ret
+
+        selfAncestry = getAncestry(self)
+        itemAncestry = getAncestry(item)
+
+        common = 0
+        while common < min(len(selfAncestry), len(itemAncestry)) and selfAncestry[common] is itemAncestry[common]:
+            common += 1
+
+        # descendants are always stacked above their ancestors
+        if common == len(itemAncestry):
+            return True
+        if common == len(selfAncestry):
+            return False
+
+        if common == 0:
+            # different top level items, let the scene decide
+            for i in self.scene().items():
+                if i is selfAncestry[0]:
+                    return True
+                if i is itemAncestry[0]:
+                    return False
+
+            assert(False)
+
+        # child items are sorted by stacking order, topmost last
+        for sibling in selfAncestry[common - 1].childItems():
+            if sibling is selfAncestry[common]:
                 return False
+            if sibling is itemAncestry[common]:
+                return True
 
         assert(False)
 
+    def getManipulatorsAbove(self, rect = None):
+        """Returns visible manipulators stacked above this one that intersect given rectangle
+
+        rect - rectangle in scene coordinates, bounding rectangle of this manipulator if None
+
+        Only spatial indices of ancestors and descendants are queried, the rest of
+        the scene isn't touched. Children reaching outside of their parents are looked
+        into even if the parent doesn't intersect the rectangle, see updateOverhangingEntry.
+        """
+
+        if rect is None:
+            rect = self.mapRectToScene(self.boundingRect())
+
+        def collectDescendants(manipulator, ret):
+            intersecting = set(manipulator.getChildManipulatorsIn(manipulator.mapRectFromScene(rect)))
+
+            for child in intersecting:
+                if child.isVisible():
+                    ret.append(child)
+                    collectDescendants(child, ret)
+
+            # their descendants might intersect even if they themselves don't
+            for child in manipulator.overhangingChildren:
+                if child.isVisible() and child not in intersecting and child.parentItem() is manipulator:
+                    collectDescendants(child, ret)
+
+        ret = []
+        # descendants are always stacked above their ancestors
+        collectDescendants(self, ret)
+
+        # siblings of self and of ancestors stacked above them are above self, including their descendants
+        child = self
+        parent = self.parentItem()
+        while isinstance(parent, Manipulator):
+            candidates = set(parent.getChildManipulatorsIn(parent.mapRectFromScene(rect)))
+            # siblings whose descendants might intersect even if they themselves don't
+            overhanging = [candidate for candidate in parent.overhangingChildren
+                           if candidate not in candidates and candidate.parentItem() is parent]
+
+            if len(candidates) > 0 or len(overhanging) > 0:
+                stackingOrder = parent.childItems()
+                position = 0
+                while stackingOrder[position] is not child:
+                    position += 1
+                itemsAbove = set(stackingOrder[position + 1:])
+
+                for candidate in candidates:
+                    if candidate in itemsAbove and candidate.isVisible():
+                        ret.append(candidate)
+                        collectDescendants(candidate, ret)
+
+                for candidate in overhanging:
+                    if candidate in itemsAbove and candidate.isVisible():
+                        collectDescendants(candidate, ret)
+
+            child = parent
+            parent = parent.parentItem()
+
+        return ret
+
     def paintHorizontalGuides(self, baseSize, painter, option, widget):
         """Paints horizontal dimension guides - position X and width guides"""
 
@@ -677,19 +988,12 @@ class Manipulator(resizable.ResizableRectItem):
             #       want this disabled. But it makes editing nicer and fancier :-)
 
             # We are drawing the outlines after CEGUI has already been rendered so he have to clip overlapping parts
-            # we basically query all items colliding with ourselves and if that's a manipulator and is over us we subtract
-            # that from the clipped path.
+            # we basically query all manipulators colliding with ourselves that are over us and subtract
+            # them from the clipped path.
             clipPath = QtGui.QPainterPath()
             clipPath.addRect(QtCore.QRectF(-self.scenePos().x(), -self.scenePos().y(), self.scene().sceneRect().width(), self.scene().sceneRect().height()))
-            # FIXME: I used self.collidingItems() but that seems way way slower than just going over everything on the scene
-            #        in reality we need siblings of ancestors recursively up to the top
-            #
-            #        this just begs for optimisation in the future
-            collidingItems = self.scene().items()
-            for item in collidingItems:
-                if item.isVisible() and item is not self and isinstance(item, Manipulator):
-                    if item.isAboveItem(self):
-                        clipPath = clipPath.subtracted(item.boundingClipPath().translated(item.scenePos() - self.scenePos()))
+            for item in self.getManipulatorsAbove():
+                clipPath = clipPath.subtracted(item.boundingClipPath().translated(item.scenePos() - self.scenePos()))
 
             # we clip using stencil buffers to prevent overlapping outlines appearing
             # FIXME: This could potentially get very slow for huge layouts
@@ -744,8 +1048,20 @@ class Manipulator(resizable.ResizableRectItem):
 class SerialisationData(object):
     """Allows to "freeze" CEGUI widget to data that is easy to retain in python,
     this is a helper class that can be used for copy/paste, undo commands, etc...
+
+    Undo commands of big layouts keep a lot of these around, they are therefore kept
+    as small as possible. Only properties that differ from the defaults of the widget
+    are stored, as a tuple of (name, value) pairs, and property names and widget types
+    are shared between all instances.
     """
 
+    __slots__ = ("name", "type", "parentPath", "autoWidget", "properties", "children")
+
+    # string -> the one instance of that string shared by all SerialisationData, see shareString,
+    # only property names and widget types go here, there is a limited number of those
+    # (values and paths aren't shared, this is never cleared)
+    sharedStrings = {}
+
     def __init__(self, widget = None, serialiseChildren = True):
         self.name = ""
         self.type = ""
@@ -754,12 +1070,13 @@ class SerialisationData(object):
         # if True, the widget was an auto-widget, therefore it will not be
         # created directly when reconstructing but instead just retrieved
         self.autoWidget = False
-        self.properties = {}
+        # tuple of (name, value) pairs
+        self.properties = ()
         self.children = []
 
         if widget is not None:
             self.name = widget.getName()
-            self.type = widget.getType()
+            self.type = self.shareString(widget.getType())
             self.autoWidget = widget.isAutoWindow()
 
             parent = widget.getParent()
@@ -771,6 +1088,85 @@ class SerialisationData(object):
             if serialiseChildren:
                 self.serialiseChildren(widget)
 
+    @classmethod
+    def shareString(cls, string):
+        return cls.sharedStrings.setdefault(string, string)
+
+    @classmethod
+    def shareProperty(cls, name, value):
+        return (cls.shareString(name), value)
+
+    def __getstate__(self):
+        # attributes of subclasses (editor specific stuff that can't be pickled) are deliberately left out
+        return (self.name, self.type, self.parentPath, self.autoWidget, self.properties, self.children)
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # pickled by an older version of the editor
+            state = (state["name"], state["type"], state["parentPath"], state["autoWidget"], state["properties"].items(), state["children"])
+
+        self.name, self.type, self.parentPath, self.autoWidget, properties, self.children = state
+
+        self.type = self.shareString(self.type)
+        self.properties = tuple(self.shareProperty(name, value) for name, value in properties)
+
+    @staticmethod
+    def encodeList(serialisationDataList, progressCallback = None):
+        """Encodes given list of SerialisationData to a compact binary string (for the clipboard)
+
+        The hierarchies are pickled one after another, progressCallback (if given) is called
+        after each of them with the count of hierarchies encoded so far.
+        """
+
+        compressor = zlib.compressobj()
+        buffer = cStringIO.StringIO()
+        # one pickler for all of them, the memo shares strings across the hierarchies
+        pickler = cPickle.Pickler(buffer, cPickle.HIGHEST_PROTOCOL)
+
+        ret = []
+        for i, serialisationData in enumerate(serialisationDataList):
+            pickler.dump(serialisationData)
+
+            ret.append(compressor.compress(buffer.getvalue()))
+            buffer.seek(0)
+            buffer.truncate()
+
+            if progressCallback is not None:
+                progressCallback(i + 1)
+
+        ret.append(compressor.flush())
+
+        return "".join(ret)
+
+    @staticmethod
+    def decodeList(data):
+        """Decodes data created by encodeList"""
+
+        try:
+            data = zlib.decompress(data)
+
+        except zlib.error:
+            # uncompressed pickle, data from an older version of the editor
+            pass
+
+        unpickler = cPickle.Unpickler(cStringIO.StringIO(data))
+
+        ret = []
+        while True:
+            try:
+                serialisationData = unpickler.load()
+
+            except EOFError:
+                break
+
+            if isinstance(serialisationData, list):
+                # the whole list pickled at once, data from an older version of the editor
+                return serialisationData
+
+            ret.append(serialisationData)
+
+        return ret
+
     def setParentPath(self, parentPath):
         """Recursively changes the parent path
         """
@@ -791,7 +1187,7 @@ class SerialisationData(object):
         """
 
         ret = Manipulator(parentManipulator, widget, recursive, skipAutoWidgets)
-        ret.updateFromWidget()
+        ret.updateFromWidget(skipUnchangedSubtrees = True)
         return ret
 
     def serialiseProperties(self, widget):
@@ -799,15 +1195,19 @@ class SerialisationData(object):
         in a string form
         """
 
+        properties = []
+
         it = widget.getPropertyIterator()
         while not it.isAtEnd():
             propertyName = it.getCurrentKey()
 
             if not widget.isPropertyBannedFromXML(propertyName) and not widget.isPropertyDefault(propertyName):
-                self.properties[propertyName] = widget.getProperty(propertyName)
+                properties.append(self.shareProperty(propertyName, widget.getProperty(propertyName)))
 
             it.next()
 
+        self.properties = tuple(properties)
+
     def serialiseChildren(self, widget, skipAutoWidgets = False):
         """Serialises all child widgets of given widgets
 
@@ -868,7 +1268,7 @@ class SerialisationData(object):
             realPathSplit = widget.getNamePath().split("/", 1)
             ret = rootManipulator.getManipulatorByPath(realPathSplit[1])
 
-        for name, value in self.properties.iteritems():
+        for name, value in self.properties:
             widget.setProperty(name, value)
 
         for child in self.children:
@@ -22,6 +22,7 @@
 """
 
 import logging
+import tempfile
 
 # NOTE: It should be importable with as few dependencies as possible because
 #       this is used in the command line migration tool!
@@ -47,6 +48,21 @@ class Layer(object):
 
         raise NotImplementedError("Compatibility layers have to override Layer.transform!")
 
+    def transformStream(self, source, target):
+        """Transforms data read from file-like source and writes the result into
+        file-like target.
+
+        The default implementation reads everything into memory and delegates
+        to Layer.transform. Layers that deal with potentially huge files should
+        override this and convert the data as it is read.
+        """
+
+        ret = self.transform(source.read())
+        if isinstance(ret, unicode):
+            ret = ret.encode("utf-8")
+
+        target.write(ret)
+
 class TypeDetector(object):
     def getType(self):
         """Gets the type this detector detects"""
@@ -184,6 +200,75 @@ class Manager(object):
 
         raise LayerNotFoundError(sourceType, targetType)
 
+    def findTransformPath(self, sourceType, targetType, visitedLayers = []):
+        """Finds layers that have to be applied in order to transform data
+        from sourceType to targetType, returns them as a list in the order
+        they should be applied (empty list if both types are the same).
+        """
+
+        if sourceType == targetType:
+            return []
+
+        for layer in self.layers:
+            if layer in visitedLayers:
+                continue
+
+            if layer.getSourceType() == sourceType:
+                try:
+                    return [layer] + self.findTransformPath(layer.getTargetType(), targetType, visitedLayers + [layer])
+
+                except LayerNotFoundError:
+                    # this path doesn't lead anywhere,
+                    # lets try to find another one
+                    pass
+
+        raise LayerNotFoundError(sourceType, targetType)
+
+    # intermediate results bigger than this are spilled to the disk when streaming
+    STREAM_SPOOL_SIZE = 16 * 1024 * 1024
+
+    def transformStream(self, sourceType, targetType, source, target):
+        """Performs transformation of data read from file-like source and writes
+        the result into file-like target.
+
+        Unlike Manager.transform this never holds the whole data in memory if
+        the layers involved support streaming (see Layer.transformStream),
+        intermediate results of multi-step transformations are spooled to
+        temporary files.
+        """
+
+        logging.debug("Attempting to stream transform type '%s' into '%s'", sourceType, targetType)
+
+        path = self.findTransformPath(sourceType, targetType)
+
+        if len(path) == 0:
+            logging.debug("Copying data with no transformation applied, both types are the same!")
+            while True:
+                chunk = source.read(64 * 1024)
+                if not chunk:
+                    break
+
+                target.write(chunk)
+
+            return
+
+        for i, layer in enumerate(path):
+            if i == len(path) - 1:
+                layerTarget = target
+            else:
+                layerTarget = tempfile.SpooledTemporaryFile(max_size = Manager.STREAM_SPOOL_SIZE)
+
+            logging.debug("Compatibility path fragment: '%s' -> '%s'", layer.getSourceType(), layer.getTargetType())
+            layer.transformStream(source, layerTarget)
+
+            if i > 0:
+                # source is our own intermediate spool
+                source.close()
+
+            if layerTarget is not target:
+                layerTarget.seek(0)
+                source = layerTarget
+
     def guessType(self, code, extension = ""):
         """Attempts to make an informed guess based on given data and extension. If the guess is positive, the
         data *should be* of returned type. It depends on type detectors however.
@@ -21,11 +21,11 @@
 """Misc helper functionality often reused in compatibility layers
 """
 
-from ceed import xmledit
+from ceed import xmlbackend
 
 from xml.sax import parseString, handler
-from io import BytesIO
-from xml.etree import cElementTree as ElementTree
+# the pure python implementation is only used for its escaping helpers
+from xml.etree import ElementTree as PyElementTree
 
 def checkDataVersion(rootElement, version, data):
     """Checks that tag of the root element in data is as given
@@ -75,9 +75,242 @@ def prettyPrintXMLElement(rootElement):
 
     Returns a string containing the pretty printed XML file.
     """
-    xmledit.indent(rootElement)
-    
-    tempFile = BytesIO()
-    elementTree = ElementTree.ElementTree(rootElement)
-    elementTree.write(tempFile, encoding='utf-8', xml_declaration=True) 
-    return tempFile.getvalue()
+
+    return xmlbackend.prettyPrint(rootElement)
+
+class StreamingTransformHandler(object):
+    """Receives elements from streamTransformXML as they are being parsed.
+
+    Elements are handed over in document order. Ancestors of the element
+    are still alive and can be inspected but their start tags might have
+    already been written, changing them has no effect on the output.
+    """
+
+    def isSubtreeBuffered(self, element, ancestors):
+        """Returning True causes the whole subtree of given element to be
+        kept in memory and passed to endElement at once. Use this when the
+        subtree can't be transformed element by element but is known to be
+        reasonably small (for example a single WidgetLook).
+        """
+
+        return False
+
+    def startElement(self, element, ancestors):
+        """Called when the start tag has been parsed. Attributes of the element
+        are complete and can be changed, its text and children are not known yet.
+        """
+
+        pass
+
+    def endElement(self, element, ancestors):
+        """Called when the element is closed. Attributes can only be changed
+        if the element had no children (it's start tag hasn't been written yet),
+        buffered subtrees can be changed arbitrarily.
+        """
+
+        pass
+
+class _StreamingXMLWriter(object):
+    """Writes elements incrementally, output matches what prettyPrintXMLElement
+    would produce for the whole tree (provided namespaces are only declared on
+    the root element).
+    """
+
+    def __init__(self, target, tabImpostor = "    "):
+        self.target = target
+        self.tabImpostor = tabImpostor
+        self.encoding = "utf-8"
+
+        # namespaces declared on the root element, uri -> prefix
+        self.rootNamespaces = {}
+
+    def writeDeclaration(self):
+        self.target.write("<?xml version='1.0' encoding='%s'?>\n" % (self.encoding))
+
+    def writeIndentation(self, level):
+        self.target.write("\n" + level * self.tabImpostor)
+
+    def writeText(self, text):
+        self.target.write(PyElementTree._escape_cdata(text, self.encoding))
+
+    def _qualifiedName(self, name, namespaces):
+        if name[:1] != "{":
+            return name.encode(self.encoding)
+
+        uri, localName = name[1:].rsplit("}", 1)
+        prefix = self.rootNamespaces.get(uri, namespaces.get(uri))
+        if prefix is None:
+            prefix = PyElementTree._namespace_map.get(uri)
+            if prefix is None:
+                prefix = "ns%i" % (len(self.rootNamespaces) + len(namespaces))
+            if prefix != "xml":
+                namespaces[uri] = prefix
+
+        return ("%s:%s" % (prefix, localName)).encode(self.encoding)
+
+    def startTag(self, element, isRoot = False):
+        """Returns the start tag of given element without the closing '>'"""
+
+        # namespaces first declared in this start tag
+        namespaces = {}
+
+        tag = self._qualifiedName(element.tag, namespaces)
+        attributes = []
+        for name, value in sorted(element.items()):
+            attributes.append(" %s=\"%s\"" % (self._qualifiedName(name, namespaces), PyElementTree._escape_attrib(value, self.encoding)))
+
+        declarations = []
+        for uri, prefix in sorted(namespaces.items(), key = lambda x: x[1]):
+            declarations.append(" xmlns:%s=\"%s\"" % (prefix.encode(self.encoding), PyElementTree._escape_attrib(uri, self.encoding)))
+
+        if isRoot:
+            self.rootNamespaces.update(namespaces)
+
+        return "<" + tag + "".join(declarations) + "".join(attributes)
+
+    def writeStartTag(self, element, isRoot = False):
+        self.target.write(self.startTag(element, isRoot) + ">")
+
+    def writeEndTag(self, element):
+        self.target.write("</%s>" % (self._qualifiedName(element.tag, {})))
+
+    def writeSubtree(self, element, level, isRoot = False):
+        """Writes given element with all its children indented as if it was
+        at given level, the element's own tail is omitted
+        """
+
+        if len(element) > 0:
+            xmlbackend.indent(element, level, self.tabImpostor)
+
+        self._writeIndentedSubtree(element, isRoot)
+
+    def _writeIndentedSubtree(self, element, isRoot = False):
+        text = element.text
+        if text or len(element) > 0:
+            self.writeStartTag(element, isRoot)
+            if text:
+                self.writeText(text)
+            for child in element:
+                self._writeIndentedSubtree(child)
+                if child.tail:
+                    self.writeText(child.tail)
+            self.writeEndTag(element)
+
+        else:
+            self.target.write(self.startTag(element, isRoot) + " />")
+
+def streamTransformXML(source, target, transformHandler, tabImpostor = "    "):
+    """Parses XML from file-like source, lets transformHandler
+    (StreamingTransformHandler) rewrite elements as they are closed and writes
+    a pretty printed UTF-8 XML file into file-like target.
+
+    Only the currently open elements (and buffered subtrees) are kept in memory,
+    elements are dropped as soon as they are written out. This makes memory
+    usage independent of document size.
+
+    The output is the same as with xmlbackend.fromstring, transforming
+    the tree and prettyPrintXMLElement. The only exception are namespaces first
+    used below the root element, they are declared where they are used.
+    """
+
+    writer = _StreamingXMLWriter(target, tabImpostor)
+    writer.writeDeclaration()
+
+    class OpenElement(object):
+        __slots__ = ["element", "level", "startWritten", "lastChild"]
+
+        def __init__(self, element, level):
+            self.element = element
+            self.level = level
+            self.startWritten = False
+            self.lastChild = None
+
+    def writeChildSeparator(openElement):
+        # text and tails are only known when the next element starts, hence we
+        # write them lazily from there. Whitespace is replaced with indentation
+        # the same way xmlbackend.indent does it
+        element = openElement.element
+
+        if not openElement.startWritten:
+            writer.writeStartTag(element, isRoot = openElement.level == 0)
+            openElement.startWritten = True
+
+            if element.text and element.text.strip():
+                writer.writeText(element.text)
+            else:
+                writer.writeIndentation(openElement.level + 1)
+
+        elif openElement.lastChild is not None:
+            tail = openElement.lastChild.tail
+            if tail and tail.strip():
+                writer.writeText(tail)
+            else:
+                writer.writeIndentation(openElement.level + 1)
+
+            releaseLastChild(openElement)
+
+    def finishChild(openElement, child):
+        # the child has been written but we can only get rid of it once its tail
+        # has been parsed, that happens when the next child starts or when
+        # the parent ends, see releaseLastChild
+        openElement.lastChild = child
+
+    def releaseLastChild(openElement):
+        openElement.element.remove(openElement.lastChild)
+        openElement.lastChild = None
+
+    stack = []
+    ancestors = []
+    # root of the subtree we are currently buffering, if any
+    bufferedElement = None
+    bufferDepth = 0
+
+    for event, element in xmlbackend.iterparse(source, events = ("start", "end")):
+        if bufferedElement is not None:
+            bufferDepth += 1 if event == "start" else -1
+            if bufferDepth > 0:
+                continue
+
+            assert(element is bufferedElement)
+            bufferedElement = None
+
+            transformHandler.endElement(element, ancestors)
+            writer.writeSubtree(element, len(stack))
+            finishChild(stack[-1], element)
+
+        elif event == "start":
+            if len(stack) > 0:
+                writeChildSeparator(stack[-1])
+
+            transformHandler.startElement(element, ancestors)
+
+            if len(stack) > 0 and transformHandler.isSubtreeBuffered(element, ancestors):
+                bufferedElement = element
+                bufferDepth = 1
+                continue
+
+            stack.append(OpenElement(element, len(stack)))
+            ancestors.append(element)
+
+        else:
+            openElement = stack.pop()
+            ancestors.pop()
+
+            transformHandler.endElement(element, ancestors)
+
+            if openElement.startWritten:
+                tail = openElement.lastChild.tail
+                releaseLastChild(openElement)
+
+                if tail and tail.strip():
+                    writer.writeText(tail)
+                else:
+                    writer.writeIndentation(openElement.level)
+
+                writer.writeEndTag(element)
+
+            else:
+                writer.writeSubtree(element, openElement.level, isRoot = openElement.level == 0)
+
+            if len(stack) > 0:
+                finishChild(stack[-1], element)
@@ -22,7 +22,7 @@ from ceed import compatibility
 from ceed.compatibility import ceguihelpers
 from ceed.compatibility.imageset import cegui as imageset_cegui_compat
 
-from xml.etree import cElementTree as ElementTree
+from ceed import xmlbackend
 
 CEGUIFont1 = "CEGUI Font 1"
 CEGUIFont2 = "CEGUI Font 2"
@@ -87,7 +87,7 @@ class Font2ToFont3Layer(compatibility.Layer):
             del element.attrib[sourceAttributeName]
 
     def transform(self, data):
-        root = ElementTree.fromstring(data)
+        root = xmlbackend.fromstring(data)
         root.set("version", "3")
 
         for attr in ["name", "filename", "resourceGroup", "type", "size", "nativeHorzRes", "nativeVertRes", "autoScaled", "antiAlias", "lineScaling"]:
@@ -115,7 +115,7 @@ class Font3ToFont2Layer(compatibility.Layer):
             del element.attrib[sourceAttributeName]
 
     def transform(self, data):
-        root = ElementTree.fromstring(data)
+        root = xmlbackend.fromstring(data)
         del root.attrib["version"]
 
         for attr in ["name", "filename", "resourceGroup", "type", "size", "nativeHorzRes", "nativeVertRes", "autoScaled", "antiAlias", "lineScaling"]:
@@ -138,10 +138,10 @@ class Font3ToFont4Layer(compatibility.Layer):
         return CEGUIFont4
     
     def transform(self, data):
-        fontElement = ElementTree.fromstring(data)
+        fontElement = xmlbackend.fromstring(data)
         del fontElement.attrib["version"]
         
-        root = ElementTree.Element("Fonts")
+        root = xmlbackend.Element("Fonts")
         root.set("version", "4")
         root.append(fontElement)
 
@@ -21,7 +21,7 @@
 from ceed import compatibility
 from ceed.compatibility import ceguihelpers
 
-from xml.etree import cElementTree as ElementTree
+from ceed import xmlbackend
 
 CEGUIImageset1 = "CEGUI imageset 1"
 CEGUIImageset2 = "CEGUI imageset 2"
@@ -62,7 +62,7 @@ class CEGUI1ToCEGUI2Layer(compatibility.Layer):
         return CEGUIImageset2
 
     def transform(self, data):
-        root = ElementTree.fromstring(data)
+        root = xmlbackend.fromstring(data)
         root.set("version", "2")
 
         root.set("imagefile", root.get("Imagefile", ""))
@@ -134,7 +134,7 @@ class CEGUI2ToCEGUI1Layer(compatibility.Layer):
             return "false"
 
     def transform(self, data):
-        root = ElementTree.fromstring(data)
+        root = xmlbackend.fromstring(data)
         del root.attrib["version"] # imageset version 1 has no version attribute!
 
         root.set("Imagefile", root.get("imagefile", ""))
@@ -18,9 +18,10 @@
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ##############################################################################
 
-from xml.etree import cElementTree as ElementTree
+from ceed import xmlbackend
 
 from ceed import compatibility
+from ceed.compatibility import ceguihelpers
 from ceed.compatibility.imageset import cegui
 
 GorillaFile = "Gorilla file"
@@ -102,7 +103,7 @@ class GorillaToCEGUI1Layer(compatibility.Layer):
         if len(sprites) == 0:
             raise RuntimeError("Gorilla file doesn't contain any sprites (font glyphs are not being converted, that's a TODO)")
 
-        root = ElementTree.Element("Imageset")
+        root = xmlbackend.Element("Imageset")
 
         # from what I see, gorilla files don't have names in them, the filename is the
         # name of the resource
@@ -110,7 +111,7 @@ class GorillaToCEGUI1Layer(compatibility.Layer):
         root.set("Imagefile", textureName)
 
         for sprite in sprites:
-            image = ElementTree.Element("Image")
+            image = xmlbackend.Element("Image")
 
             image.set("Name", sprite.name)
 
@@ -131,7 +132,7 @@ class CEGUI1ToGorillaLayer(compatibility.Layer):
         return GorillaFile
 
     def transform(self, data):
-        root = ElementTree.fromstring(data)
+        root = xmlbackend.fromstring(data)
 
         ret = ""
         ret += "[Texture]\n"
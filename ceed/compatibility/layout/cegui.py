@@ -21,12 +21,150 @@
 from ceed import compatibility
 from ceed.compatibility import ceguihelpers
 
-from xml.etree import cElementTree as ElementTree
+from ceed import xmlbackend
 
 CEGUILayout2 = "CEGUI layout 2"
 CEGUILayout3 = "CEGUI layout 3"
 CEGUILayout4 = "CEGUI layout 4"
 
+# Properties that were renamed between layout version 3 (CEGUI 0.7) and version 4 (CEGUI 0.8+),
+# (version 3 name, version 4 name). Both layers and the looknfeel layers use these, see PropertyMigration
+PROPERTY_RENAMES = [
+    ("ZOrderChangeEnabled", "ZOrderingEnabled"),
+    ("MouseButtonDownAutoRepeat", "MouseAutoRepeatEnabled"),
+    ("CustomTooltipType", "TooltipType"),
+    ("Tooltip", "TooltipText"),
+    ("RiseOnClick", "RiseOnClickEnabled"),
+
+    # the 'Unified' prefix was dropped in 0.8
+    ("UnifiedAreaRect", "Area"),
+    ("UnifiedPosition", "Position"),
+    ("UnifiedXPosition", "XPosition"),
+    ("UnifiedYPosition", "YPosition"),
+    ("UnifiedSize", "Size"),
+    ("UnifiedWidth", "Width"),
+    ("UnifiedHeight", "Height"),
+    ("UnifiedMinSize", "MinSize"),
+    ("UnifiedMaxSize", "MaxSize")
+]
+
+# Properties holding image references, (window type suffix, property names, property name suffixes).
+# Names are the same in both versions. Only the first rule with matching window type suffix is used.
+IMAGE_PROPERTIES = [
+    ("StaticImage", ["Image"], []),
+    ("ImageButton", ["NormalImage", "HoverImage", "PushedImage"], []),
+    ("FrameWindow", [], ["SizingCursorImage"]),
+    ("ListHeaderSegment", ["MovingCursorImage", "SizingCursorImage"], [])
+]
+
+# Properties of windows no rule above matches are only guessed to be image references
+# by their name, the values are converted on best effort basis
+GUESSED_IMAGE_PROPERTY_SUFFIXES = ["Image"]
+
+def convertImageReferenceToName(value):
+    """Converts 0.7 image reference ("set:Imageset image:Image") to 0.8+ image name ("Imageset/Image")"""
+
+    split = value.split("image:", 1)
+    if len(split) != 2:
+        raise RuntimeError("Failed parsing value '%s' as 0.7 image reference" % (value))
+
+    split[0] = split[0][4:] # get rid of "set:"
+
+    # strip both of whitespaces left and right
+    return "%s/%s" % (split[0].strip(), split[1].strip())
+
+def convertImageNameToReference(value):
+    """Converts 0.8+ image name ("Imageset/Image") to 0.7 image reference ("set:Imageset image:Image")"""
+
+    split = value.split("/", 1)
+    if len(split) != 2:
+        raise RuntimeError("Failed parsing value '%s' as CEGUI 0.8+ image reference" % (value))
+
+    return "set:%s image:%s" % (split[0], split[1])
+
+class PropertyMigration(object):
+    """Migrates properties in one direction according to the rule tables above.
+
+    The tables are compiled to dicts when constructed so that migrating
+    a property is a couple of dict lookups regardless of how many rules there are.
+    """
+
+    def __init__(self, renames, convertImage):
+        self.renames = dict(renames)
+        self.convertImage = convertImage
+
+        self.imageRules = [(windowTypeSuffix, frozenset(names), tuple(nameSuffixes)) for windowTypeSuffix, names, nameSuffixes in IMAGE_PROPERTIES]
+        self.guessedImageRule = (frozenset(), tuple(GUESSED_IMAGE_PROPERTY_SUFFIXES), True)
+
+        # window type -> (property names, property name suffixes, guessing), window types
+        # are suffix matched so we can only cache them as we encounter them
+        self.imageRulesByWindowType = {}
+
+    def getImageRule(self, windowType):
+        ret = self.imageRulesByWindowType.get(windowType)
+        if ret is None:
+            ret = self.guessedImageRule
+
+            for windowTypeSuffix, names, nameSuffixes in self.imageRules:
+                if windowType.endswith(windowTypeSuffix):
+                    ret = (names, nameSuffixes, False)
+                    break
+
+            self.imageRulesByWindowType[windowType] = ret
+
+        return ret
+
+    def migrateProperty(self, property_, nameAttribute, valueAttribute, windowType = ""):
+        name = property_.get(nameAttribute, "")
+        name = self.renames.get(name, name)
+
+        if name != "":
+            property_.set(nameAttribute, name)
+
+        names, nameSuffixes, guessing = self.getImageRule(windowType)
+        if name not in names and not (nameSuffixes and name.endswith(nameSuffixes)):
+            return
+
+        value = property_.get(valueAttribute)
+        if value is None:
+            value = property_.text or ""
+
+        try:
+            property_.set(valueAttribute, self.convertImage(value))
+
+        except RuntimeError:
+            if not guessing:
+                raise
+
+            # best effort only, we don't have enough info
+
+    def migratePropertiesOf(self, element, tag, nameAttribute, valueAttribute, windowType):
+        for property_ in element.findall(tag):
+            self.migrateProperty(property_, nameAttribute, valueAttribute, windowType)
+
+    def migratePropertyDefinition(self, propertyDefinition):
+        """Migrates initial value of a looknfeel PropertyDefinition or PropertyLinkDefinition.
+
+        These define new properties so their names stay as they are, their values
+        can only be guessed to be image references by the name.
+        """
+
+        value = propertyDefinition.get("initialValue")
+        if value is None:
+            return
+
+        name = propertyDefinition.get("name", "")
+        if name.endswith(self.guessedImageRule[1]):
+            try:
+                propertyDefinition.set("initialValue", self.convertImage(value))
+
+            except RuntimeError:
+                # best effort only
+                pass
+
+migration3To4 = PropertyMigration(PROPERTY_RENAMES, convertImageReferenceToName)
+migration4To3 = PropertyMigration([(new, old) for old, new in PROPERTY_RENAMES], convertImageNameToReference)
+
 class Layout2TypeDetector(compatibility.TypeDetector):
     def getType(self):
         return CEGUILayout2
@@ -85,21 +223,17 @@ class Layout3To4Layer(compatibility.Layer):
             element.set(targetAttributeName, element.get(sourceAttributeName))
             del element.attrib[sourceAttributeName]
 
-    def convertToRelativeNames(self, window, leadingName = ""):
-        ret = ""
+    @classmethod
+    def getRelativeName(cls, name, leadingName):
+        """Returns (relativeName, log) for given absolute window name
+        and absolute name of its parent window.
+        """
 
-        name = window.get("Name", "")
+        ret = ""
 
         if name.startswith(leadingName + "/"):
             name = name[len(leadingName + "/"):]
 
-            for childWindow in window.findall("Window"):
-                ret += self.convertToRelativeNames(childWindow, leadingName + "/" + name)
-        else:
-
-            for childWindow in window.findall("Window"):
-                ret += self.convertToRelativeNames(childWindow, name)
-
         delimiterPosition = name.rfind("/")
         if delimiterPosition != -1:
             oldName = name
@@ -107,6 +241,20 @@ class Layout3To4Layer(compatibility.Layer):
 
             ret += "Warning: Renaming '%s' to '%s' because it contains '/' even after prefix stripping (and '/' is a disallowed character!)\n" % (oldName, name)
 
+        return name, ret
+
+    def convertToRelativeNames(self, window, leadingName = ""):
+        ret = ""
+
+        # child windows are prefixed with the original name of their parent
+        name = window.get("Name", "")
+
+        for childWindow in window.findall("Window"):
+            ret += self.convertToRelativeNames(childWindow, name)
+
+        name, log = Layout3To4Layer.getRelativeName(name, leadingName)
+        ret += log
+
         window.set("Name", name)
 
         return ret
@@ -127,112 +275,54 @@ class Layout3To4Layer(compatibility.Layer):
                 windowType = ""
                 #raise RuntimeError("Can't figure out windowType when transforming properties, tried attribute 'Type'")
 
-        # convert the properties that had 'Unified' prefix
-        for property_ in element.findall(tag):
-            name = property_.get(nameAttribute, "")
-
-            if name == "ZOrderChangeEnabled":
-                name = "ZOrderingEnabled"
-
-            elif name == "MouseButtonDownAutoRepeat":
-                name = "MouseAutoRepeatEnabled"
-
-            elif name == "CustomTooltipType":
-                name = "TooltipType"
-            elif name == "Tooltip":
-                name = "TooltipText"
-
-            elif name == "RiseOnClick":
-                name = "RiseOnClickEnabled"
-
-            elif name == "UnifiedAreaRect":
-                name = "Area"
-            elif name == "UnifiedPosition":
-                name = "Position"
-            elif name == "UnifiedXPosition":
-                name = "XPosition"
-            elif name == "UnifiedYPosition":
-                name = "YPosition"
-            elif name == "UnifiedSize":
-                name = "Size"
-            elif name == "UnifiedWidth":
-                name = "Width"
-            elif name == "UnifiedHeight":
-                name = "Height"
-            elif name == "UnifiedMinSize":
-                name = "MinSize"
-            elif name == "UnifiedMaxSize":
-                name = "MaxSize"
-
-            if name != "":
-                property_.set(nameAttribute, name)
-
-            def convertImagePropertyToName(property_):
-                value = property_.get(valueAttribute)
-                if value is None:
-                    value = property_.text
-
-                split = value.split("image:", 1)
-                if len(split) != 2:
-                    raise RuntimeError("Failed parsing value '%s' as 0.7 image reference" % (value))
-
-                split[0] = split[0][4:] # get rid of "set:"
-
-                # strip both of whitespaces left and right
-                split[0] = split[0].strip()
-                split[1] = split[1].strip()
-
-                property_.set(valueAttribute, "%s/%s" % (split[0], split[1]))
-
-            if windowType.endswith("StaticImage"):
-                if name == "Image":
-                    convertImagePropertyToName(property_)
-
-            elif windowType.endswith("ImageButton"):
-                if name in ["NormalImage", "HoverImage", "PushedImage"]:
-                    convertImagePropertyToName(property_)
-
-            elif windowType.endswith("FrameWindow"):
-                if name.endswith("SizingCursorImage"):
-                    convertImagePropertyToName(property_)
-
-            elif windowType.endswith("ListHeaderSegment"):
-                if name in ["MovingCursorImage", "SizingCursorImage"]:
-                    convertImagePropertyToName(property_)
-
-            else:
-                # we have done all explicit migrations, at this point the best we can do is guess
-                # if a property name ends with Image, it is most likely an image
-                if name.endswith("Image"):
-                    try:
-                        convertImagePropertyToName(property_)
-
-                    except:
-                        # best effort only, we don't have enough info
-                        pass
+        migration3To4.migratePropertiesOf(element, tag, nameAttribute, valueAttribute, windowType)
+
+    @classmethod
+    def transformProperty(cls, property_, nameAttribute = "Name", valueAttribute = "Value", windowType = ""):
+        migration3To4.migrateProperty(property_, nameAttribute, valueAttribute, windowType)
+
+    def convertLayoutImport(self, layoutImport):
+        self.transformAttribute(layoutImport, "filename")
+        self.transformAttribute(layoutImport, "resourceGroup")
+        if layoutImport.get("Prefix") is not None:
+            # no such thing is available in layout version 4
+            del layoutImport.attrib["Prefix"]
+
+    def convertProperty(self, property_, windowType):
+        Layout3To4Layer.transformProperty(property_, windowType = windowType)
+
+        property_.set("name", property_.get("Name"))
+        del property_.attrib["Name"]
+
+        if property_.get("Value") is not None:
+            property_.set("value", property_.get("Value"))
+            del property_.attrib["Value"]
+
+    def convertEvent(self, event):
+        self.transformAttribute(event, "name")
+        self.transformAttribute(event, "function")
+
+    def convertWindowAttributes(self, window):
+        if window.get("Name") is not None:
+            window.set("name", window.get("Name"))
+            del window.attrib["Name"]
+
+        if window.get("Type") is not None:
+            window.set("type", window.get("Type"))
+            del window.attrib["Type"]
 
     def applyChangesRecursively(self, window):
         ret = ""
 
         for layoutImport in window.findall("LayoutImport"):
-            self.transformAttribute(layoutImport, "filename")
-            self.transformAttribute(layoutImport, "resourceGroup")
-            if layoutImport.get("Prefix") is not None:
-                # no such thing is available in layout version 4
-                del layoutImport.attrib["Prefix"]
+            self.convertLayoutImport(layoutImport)
 
-        Layout3To4Layer.transformPropertiesOf(window)
+        windowType = window.get("Type", "")
         for property_ in window.findall("Property"):
-            property_.set("name", property_.get("Name"))
-            del property_.attrib["Name"]
-
-            if property_.get("Value") is not None:
-                property_.set("value", property_.get("Value"))
-                del property_.attrib["Value"]
+            self.convertProperty(property_, windowType)
 
         for event in window.findall("Event"):
-            self.transformAttribute(event, "name")
-            self.transformAttribute(event, "function")
+            self.convertEvent(event)
 
         for childWindow in window.findall("Window"):
             self.applyChangesRecursively(childWindow)
@@ -241,21 +331,11 @@ class Layout3To4Layer(compatibility.Layer):
             self.convertAutoWindowSuffix(autoWindow)
             self.applyChangesRecursively(autoWindow)
 
-        if window.get("Name") is not None:
-            window.set("name", window.get("Name"))
-            del window.attrib["Name"]
-
-        if window.get("Type") is not None:
-            window.set("type", window.get("Type"))
-            del window.attrib["Type"]
+        self.convertWindowAttributes(window)
 
         return ret
 
-    def transform(self, data):
-        log = ""
-
-        root = ElementTree.fromstring(data.encode("utf-8"))
-
+    def convertRootAttributes(self, root):
         # version 4 has a version attribute
         root.set("version", "4")
 
@@ -263,6 +343,13 @@ class Layout3To4Layer(compatibility.Layer):
         if root.get("Parent") is not None:
             del root.attrib["Parent"]
 
+    def transform(self, data):
+        log = ""
+
+        root = xmlbackend.fromstring(data.encode("utf-8"))
+
+        self.convertRootAttributes(root)
+
         for window in root.findall("Window"):
             # should be only one window
 
@@ -274,6 +361,9 @@ class Layout3To4Layer(compatibility.Layer):
 
         return unicode(ceguihelpers.prettyPrintXMLElement(root), encoding = "utf-8")
 
+    def transformStream(self, source, target):
+        ceguihelpers.streamTransformXML(source, target, Layout3To4StreamHandler(self))
+
 class Layout4To3Layer(compatibility.Layer):
     def getSourceType(self):
         return CEGUILayout4
@@ -319,103 +409,54 @@ class Layout4To3Layer(compatibility.Layer):
                 windowType = ""
                 #raise RuntimeError("Can't figure out windowType when transforming properties, tried attribute 'Type'")
 
-        # convert the properties that had 'Unified' prefix in 0.7
-        for property_ in element.findall(tag):
-            name = property_.get(nameAttribute, "")
-
-            if name == "ZOrderingEnabled":
-                name = "ZOrderChangeEnabled"
-
-            elif name == "MouseAutoRepeatEnabled":
-                name = "MouseButtonDownAutoRepeat"
-
-            elif name == "TooltipType":
-                name = "CustomTooltipType"
-            elif name == "TooltipText":
-                name = "Tooltip"
-
-            elif name == "RiseOnClickEnabled":
-                name = "RiseOnClick"
-
-            elif name == "Area":
-                name = "UnifiedAreaRect"
-            elif name == "Position":
-                name = "UnifiedPosition"
-            elif name == "XPosition":
-                name = "UnifiedXPosition"
-            elif name == "YPosition":
-                name = "UnifiedYPosition"
-            elif name == "Size":
-                name = "UnifiedSize"
-            elif name == "Width":
-                name = "UnifiedWidth"
-            elif name == "Height":
-                name = "UnifiedHeight"
-            elif name == "MinSize":
-                name = "UnifiedMinSize"
-            elif name == "MaxSize":
-                name = "UnifiedMaxSize"
-
-            if name != "":
-                property_.set(nameAttribute, name)
-
-            def convertImagePropertyToImagesetImage(property_):
-                value = property_.get(valueAttribute)
-                if value is None:
-                    value = property_.text
-
-                split = value.split("/", 1)
-                if len(split) != 2:
-                    raise RuntimeError("Failed parsing value '%s' as CEGUI 0.8+ image reference" % (value))
-                property_.set(valueAttribute, "set:%s image:%s" % (split[0], split[1]))
-
-            if windowType.endswith("StaticImage"):
-                if name == "Image":
-                    convertImagePropertyToImagesetImage(property_)
-
-            elif windowType.endswith("ImageButton"):
-                if name in ["NormalImage", "HoverImage", "PushedImage"]:
-                    convertImagePropertyToImagesetImage(property_)
-                    return
-
-            elif windowType.endswith("FrameWindow"):
-                if name.endswith("SizingCursorImage"):
-                    convertImagePropertyToImagesetImage(property_)
-
-            elif windowType.endswith("ListHeaderSegment"):
-                if name in ["MovingCursorImage", "SizingCursorImage"]:
-                    convertImagePropertyToImagesetImage(property_)
-
-            else:
-                # we have done all explicit migrations, at this point the best we can do is guess
-                # if a property name ends with Image, it is most likely an image
-                if name.endswith("Image"):
-                    try:
-                        convertImagePropertyToImagesetImage(property_)
-
-                    except:
-                        # best effort only, we don't have enough info
-                        pass
+        migration4To3.migratePropertiesOf(element, tag, nameAttribute, valueAttribute, windowType)
+
+    @classmethod
+    def transformProperty(cls, property_, nameAttribute = "name", valueAttribute = "value", windowType = ""):
+        migration4To3.migrateProperty(property_, nameAttribute, valueAttribute, windowType)
+
+    def convertLayoutImport(self, layoutImport):
+        self.transformAttribute(layoutImport, "filename")
+        self.transformAttribute(layoutImport, "resourceGroup")
+
+    def convertProperty(self, property_, windowType):
+        Layout4To3Layer.transformProperty(property_, windowType = windowType)
+
+        property_.set("Name", property_.get("name"))
+        del property_.attrib["name"]
+
+        if property_.get("value") is not None:
+            property_.set("Value", property_.get("value"))
+            del property_.attrib["value"]
+
+    def convertEvent(self, event):
+        self.transformAttribute(event, "name")
+        self.transformAttribute(event, "function")
+
+    def convertUserString(self, userString):
+        raise NotImplementedError("Can't migrate, UserString element is not supported in layout version 3 (before CEGUI 0.7)")
+
+    def convertWindowAttributes(self, window):
+        if window.get("name") is not None:
+            window.set("Name", window.get("name"))
+            del window.attrib["name"]
+
+        if window.get("type") is not None:
+            window.set("Type", window.get("type"))
+            del window.attrib["type"]
 
     def applyChangesRecursively(self, window):
         ret = ""
 
         for layoutImport in window.findall("LayoutImport"):
-            self.transformAttribute(layoutImport, "filename")
-            self.transformAttribute(layoutImport, "resourceGroup")
+            self.convertLayoutImport(layoutImport)
 
-        Layout4To3Layer.transformPropertiesOf(window)
+        windowType = window.get("type", "")
         for property_ in window.findall("Property"):
-            property_.set("Name", property_.get("name"))
-            del property_.attrib["name"]
-
-            if property_.get("value") is not None:
-                property_.set("Value", property_.get("value"))
-                del property_.attrib["value"]
+            self.convertProperty(property_, windowType)
 
         for event in window.findall("Event"):
-            self.transformAttribute(event, "name")
-            self.transformAttribute(event, "function")
+            self.convertEvent(event)
 
         for childWindow in window.findall("Window"):
             self.applyChangesRecursively(childWindow)
@@ -424,26 +465,23 @@ class Layout4To3Layer(compatibility.Layer):
             self.convertAutoWindowSuffix(autoWindow)
             self.applyChangesRecursively(autoWindow)
 
-        for _ in window.findall("UserString"):
-            raise NotImplementedError("Can't migrate, UserString element is not supported in layout version 3 (before CEGUI 0.7)")
-
-        if window.get("name") is not None:
-            window.set("Name", window.get("name"))
-            del window.attrib["name"]
+        for userString in window.findall("UserString"):
+            self.convertUserString(userString)
 
-        if window.get("type") is not None:
-            window.set("Type", window.get("type"))
-            del window.attrib["type"]
+        self.convertWindowAttributes(window)
 
         return ret
 
+    def convertRootAttributes(self, root):
+        # version 3 must not have a version attribute
+        del root.attrib["version"]
+
     def transform(self, data):
         log = ""
 
-        root = ElementTree.fromstring(data.encode("utf-8"))
+        root = xmlbackend.fromstring(data.encode("utf-8"))
 
-        # version 3 must not have a version attribute
-        del root.attrib["version"]
+        self.convertRootAttributes(root)
 
         for window in root.findall("Window"):
             # should be only one window
@@ -455,3 +493,121 @@ class Layout4To3Layer(compatibility.Layer):
             log += self.applyChangesRecursively(window)
 
         return unicode(ceguihelpers.prettyPrintXMLElement(root), encoding = "utf-8")
+
+    def transformStream(self, source, target):
+        ceguihelpers.streamTransformXML(source, target, Layout4To3StreamHandler(self))
+
+class LayoutStreamHandler(ceguihelpers.StreamingTransformHandler):
+    """Applies changes of a layout layer element by element as the layout is
+    being parsed, see ceguihelpers.streamTransformXML.
+
+    Produces the same output as the tree based transform of the layer.
+    """
+
+    # names of the window name and type attributes in the source data
+    nameAttribute = None
+    typeAttribute = None
+
+    def __init__(self, layer):
+        super(LayoutStreamHandler, self).__init__()
+
+        self.layer = layer
+        # one OpenElement for each element in ancestors
+        self.openElements = []
+
+    class OpenElement(object):
+        __slots__ = ["applied", "namesChain", "name", "convertedName", "type"]
+
+        def __init__(self, applied = False, namesChain = False, name = "", type_ = ""):
+            # whether changes are applied to children of this element
+            self.applied = applied
+            # whether this is a Window that takes part in name conversion
+            self.namesChain = namesChain
+            # name and type as they were in the source data
+            self.name = name
+            self.convertedName = name
+            self.type = type_
+
+    def convertName(self, name, parent):
+        """Converts name of a window to the target format, parent is the OpenElement
+        of the parent window or None if the window is a root window.
+        """
+
+        raise NotImplementedError("Layout stream handlers have to override LayoutStreamHandler.convertName!")
+
+    def startElement(self, element, ancestors):
+        if len(ancestors) == 0:
+            self.layer.convertRootAttributes(element)
+            self.openElements.append(LayoutStreamHandler.OpenElement())
+            return
+
+        parent = self.openElements[-1]
+        isRootWindow = len(ancestors) == 1
+
+        openElement = LayoutStreamHandler.OpenElement(name = element.get(self.nameAttribute, ""), type_ = element.get(self.typeAttribute, ""))
+
+        if element.tag == "Window" and (isRootWindow or parent.applied):
+            openElement.applied = True
+            openElement.namesChain = isRootWindow or parent.namesChain
+
+            if openElement.namesChain:
+                openElement.convertedName = self.convertName(openElement.name, None if isRootWindow else parent)
+                element.set(self.nameAttribute, openElement.convertedName)
+
+            self.layer.convertWindowAttributes(element)
+
+        elif element.tag == "AutoWindow" and parent.applied:
+            openElement.applied = True
+
+            self.layer.convertAutoWindowSuffix(element)
+            self.layer.convertWindowAttributes(element)
+
+        self.openElements.append(openElement)
+
+    def endElement(self, element, ancestors):
+        self.openElements.pop()
+
+        if len(self.openElements) == 0:
+            return
+
+        parent = self.openElements[-1]
+        if parent.applied:
+            self.convertChild(element, parent)
+
+    def convertChild(self, element, parent):
+        """Converts an element that isn't a window but is a child of a converted window"""
+
+        if element.tag == "LayoutImport":
+            self.layer.convertLayoutImport(element)
+
+        elif element.tag == "Property":
+            self.layer.convertProperty(element, parent.type)
+
+        elif element.tag == "Event":
+            self.layer.convertEvent(element)
+
+class Layout3To4StreamHandler(LayoutStreamHandler):
+    nameAttribute = "Name"
+    typeAttribute = "Type"
+
+    def convertName(self, name, parent):
+        # names of children are stripped of the parent's original absolute name
+        name, _ = Layout3To4Layer.getRelativeName(name, parent.name if parent is not None else "")
+        return name
+
+class Layout4To3StreamHandler(LayoutStreamHandler):
+    nameAttribute = "name"
+    typeAttribute = "type"
+
+    def convertName(self, name, parent):
+        if parent is not None and parent.convertedName != "":
+            name = parent.convertedName + "/" + name
+
+        return name
+
+    def convertChild(self, element, parent):
+        super(Layout4To3StreamHandler, self).convertChild(element, parent)
+
+        if element.tag == "UserString":
+            self.layer.convertUserString(element)
+
@@ -22,7 +22,7 @@ from ceed import compatibility
 from ceed.compatibility import layout as compatibility_layout
 from ceed.compatibility import ceguihelpers
 
-from xml.etree import cElementTree as ElementTree
+from ceed import xmlbackend
 
 import copy
 
@@ -119,15 +119,19 @@ class LookNFeel6To7Layer(compatibility.Layer):
 
         return dimOp
 
-    def transform(self, data):
-        root = ElementTree.fromstring(data)
+    def convertRootAttributes(self, root):
+        # version 7 has a version attribute
+        root.set("version", "7")
+
+    def applyChanges(self, root):
+        """Applies all changes except the ones to the root element attributes
+        to given element and its subtree
+        """
+
         # Fix for Python < 2.7.
         if not hasattr(root, "iter"):
             root.iter = root.getiterator
 
-        # version 7 has a version attribute
-        root.set("version", "7")
-
         # New image addressing: Imageset/Image
         def convertImageElementToName(element):
             imageset = element.get("imageset")
@@ -181,7 +185,8 @@ class LookNFeel6To7Layer(compatibility.Layer):
             tailTree.text = None #newTree.text
             tailTree.tail = newTree.tail
             tailTree.tag = newTree.tag
-            tailTree.attrib = newTree.attrib
+            # attrib can't be assigned to with lxml, tailTree.attrib is empty after clear()
+            tailTree.attrib.update(newTree.attrib)
             tailTree[:] = newTree[:]
             # end of trick
 
@@ -194,14 +199,29 @@ class LookNFeel6To7Layer(compatibility.Layer):
                 element.set("name", "Caret")
 
         # transform properties
+        migration = compatibility_layout.cegui.migration3To4
         for element in root.iter("WidgetLook"):
-            compatibility_layout.cegui.Layout3To4Layer.transformPropertiesOf(element, nameAttribute = "name", valueAttribute = "value", windowType = element.get("name"))
+            migration.migratePropertiesOf(element, "Property", "name", "value", element.get("name", ""))
+
+            for propertyDefinition in element.findall("PropertyDefinition"):
+                migration.migratePropertyDefinition(propertyDefinition)
+            for propertyLinkDefinition in element.findall("PropertyLinkDefinition"):
+                migration.migratePropertyDefinition(propertyLinkDefinition)
 
             for childElement in element.iter("Child"):
-                compatibility_layout.cegui.Layout3To4Layer.transformPropertiesOf(childElement, nameAttribute = "name", valueAttribute = "value", windowType = childElement.get("type"))
+                migration.migratePropertiesOf(childElement, "Property", "name", "value", childElement.get("type", ""))
+
+    def transform(self, data):
+        root = xmlbackend.fromstring(data)
+
+        self.convertRootAttributes(root)
+        self.applyChanges(root)
 
         return ceguihelpers.prettyPrintXMLElement(root)
 
+    def transformStream(self, source, target):
+        ceguihelpers.streamTransformXML(source, target, LookNFeelStreamHandler(self))
+
 
 class LookNFeel7To6Layer(compatibility.Layer):
     def getSourceType(self):
@@ -210,12 +230,15 @@ class LookNFeel7To6Layer(compatibility.Layer):
     def getTargetType(self):
         return CEGUILookNFeel6
 
-    def transform(self, data):
-        root = ElementTree.fromstring(data)
-
+    def convertRootAttributes(self, root):
         # version 6 must not have a version attribute
         del root.attrib["version"]
 
+    def applyChanges(self, root):
+        """Applies all changes except the ones to the root element attributes
+        to given element and its subtree
+        """
+
         # New image addressing: Imageset/Image
         def convertImageElementToImagesetImage(element):
             name = element.get("name")
@@ -246,10 +269,51 @@ class LookNFeel7To6Layer(compatibility.Layer):
                 element.set("name", "Carat")
 
         # transform properties
+        migration = compatibility_layout.cegui.migration4To3
         for element in root.iter("WidgetLook"):
-            compatibility_layout.cegui.Layout4To3Layer.transformPropertiesOf(element, nameAttribute = "name", valueAttribute = "value", windowType = element.get("name"))
+            migration.migratePropertiesOf(element, "Property", "name", "value", element.get("name", ""))
+
+            for propertyDefinition in element.findall("PropertyDefinition"):
+                migration.migratePropertyDefinition(propertyDefinition)
+            for propertyLinkDefinition in element.findall("PropertyLinkDefinition"):
+                migration.migratePropertyDefinition(propertyLinkDefinition)
 
             for childElement in element.iter("Child"):
-                compatibility_layout.cegui.Layout4To3Layer.transformPropertiesOf(childElement, nameAttribute = "name", valueAttribute = "value", windowType = childElement.get("type"))
+                migration.migratePropertiesOf(childElement, "Property", "name", "value", childElement.get("type", ""))
+
+    def transform(self, data):
+        root = xmlbackend.fromstring(data)
+
+        self.convertRootAttributes(root)
+        self.applyChanges(root)
 
         return ceguihelpers.prettyPrintXMLElement(root)
+
+    def transformStream(self, source, target):
+        ceguihelpers.streamTransformXML(source, target, LookNFeelStreamHandler(self))
+
+
+class LookNFeelStreamHandler(ceguihelpers.StreamingTransformHandler):
+    """Streams a looknfeel through a looknfeel layer one top level element
+    (usually a WidgetLook) at a time.
+
+    Changes are local to WidgetLooks so we only ever hold one of them in memory,
+    the output is the same as with the tree based transform of the layer.
+    """
+
+    def __init__(self, layer):
+        super(LookNFeelStreamHandler, self).__init__()
+
+        self.layer = layer
+
+    def isSubtreeBuffered(self, element, ancestors):
+        return len(ancestors) == 1
+
+    def startElement(self, element, ancestors):
+        if len(ancestors) == 0:
+            self.layer.convertRootAttributes(element)
+
+    def endElement(self, element, ancestors):
+        if len(ancestors) == 1:
+            self.layer.applyChanges(element)
+
@@ -0,0 +1,572 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+"""Preparation of project resources for the embedded CEGUI instance.
+
+Reading resource files, detecting their data types and converting them
+to the native data type of the editor doesn't need CEGUI at all. It's done
+here, possibly in parallel worker processes, and only the resulting native
+data are handed over to CEGUI (see cegui.Instance.syncToProject).
+"""
+
+# NOTE: This must not depend on PySide or PyCEGUI, it runs in worker processes!
+#       That's also why it lives here and not in ceed.cegui.
+
+from ceed import compatibility
+from ceed import xmlbackend
+
+import hashlib
+import importlib
+import multiprocessing
+import os
+
+SCHEME = "scheme"
+IMAGESET = "imageset"
+FONT = "font"
+LOOKNFEEL = "looknfeel"
+
+# resource kind -> module holding the compatibility manager of that kind
+COMPATIBILITY_MODULES = {
+    SCHEME: "ceed.compatibility.scheme",
+    IMAGESET: "ceed.compatibility.imageset",
+    FONT: "ceed.compatibility.font",
+    LOOKNFEEL: "ceed.compatibility.looknfeel"
+}
+
+# resource kind -> resource group used when the scheme doesn't say,
+# these are the defaults cegui.Instance.setDefaultResourceGroups sets in CEGUI
+DEFAULT_RESOURCE_GROUPS = {
+    SCHEME: "schemes",
+    IMAGESET: "imagesets",
+    FONT: "fonts",
+    LOOKNFEEL: "looknfeels"
+}
+
+# native scheme element -> kind of the resource it references
+SCHEME_REFERENCE_ELEMENTS = {
+    "Imageset": IMAGESET,
+    "Font": FONT,
+    "LookNFeel": LOOKNFEEL
+}
+
+class PreparedResource(object):
+    """Native data of a resource file, ready to be handed over to CEGUI.
+
+    If the file can't be used, nativeData is None and errorTitle with errorMessage
+    describe why, they are meant to be shown to the user.
+
+    fileState is the FileState of the file at the time it was read, names and imagesets
+    describe the native data, see ManifestEntry.
+    """
+
+    def __init__(self, kind, path, nativeData = None, errorTitle = None, errorMessage = None, fileState = None):
+        self.kind = kind
+        self.path = path
+        self.nativeData = nativeData
+        self.errorTitle = errorTitle
+        self.errorMessage = errorMessage
+        self.fileState = fileState
+
+        self.names = []
+        self.imagesets = []
+        if nativeData is not None:
+            self.names, self.imagesets = describeNativeData(kind, nativeData)
+
+    def hasError(self):
+        return self.errorTitle is not None
+
+def normalisePath(path):
+    """Returns the path resources at given absolute path are known under,
+    different paths pointing to the same file give the same result
+    """
+
+    return os.path.normcase(os.path.realpath(path))
+
+def prepareResource(kind, path, ceguiVersion):
+    """Reads the resource file at given absolute path, detects its data type and converts
+    it to the native data type, returns PreparedResource.
+
+    ceguiVersion is the target CEGUI version of the project, it's used to decide the data
+    type when the data match multiple types.
+    """
+
+    manager = importlib.import_module(COMPATIBILITY_MODULES[kind]).manager
+
+    stat = os.stat(path)
+    rawData = open(path, "r").read()
+    fileState = FileState(stat.st_mtime, stat.st_size, hashlib.md5(rawData).hexdigest())
+
+    rawDataType = manager.EditorNativeType
+
+    try:
+        rawDataType = manager.guessType(rawData, path)
+
+    except compatibility.NoPossibleTypesError:
+        return PreparedResource(kind, path,
+                                errorTitle = "%s doesn't match any known data type" % (kind.capitalize()),
+                                errorMessage = "The %s '%s' wasn't recognised by CEED as any %s data type known to it. Please check that the data isn't corrupted. CEGUI instance synchronisation aborted!" % (kind, path, kind),
+                                fileState = fileState)
+
+    except compatibility.MultiplePossibleTypesError as e:
+        suitableVersion = manager.getSuitableDataTypeForCEGUIVersion(ceguiVersion)
+
+        if suitableVersion not in e.possibleTypes:
+            return PreparedResource(kind, path,
+                                    errorTitle = "Incorrect %s data type" % (kind),
+                                    errorMessage = "The %s '%s' checked out as some potential data types, however none of these is suitable for your project's target CEGUI version '%s', please check your project settings! CEGUI instance synchronisation aborted!" % (kind, path, suitableVersion),
+                                    fileState = fileState)
+
+        rawDataType = suitableVersion
+
+    return PreparedResource(kind, path, manager.transform(rawDataType, manager.EditorNativeType, rawData), fileState = fileState)
+
+def _prepareResourceArguments(arguments):
+    # multiprocessing can only map functions taking one argument
+    return prepareResource(*arguments)
+
+def prepareResources(resources, ceguiVersion, jobs = None):
+    """Prepares given resources, a list of (kind, absolutePath) tuples, in parallel.
+    Yields PreparedResources as they are finished, not necessarily in the given order.
+
+    jobs is the number of worker processes, None uses one per CPU, 1 prepares in this process.
+    Exceptions raised while preparing are propagated.
+    """
+
+    arguments = [(kind, path, ceguiVersion) for kind, path in resources]
+
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+
+    jobs = min(jobs, len(arguments))
+
+    if jobs <= 1:
+        for argument in arguments:
+            yield _prepareResourceArguments(argument)
+
+        return
+
+    pool = multiprocessing.Pool(jobs)
+    try:
+        for resource in pool.imap_unordered(_prepareResourceArguments, arguments):
+            yield resource
+
+    finally:
+        pool.terminate()
+        pool.join()
+
+def getSchemeReferences(nativeSchemeData):
+    """Returns resources referenced by given scheme (in the native data type)
+    as a list of (kind, filename, resourceGroup) tuples in the order CEGUI loads them.
+
+    resourceGroup is the default resource group of the kind if the scheme doesn't specify one.
+    Image file imagesets aren't included, they don't go through the compatibility layers.
+    """
+
+    root = xmlbackend.fromstring(nativeSchemeData)
+
+    ret = []
+    for tag in ["Imageset", "Font", "LookNFeel"]:
+        kind = SCHEME_REFERENCE_ELEMENTS[tag]
+
+        for element in root.findall(tag):
+            resourceGroup = element.get("resourceGroup", "")
+            ret.append((kind, element.get("filename", ""), resourceGroup if resourceGroup != "" else DEFAULT_RESOURCE_GROUPS[kind]))
+
+    return ret
+
+class FileState(object):
+    """State of a resource file used to tell whether it changed since it was loaded"""
+
+    def __init__(self, mtime, size, contentHash):
+        self.mtime = mtime
+        self.size = size
+        self.contentHash = contentHash
+
+    @classmethod
+    def isUnchanged(cls, path, fileState):
+        """Checks whether file at given path still has given FileState.
+
+        The content is only hashed when modification time or size differ, so that
+        touched but otherwise unchanged files don't count as changed.
+        """
+
+        try:
+            stat = os.stat(path)
+
+        except OSError:
+            # deleted or inaccessible files have certainly changed
+            return False
+
+        if stat.st_mtime == fileState.mtime and stat.st_size == fileState.size:
+            return True
+
+        return hashlib.md5(open(path, "r").read()).hexdigest() == fileState.contentHash
+
+class ManifestEntry(object):
+    """What the CEGUI instance loaded from one resource file.
+
+    names are CEGUI names of what the file defines, the imageset name for imagesets,
+    names of the fonts for fonts, the scheme name for schemes and the names of all WidgetLooks
+    for looknfeels. imagesets are names of imagesets a looknfeel takes images from.
+    """
+
+    def __init__(self, kind, path, fileState, names, imagesets = []):
+        self.kind = kind
+        self.path = path
+        self.fileState = fileState
+        self.names = names
+        self.imagesets = imagesets
+
+def describeNativeData(kind, nativeData):
+    """Returns (names, imagesets) of given native data, see ManifestEntry"""
+
+    root = xmlbackend.fromstring(nativeData)
+
+    if kind == FONT:
+        # native font data has a Fonts root element, the names are on the Font elements in it
+        return [font.get("name", "") for font in root.iter("Font")], []
+
+    if kind != LOOKNFEEL:
+        return [root.get("name", "")], []
+
+    names = [widgetLook.get("name", "") for widgetLook in root.iter("WidgetLook")]
+
+    # WidgetLooks keep pointers to images they use, they have to be
+    # parsed again when these images are recreated
+    imagesets = set()
+    for tag in ["Image", "ImageDim"]:
+        for element in root.iter(tag):
+            imageName = element.get("name", "")
+            if "/" in imageName:
+                imagesets.add(imageName.split("/", 1)[0])
+
+    return names, sorted(imagesets)
+
+class ResyncPlan(object):
+    """Paths of resources that have to be recreated to bring a CEGUI instance
+    in sync with changed resource files, see ResourceManifest.planResync
+    """
+
+    def __init__(self):
+        # schemes are recreated with all the resources they reference
+        self.schemes = []
+        # resources recreated on their own
+        self.imagesets = []
+        self.fonts = []
+        self.looknfeels = []
+
+    def isEmpty(self):
+        return len(self.schemes) == 0 and len(self.imagesets) == 0 and len(self.fonts) == 0 and len(self.looknfeels) == 0
+
+class ResourceManifest(object):
+    """Keeps track of resource files loaded into a CEGUI instance, which files
+    each scheme references and the state the files were in when loaded.
+    """
+
+    def __init__(self, resourceDirectories, ceguiVersion):
+        # anything depending on these invalidates the whole manifest when it changes
+        self.resourceDirectories = resourceDirectories
+        self.ceguiVersion = ceguiVersion
+
+        # absolute path -> ManifestEntry
+        self.entries = {}
+        # absolute scheme path -> list of absolute paths of resources it references
+        self.schemeReferences = {}
+
+    def addResource(self, preparedResource):
+        self.entries[preparedResource.path] = ManifestEntry(preparedResource.kind, preparedResource.path, preparedResource.fileState,
+                                                            preparedResource.names, preparedResource.imagesets)
+
+    def recreateResource(self, preparedResource, registry, destroy, create):
+        """Replaces what was loaded from the file of given prepared resource with its new contents.
+
+        destroy is called with each name the file defined when it was loaded, create is called
+        with the new native data unless the registry rejects it (see ResourceRegistry.register).
+        """
+
+        for name in self.entries[preparedResource.path].names:
+            destroy(name)
+
+        if registry.register(preparedResource.kind, preparedResource.path, preparedResource.names):
+            create(preparedResource.nativeData)
+
+        self.addResource(preparedResource)
+
+    def setSchemeReferences(self, schemePath, referencedPaths):
+        self.schemeReferences[schemePath] = list(referencedPaths)
+
+    def isCompatibleWith(self, resourceDirectories, ceguiVersion, schemePaths):
+        """Checks whether the manifest can be used to incrementally resync
+        a project with given settings and scheme files
+        """
+
+        return self.resourceDirectories == resourceDirectories and self.ceguiVersion == ceguiVersion and \
+               sorted(self.schemeReferences.keys()) == sorted(schemePaths)
+
+    def removeUnreferencedResources(self):
+        """Forgets resources that aren't schemes and aren't referenced by any scheme"""
+
+        referencedPaths = set(self.schemeReferences.keys())
+        for paths in self.schemeReferences.itervalues():
+            referencedPaths.update(paths)
+
+        for path in self.entries.keys():
+            if path not in referencedPaths:
+                del self.entries[path]
+
+    def getWidgetLookSourceHash(self, widgetLook):
+        """Returns hash of contents of the looknfeel defining given WidgetLook and the imagesets
+        it takes images from, None if no loaded looknfeel defines it
+        """
+
+        looknfeels = [entry for entry in self.entries.itervalues() if entry.kind == LOOKNFEEL and widgetLook in entry.names]
+        if len(looknfeels) == 0:
+            return None
+
+        contentHashes = []
+        for looknfeel in looknfeels:
+            contentHashes.append(looknfeel.fileState.contentHash)
+
+            for entry in self.entries.itervalues():
+                if entry.kind == IMAGESET and not set(entry.names).isdisjoint(looknfeel.imagesets):
+                    contentHashes.append(entry.fileState.contentHash)
+
+        return hashlib.md5(widgetLook.encode("utf-8") + "".join(sorted(contentHashes))).hexdigest()
+
+    def getChangedPaths(self):
+        """Returns sorted paths of all resource files that changed since they were loaded"""
+
+        return sorted(path for path, entry in self.entries.iteritems() if not FileState.isUnchanged(path, entry.fileState))
+
+    def planResync(self, changedPaths):
+        """Decides what has to be recreated when given resource files changed, returns ResyncPlan"""
+
+        changedPaths = set(changedPaths)
+        ret = ResyncPlan()
+
+        # schemes are recreated as a whole, CEGUI unloads resources of a scheme when destroying it
+        ret.schemes = sorted(path for path in changedPaths if path in self.schemeReferences)
+
+        recreatedWithSchemes = set()
+        for schemePath in ret.schemes:
+            recreatedWithSchemes.update(self.schemeReferences[schemePath])
+
+        # resources the recreated schemes share with the other schemes are gone as well but the recreated
+        # schemes may no longer reference them, they have to be recreated on their own
+        sharedWithOtherSchemes = set()
+        for schemePath, referencedPaths in self.schemeReferences.iteritems():
+            if schemePath not in ret.schemes:
+                sharedWithOtherSchemes.update(recreatedWithSchemes.intersection(referencedPaths))
+
+        recreatedPaths = set(path for path in changedPaths if path not in recreatedWithSchemes).union(sharedWithOtherSchemes)
+
+        def changedOfKind(kind):
+            return sorted(path for path in recreatedPaths if path in self.entries and self.entries[path].kind == kind)
+
+        ret.imagesets = changedOfKind(IMAGESET)
+        ret.fonts = changedOfKind(FONT)
+
+        recreatedImagesets = set()
+        for path in ret.imagesets + [path for path in recreatedWithSchemes if path in self.entries and self.entries[path].kind == IMAGESET]:
+            recreatedImagesets.update(self.entries[path].names)
+
+        looknfeels = set(changedOfKind(LOOKNFEEL))
+        for path, entry in self.entries.iteritems():
+            if entry.kind == LOOKNFEEL and (path not in recreatedWithSchemes or path in sharedWithOtherSchemes) and \
+               not recreatedImagesets.isdisjoint(entry.imagesets):
+                looknfeels.add(path)
+
+        ret.looknfeels = sorted(looknfeels)
+
+        return ret
+
+class NameConflict(object):
+    """Two different resource files define something of the same kind with the same name"""
+
+    def __init__(self, kind, name, path, loadedPath):
+        self.kind = kind
+        self.name = name
+        # the file that wasn't loaded because of the conflict
+        self.path = path
+        # the file that was loaded first
+        self.loadedPath = loadedPath
+
+    def __str__(self):
+        return "%s '%s' from '%s' wasn't loaded, '%s' already defines '%s'" % (self.kind, os.path.basename(self.path), self.path, self.loadedPath, self.name)
+
+class ResourceRegistry(object):
+    """Keeps track of resources loaded during one synchronisation of a CEGUI instance.
+
+    Every file is loaded only once no matter how many schemes reference it and no file
+    may redefine something (an imageset, a font, a WidgetLook, ...) another file defined.
+    CEGUI would silently replace it, such files are left out and the conflicts are
+    remembered instead.
+    """
+
+    def __init__(self):
+        # normalised path -> kind
+        self.paths = {}
+        # (kind, name) -> normalised path of the file defining it
+        self.names = {}
+        # list of NameConflicts
+        self.conflicts = []
+        # normalised paths of files left out because of conflicts
+        self.rejectedPaths = set()
+
+    def isRegistered(self, path):
+        return normalisePath(path) in self.paths
+
+    def register(self, kind, path, names):
+        """Registers a resource file defining given names, returns True if it should be
+        loaded, False if it already was or if it conflicts with files registered before
+        """
+
+        path = normalisePath(path)
+
+        if path in self.paths or path in self.rejectedPaths:
+            return False
+
+        conflicts = [NameConflict(kind, name, path, self.names[(kind, name)]) for name in names if (kind, name) in self.names]
+        if len(conflicts) > 0:
+            self.conflicts.extend(conflicts)
+            self.rejectedPaths.add(path)
+            return False
+
+        self.paths[path] = kind
+        for name in names:
+            self.names[(kind, name)] = path
+
+        return True
+
+class SchemeIndexEntry(object):
+    """Cheaply gathered metadata of one scheme, what it would make available if loaded"""
+
+    def __init__(self, path, name, windowTypes, aliases, imagesets, fonts):
+        self.path = path
+        self.name = name
+        # window types of falagard mappings, "TaharezLook/Button" for example
+        self.windowTypes = windowTypes
+        self.aliases = aliases
+        # names of imagesets and fonts the scheme loads
+        self.imagesets = imagesets
+        self.fonts = fonts
+
+    def getSkins(self):
+        return sorted(set(windowType.split("/", 1)[0] for windowType in self.windowTypes if "/" in windowType))
+
+def indexScheme(path, nativeSchemeData):
+    """Returns SchemeIndexEntry of scheme at given path with given native data"""
+
+    root = xmlbackend.fromstring(nativeSchemeData)
+
+    return SchemeIndexEntry(path, root.get("name", ""),
+                            [element.get("windowType", "") for element in root.findall("FalagardMapping")],
+                            [element.get("alias", "") for element in root.findall("WindowAlias")],
+                            [element.get("name", "") for element in root.findall("Imageset") + root.findall("ImagesetFromFile")],
+                            [element.get("name", "") for element in root.findall("Font")])
+
+class SchemeIndex(object):
+    """Tells which scheme provides a widget type, imageset or font without loading any of them.
+
+    Used by the lazy scheme loading, see cegui.Instance.syncToProject.
+    """
+
+    def __init__(self):
+        # absolute path -> SchemeIndexEntry
+        self.entries = {}
+
+        # the first scheme to provide something wins, same as with ResourceRegistry
+        self.schemeByWindowType = {}
+        self.schemeByImageset = {}
+        self.schemeByFont = {}
+
+    def addScheme(self, entry):
+        self.entries[entry.path] = entry
+
+        for windowType in entry.windowTypes + entry.aliases:
+            self.schemeByWindowType.setdefault(windowType, entry.path)
+        for imageset in entry.imagesets:
+            self.schemeByImageset.setdefault(imageset, entry.path)
+        for font in entry.fonts:
+            self.schemeByFont.setdefault(font, entry.path)
+
+    def getSchemeOfWindowType(self, windowType):
+        """Returns path of the scheme providing given window type, None if no scheme does"""
+
+        return self.schemeByWindowType.get(windowType)
+
+    def getSchemeOfFont(self, font):
+        return self.schemeByFont.get(font)
+
+    def getSchemeOfImage(self, image):
+        """Returns path of the scheme loading the imageset of given image ("Imageset/Image")"""
+
+        return self.schemeByImageset.get(image.split("/", 1)[0]) if "/" in image else None
+
+    def getSchemesOfSkin(self, skin):
+        return sorted(path for path, entry in self.entries.iteritems() if skin in entry.getSkins())
+
+    def getSkins(self):
+        skins = set()
+        for entry in self.entries.itervalues():
+            skins.update(entry.getSkins())
+
+        return sorted(skins)
+
+    def getWidgetsBySkin(self):
+        """Returns dict mapping skins to sorted lists of their widgets"""
+
+        ret = {}
+        # aliases don't show up as widgets
+        for path, entry in self.entries.iteritems():
+            for windowType in entry.windowTypes:
+                if "/" not in windowType or self.schemeByWindowType[windowType] != path:
+                    continue
+
+                skin, widget = windowType.split("/", 1)
+                ret.setdefault(skin, []).append(widget)
+
+        for widgets in ret.itervalues():
+            widgets.sort()
+
+        return ret
+
+    def getSchemesReferencedBy(self, nativeData):
+        """Returns sorted paths of schemes that have to be loaded for CEGUI to be able to use given
+        native layout or looknfeel data.
+
+        Every attribute value and text is looked up as a window type, font and image. Values
+        that aren't references never match anything so there is no need to know which ones are.
+        """
+
+        root = xmlbackend.fromstring(nativeData)
+
+        ret = set()
+        for element in root.iter():
+            values = element.attrib.values()
+            if element.text is not None:
+                values.append(element.text.strip())
+
+            for value in values:
+                path = self.getSchemeOfWindowType(value) or self.getSchemeOfFont(value) or self.getSchemeOfImage(value)
+                if path is not None:
+                    ret.add(path)
+
+        return sorted(ret)
@@ -21,7 +21,7 @@
 from ceed import compatibility
 from ceed.compatibility import ceguihelpers
 
-from xml.etree import cElementTree as ElementTree
+from ceed import xmlbackend
 
 CEGUIScheme1 = "CEGUI scheme 1"
 CEGUIScheme2 = "CEGUI scheme 2"
@@ -81,7 +81,7 @@ class CEGUI4ToCEGUI5Layer(compatibility.Layer):
         self.transformAttribute(element, "resourceGroup")
 
     def transform(self, data):
-        root = ElementTree.fromstring(data)
+        root = xmlbackend.fromstring(data)
         root.set("version", "5")
 
         self.transformAttribute(root, "name")
@@ -159,7 +159,7 @@ class CEGUI5ToCEGUI4Layer(compatibility.Layer):
         self.transformAttribute(element, "resourceGroup")
 
     def transform(self, data):
-        root = ElementTree.fromstring(data)
+        root = xmlbackend.fromstring(data)
         del root.attrib["version"]
 
         self.transformAttribute(root, "name")
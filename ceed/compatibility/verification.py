@@ -0,0 +1,225 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+"""Round trip verification of compatibility layers.
+
+Data are migrated from their type to the target type and back through
+Manager.transform, the result is then structurally compared with the original.
+Any difference means that the migration loses (or invents) data.
+"""
+
+# NOTE: Used by the command line migration tool, has to stay importable without PySide!
+
+from ceed import xmlbackend
+
+import codecs
+import importlib
+import multiprocessing
+import os
+
+# compatibility category -> module holding its manager
+CATEGORIES = {
+    "imageset": "ceed.compatibility.imageset",
+    "layout": "ceed.compatibility.layout",
+    "scheme": "ceed.compatibility.scheme",
+    "looknfeel": "ceed.compatibility.looknfeel",
+    "font": "ceed.compatibility.font"
+}
+
+def getManager(category):
+    """Returns compatibility manager of given category (for example 'layout')"""
+
+    if category not in CATEGORIES:
+        raise ValueError("Unknown compatibility category '%s'" % (category))
+
+    return importlib.import_module(CATEGORIES[category]).manager
+
+def _normaliseText(text):
+    # whitespace only differences are never significant to CEGUI
+    return " ".join(text.split()) if text is not None else ""
+
+def _diffElements(original, other, path, differences):
+    if original.tag != other.tag:
+        differences.append("%s: element '%s' became '%s'" % (path, original.tag, other.tag))
+        # nothing else can be meaningfully compared
+        return
+
+    # comparing dicts makes the attribute order irrelevant
+    originalAttributes = dict(original.attrib)
+    otherAttributes = dict(other.attrib)
+    if originalAttributes != otherAttributes:
+        for name in sorted(set(originalAttributes) | set(otherAttributes)):
+            if name not in otherAttributes:
+                differences.append("%s: attribute '%s' (value '%s') is missing" % (path, name, originalAttributes[name]))
+            elif name not in originalAttributes:
+                differences.append("%s: attribute '%s' (value '%s') was added" % (path, name, otherAttributes[name]))
+            elif originalAttributes[name] != otherAttributes[name]:
+                differences.append("%s: attribute '%s' changed from '%s' to '%s'" % (path, name, originalAttributes[name], otherAttributes[name]))
+
+    if _normaliseText(original.text) != _normaliseText(other.text):
+        differences.append("%s: text changed from '%s' to '%s'" % (path, _normaliseText(original.text), _normaliseText(other.text)))
+
+    originalChildren = list(original)
+    otherChildren = list(other)
+
+    # children are indexed per tag, same as in XPath
+    tagCounts = {}
+    for originalChild, otherChild in zip(originalChildren, otherChildren):
+        index = tagCounts.get(originalChild.tag, 0) + 1
+        tagCounts[originalChild.tag] = index
+
+        childPath = "%s/%s[%i]" % (path, originalChild.tag, index)
+        _diffElements(originalChild, otherChild, childPath, differences)
+
+        if _normaliseText(originalChild.tail) != _normaliseText(otherChild.tail):
+            differences.append("%s: tail text changed from '%s' to '%s'" % (childPath, _normaliseText(originalChild.tail), _normaliseText(otherChild.tail)))
+
+    for missingChild in originalChildren[len(otherChildren):]:
+        differences.append("%s: child element '%s' is missing" % (path, missingChild.tag))
+
+    for addedChild in otherChildren[len(originalChildren):]:
+        differences.append("%s: child element '%s' was added" % (path, addedChild.tag))
+
+def diffXML(original, other):
+    """Structurally compares two XML documents and returns list of human readable
+    differences, empty list means the documents are equivalent.
+
+    Attribute order, comments and whitespace in text (apart from separating words)
+    are not taken into account.
+    """
+
+    originalRoot = xmlbackend.fromstring(original)
+    otherRoot = xmlbackend.fromstring(other)
+
+    differences = []
+    _diffElements(originalRoot, otherRoot, "/" + originalRoot.tag, differences)
+
+    return differences
+
+def verifyRoundTrip(manager, sourceType, targetType, data):
+    """Migrates data from sourceType to targetType and back, returns list of differences
+    between the original data and the result, see diffXML.
+
+    Raises LayerNotFoundError if there is no path to the targetType or back.
+    """
+
+    targetData = manager.transform(sourceType, targetType, data)
+    roundTripData = manager.transform(targetType, sourceType, targetData)
+
+    return diffXML(data, roundTripData)
+
+class FileReport(object):
+    """Outcome of verifying one file"""
+
+    OK = "ok"
+    # migration is not lossless
+    DIFFERENT = "different"
+    # the file couldn't be verified, error holds the reason
+    ERROR = "error"
+    # source type is the target type, nothing to verify
+    SKIPPED = "skipped"
+
+    def __init__(self, path, status, sourceType = None, targetType = None, differences = [], error = None):
+        self.path = path
+        self.status = status
+        self.sourceType = sourceType
+        self.targetType = targetType
+        self.differences = differences
+        self.error = error
+
+def verifyFile(category, path, sourceType = "Auto", targetType = "Native"):
+    """Verifies round trip of the file at given path, returns FileReport.
+
+    sourceType "Auto" guesses the type, targetType "Native" uses the native type of the editor.
+    Never raises, errors are reported in the FileReport.
+    """
+
+    try:
+        manager = getManager(category)
+
+        data = codecs.open(path, mode = "r", encoding = "utf-8").read()
+
+        if sourceType == "Auto":
+            sourceType = manager.guessType(data, path)
+        if targetType == "Native":
+            targetType = manager.EditorNativeType
+
+        if sourceType == targetType:
+            return FileReport(path, FileReport.SKIPPED, sourceType, targetType)
+
+        differences = verifyRoundTrip(manager, sourceType, targetType, data)
+
+        return FileReport(path, FileReport.DIFFERENT if len(differences) > 0 else FileReport.OK, sourceType, targetType, differences)
+
+    except Exception as e:
+        return FileReport(path, FileReport.ERROR, sourceType, targetType, error = "%s: %s" % (type(e).__name__, e))
+
+def _verifyFileArguments(arguments):
+    # multiprocessing can only map functions taking one argument
+    return verifyFile(*arguments)
+
+def findFiles(category, paths):
+    """Returns sorted paths of all files with extensions known to the category's manager,
+    directories in paths are searched recursively, files are returned as they are.
+    """
+
+    extensions = set("." + extension for extension in getManager(category).getAllPossibleExtensions())
+
+    ret = []
+    for path in paths:
+        if not os.path.isdir(path):
+            ret.append(path)
+            continue
+
+        for directory, _, fileNames in os.walk(path):
+            for fileName in fileNames:
+                if os.path.splitext(fileName)[1] in extensions:
+                    ret.append(os.path.join(directory, fileName))
+
+    return sorted(ret)
+
+def verifyFiles(category, paths, sourceType = "Auto", targetType = "Native", jobs = None):
+    """Verifies round trip of given files (or all matching files in given directories)
+    in parallel, yields FileReports as they are finished.
+
+    jobs is the number of worker processes, None uses one per CPU, 1 verifies in this process.
+    """
+
+    arguments = [(category, path, sourceType, targetType) for path in findFiles(category, paths)]
+
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+
+    jobs = min(jobs, len(arguments))
+
+    if jobs <= 1:
+        for argument in arguments:
+            yield _verifyFileArguments(argument)
+
+        return
+
+    pool = multiprocessing.Pool(jobs)
+    try:
+        for report in pool.imap_unordered(_verifyFileArguments, arguments):
+            yield report
+
+    finally:
+        pool.terminate()
+        pool.join()
@@ -28,6 +28,8 @@ from PySide import QtGui
 
 import os.path
 import codecs
+import sys
+import threading
 
 from ceed import compatibility
 
@@ -97,6 +99,9 @@ class TabbedEditor(object):
     with it. It occupies exactly 1 tab space.
     """
 
+    # seconds long operations (see runInWorkerThread) wait before they show a progress dialog
+    workerProgressDelay = 0.5
+
     def __init__(self, compatibilityManager, filePath):
         """Constructs the editor.
 
@@ -176,7 +181,23 @@ class TabbedEditor(object):
         self.mainWindow.tabs.addTab(self.tabWidget, self.tabLabel)
 
         if self.compatibilityManager is not None:
-            rawData = codecs.open(self.filePath, mode = "r", encoding = "utf-8").read()
+            def readFile():
+                ret = codecs.open(self.filePath, mode = "r", encoding = "utf-8").read()
+
+                guessedType = None
+                guessError = None
+                if ret != "":
+                    # guessing parses the data, big files take a while
+                    try:
+                        guessedType = self.compatibilityManager.guessType(ret, self.filePath)
+
+                    except (compatibility.NoPossibleTypesError, compatibility.MultiplePossibleTypesError) as e:
+                        # the dialogs dealing with these have to be shown from the GUI thread
+                        guessError = e
+
+                return ret, guessedType, guessError
+
+            rawData, guessedType, guessError = self.runInWorkerThread("Reading '%s'" % (self.filePath), readFile)
             rawDataType = ""
 
             if rawData == "":
@@ -190,7 +211,10 @@ class TabbedEditor(object):
 
             else:
                 try:
-                    rawDataType = self.compatibilityManager.guessType(rawData, self.filePath)
+                    if guessError is not None:
+                        raise guessError
+
+                    rawDataType = guessedType
 
                     # A file exists and the editor has it open, so watch it for
                     # external changes.
@@ -251,7 +275,9 @@ class TabbedEditor(object):
 
                 if self.nativeData != "":
                     try:
-                        self.nativeData = self.compatibilityManager.transform(rawDataType, self.compatibilityManager.EditorNativeType, rawData)
+                        self.nativeData = self.runInWorkerThread("Converting '%s'" % (self.filePath),
+                                                                 self.compatibilityManager.transform,
+                                                                 rawDataType, self.compatibilityManager.EditorNativeType, rawData)
 
                     except compatibility.LayerNotFoundError:
                         # TODO: Dialog, can't convert
@@ -259,6 +285,56 @@ class TabbedEditor(object):
 
         self.initialised = True
 
+    def runInWorkerThread(self, description, function, *args):
+        """Calls given function with given arguments in a background thread and returns
+        its result (or raises what it raised). The GUI keeps repainting meanwhile and a progress
+        dialog shows up if it takes long.
+
+        User input isn't processed until the function finishes, so nothing can change under
+        our hands. The function must not touch Qt widgets or CEGUI, only plain data.
+        """
+
+        result = {}
+
+        def run():
+            try:
+                result["value"] = function(*args)
+
+            except:
+                result["error"] = sys.exc_info()
+
+        thread = threading.Thread(name = "CEED editor worker", target = run)
+        thread.daemon = True
+        thread.start()
+
+        progress = None
+        # let short operations finish without any dialog flashing up
+        thread.join(self.workerProgressDelay)
+
+        while thread.isAlive():
+            if progress is None:
+                progress = QtGui.QProgressDialog(self.mainWindow)
+                progress.setWindowModality(QtCore.Qt.WindowModal)
+                progress.setWindowTitle(self.tabLabel)
+                progress.setLabelText(description)
+                progress.setCancelButton(None)
+                # there is no way to tell how far the function got, show a busy indicator
+                progress.setRange(0, 0)
+                progress.resize(400, 100)
+                progress.show()
+
+            QtGui.QApplication.instance().processEvents(QtCore.QEventLoop.ExcludeUserInputEvents)
+            thread.join(0.02)
+
+        if progress is not None:
+            progress.reset()
+
+        if "error" in result:
+            errorType, error, traceback = result["error"]
+            raise errorType, error, traceback
+
+        return result["value"]
+
     def finalise(self):
         """Cleans up after itself
         this is usually called when you want the tab closed
@@ -672,6 +748,64 @@ class TabbedEditorFactory(object):
     # note: destroy doesn't really make sense as python is reference counted
     #       and everything is garbage collected
 
+class LazyTabbedEditorFactory(TabbedEditorFactory):
+    """Stands in for a TabbedEditorFactory of an editor package that hasn't been imported yet
+
+    Editor packages pull in PyCEGUI, property trees, undo commands and what not. Importing
+    all of them when the main window is constructed slows startup down considerably, the package
+    is therefore only imported when the first editor of its kind is created.
+
+    fileExtensions is either a set of extensions or a callable returning one, it has to
+    match what the real factory reports. The callable is used for extensions that come from
+    compatibility managers or from FILE_EXTENSIONS of the editor packages, that way these modules
+    are only imported when needed as well.
+    """
+
+    def __init__(self, name, moduleName, className, fileExtensions):
+        self.name = name
+        self.moduleName = moduleName
+        self.className = className
+        self.fileExtensions = fileExtensions
+
+        self.factory = None
+
+    def getName(self):
+        return self.name
+
+    def getFactory(self):
+        """Returns the real factory, imports the editor package if it wasn't imported yet"""
+
+        if self.factory is None:
+            from ceed import startupprofile
+
+            with startupprofile.phase("Importing %s" % (self.moduleName)):
+                module = __import__(self.moduleName, fromlist = [self.className])
+                self.factory = getattr(module, self.className)()
+
+        return self.factory
+
+    def getFileExtensions(self):
+        if self.factory is not None:
+            return self.factory.getFileExtensions()
+
+        if callable(self.fileExtensions):
+            self.fileExtensions = self.fileExtensions()
+
+        return set(self.fileExtensions)
+
+    def canEditFile(self, filePath):
+        if self.factory is not None:
+            return self.factory.canEditFile(filePath)
+
+        for extension in self.getFileExtensions():
+            if filePath.endswith("." + extension):
+                return True
+
+        return False
+
+    def create(self, filePath):
+        return self.getFactory().create(filePath)
+
 class MessageTabbedEditor(TabbedEditor):
     """This is basically a stub tabbed editor, it simply displays a message
     and doesn't allow any sort of editing at all, all functionality is stubbed
@@ -23,8 +23,6 @@ from PySide import QtGui
 
 from ceed import editors
 import ceed.compatibility.animation_list as animation_list_compatibility
-from ceed.editors.animation_list import visual
-from ceed.editors.animation_list import code
 
 from ceed import messages
 
@@ -32,12 +30,18 @@ import os.path
 import sys
 from xml.etree import cElementTree as ElementTree
 
+# extensions of files this editor opens, the main window reads these without creating the factory
+FILE_EXTENSIONS = frozenset(["anims"])
 
 class AnimationListTabbedEditor(editors.multi.MultiModeTabbedEditor):
     """Animation list file editor (XML file containing list of animations)
     """
 
     def __init__(self, filePath):
+        # see the comment in LayoutTabbedEditor.__init__
+        from ceed.editors.animation_list import visual
+        from ceed.editors.animation_list import code
+
         super(AnimationListTabbedEditor, self).__init__(animation_list_compatibility.manager, filePath)
 
         messages.warning(None, self, "Animation List Editor is experimental!",
@@ -103,6 +107,11 @@ class AnimationListTabbedEditor(editors.multi.MultiModeTabbedEditor):
 
         super(AnimationListTabbedEditor, self).finalise()
 
+    def destroy(self):
+        self.visual.scene.releaseFBO()
+
+        super(AnimationListTabbedEditor, self).destroy()
+
     def activate(self):
         super(AnimationListTabbedEditor, self).activate()
 
@@ -157,8 +166,7 @@ class AnimationListTabbedEditor(editors.multi.MultiModeTabbedEditor):
 
 class AnimationListTabbedEditorFactory(editors.TabbedEditorFactory):
     def getFileExtensions(self):
-        extensions = set(["anims"])
-        return extensions
+        return set(FILE_EXTENSIONS)
 
     def canEditFile(self, filePath):
         extensions = self.getFileExtensions()
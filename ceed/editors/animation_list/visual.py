@@ -443,6 +443,7 @@ class VisualEditing(QtGui.QWidget, multi.EditMode):
 
         if widgetType != "":
             try:
+                mainwindow.MainWindow.instance.ceguiInstance.ensureWidgetTypeAvailable(widgetType)
                 self.currentPreviewWidget = PyCEGUI.WindowManager.getSingleton().createWindow(widgetType, "PreviewWidget")
 
             except Exception as ex:
@@ -22,6 +22,9 @@ from PySide import QtGui
 from ceed import editors
 import ceed.ui.bitmapeditor
 
+# extensions of files this editor opens, the main window reads these without creating the factory
+FILE_EXTENSIONS = frozenset(["png", "jpg", "jpeg", "tga", "dds"])
+
 class BitmapTabbedEditor(editors.TabbedEditor, QtGui.QWidget):
     """A simple external bitmap editor starter/image viewer
     """
@@ -50,8 +53,7 @@ class BitmapTabbedEditor(editors.TabbedEditor, QtGui.QWidget):
 
 class BitmapTabbedEditorFactory(editors.TabbedEditorFactory):
     def getFileExtensions(self):
-        extensions = set(["png", "jpg", "jpeg", "tga", "dds"])
-        return extensions
+        return set(FILE_EXTENSIONS)
 
     def canEditFile(self, filePath):
         extensions = self.getFileExtensions()
@@ -29,9 +29,6 @@ from ceed import editors
 from ceed import xmledit
 import ceed.compatibility.imageset as imageset_compatibility
 
-from ceed.editors.imageset import visual
-from ceed.editors.imageset import code
-
 from xml.etree import cElementTree as ElementTree
 
 """Special words used in imageset editing code:
@@ -48,6 +45,10 @@ class ImagesetTabbedEditor(editors.multi.MultiModeTabbedEditor):
     """
 
     def __init__(self, filePath):
+        # see the comment in LayoutTabbedEditor.__init__
+        from ceed.editors.imageset import visual
+        from ceed.editors.imageset import code
+
         super(ImagesetTabbedEditor, self).__init__(imageset_compatibility.manager, filePath)
 
         self.visual = visual.VisualEditing(self)
@@ -26,10 +26,6 @@ from ceed import editors
 
 import ceed.compatibility.layout as layout_compatibility
 
-from ceed.editors.layout import visual
-from ceed.editors.layout import code
-from ceed.editors.layout import preview
-
 import PyCEGUI
 
 class LayoutTabbedEditor(editors.multi.MultiModeTabbedEditor):
@@ -37,6 +33,12 @@ class LayoutTabbedEditor(editors.multi.MultiModeTabbedEditor):
     """
 
     def __init__(self, filePath):
+        # imported here rather than at the top so that importing this package (for the settings
+        # and action declarations) doesn't import the whole editor, see editors.LazyTabbedEditorFactory
+        from ceed.editors.layout import visual
+        from ceed.editors.layout import code
+        from ceed.editors.layout import preview
+
         super(LayoutTabbedEditor, self).__init__(layout_compatibility.manager, filePath)
 
         self.requiresProject = True
@@ -73,17 +75,23 @@ class LayoutTabbedEditor(editors.multi.MultiModeTabbedEditor):
 
         root = None
         if self.nativeData != "":
+            self.mainWindow.ceguiInstance.ensureResourcesReferencedBy(self.nativeData)
             root = PyCEGUI.WindowManager.getSingleton().loadLayoutFromString(self.nativeData)
 
         self.visual.initialise(root)
 
     def finalise(self):
+        # the manipulators are about to go away along with the widgets
+        self.visual.stopManipulatorConstruction()
+
         super(LayoutTabbedEditor, self).finalise()
 
     def destroy(self):
         # unsubscribe from the toolbar icon size setting
         self.tbIconSizeEntry.unsubscribe(self.tbIconSizeCallback)
 
+        self.visual.scene.releaseFBO()
+
         super(LayoutTabbedEditor, self).destroy()
 
     def rebuildEditorMenu(self, editorMenu):
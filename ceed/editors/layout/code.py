@@ -19,23 +19,32 @@
 ##############################################################################
 
 from ceed.editors import code_edit_restoring_view
+from ceed import layoutdiff
 import PyCEGUI
 
 
 class CodeEditing(code_edit_restoring_view.CodeEditingWithViewRestore):
+    # if the code changed more than this, the whole layout is reloaded instead of
+    # applying the changes one by one
+    maximumIncrementalChanges = 100
+
     def __init__(self, tabbedEditor):
         super(CodeEditing, self).__init__()
 
         self.tabbedEditor = tabbedEditor
+        # code the visual editing was in sync with when we last switched to this mode
+        self.lastNativeCode = None
 
     def getNativeCode(self):
         currentRootWidget = self.tabbedEditor.visual.getCurrentRootWidget()
 
         if currentRootWidget is None:
+            self.lastNativeCode = None
             return ""
 
         else:
-            return PyCEGUI.WindowManager.getSingleton().getLayoutAsString(currentRootWidget)
+            self.lastNativeCode = PyCEGUI.WindowManager.getSingleton().getLayoutAsString(currentRootWidget)
+            return self.lastNativeCode
 
     def propagateNativeCode(self, code):
         # we have to make the context the current context to ensure textures are fine
@@ -46,13 +55,96 @@ class CodeEditing(code_edit_restoring_view.CodeEditingWithViewRestore):
 
         else:
             try:
-                newRoot = PyCEGUI.WindowManager.getSingleton().loadLayoutFromString(code)
-                self.tabbedEditor.visual.setRootWidget(newRoot)
+                mainwindow.MainWindow.instance.ceguiInstance.ensureResourcesReferencedBy(code)
+
+                if not self.propagateChanges(code):
+                    newRoot = PyCEGUI.WindowManager.getSingleton().loadLayoutFromString(code)
+                    self.tabbedEditor.visual.setRootWidget(newRoot)
 
                 return True
 
             except:
                 return False
 
+            finally:
+                # visual editing might change the widgets from now on
+                self.lastNativeCode = None
+
+    def propagateChanges(self, code):
+        """Applies just the differences between the code we last gave out and given code
+        to the widgets being edited.
+
+        Returns False if the whole layout has to be reloaded instead, the widgets
+        are left as they were in that case.
+        """
+
+        if self.lastNativeCode is None or self.tabbedEditor.visual.getCurrentRootWidget() is None:
+            return False
+
+        diff = layoutdiff.diffLayouts(self.lastNativeCode, code)
+        if diff is None or len(diff) > self.maximumIncrementalChanges:
+            return False
+
+        if len(diff) == 0:
+            return True
+
+        try:
+            self.applyDiff(diff)
+
+        except:
+            # the widgets might have been changed half way, get them back to the state
+            # they were in before, the caller tries to load the whole layout afterwards
+            oldRoot = PyCEGUI.WindowManager.getSingleton().loadLayoutFromString(self.lastNativeCode)
+            self.tabbedEditor.visual.setRootWidget(oldRoot)
+
+            return False
+
+        return True
+
+    def applyDiff(self, diff):
+        """Applies given layoutdiff.LayoutDiff to the widgets and their manipulators"""
+
+        visual = self.tabbedEditor.visual
+        scene = visual.scene
+
+        for widgetPath in diff.removedWidgets:
+            scene.getManipulatorByPath(widgetPath).detach(destroyWidget = True)
+
+        if len(diff.removedWidgets) > 0:
+            visual.notifyWidgetManipulatorsRemoved(diff.removedWidgets)
+
+        changedManipulators = []
+        for widgetPath, propertyName, value in diff.propertyChanges:
+            manipulator = scene.getManipulatorByPath(widgetPath)
+
+            if value is None:
+                value = manipulator.widget.getPropertyDefault(propertyName)
+            manipulator.widget.setProperty(propertyName, value)
+            manipulator.triggerPropertyManagerCallback({propertyName})
+
+            if len(changedManipulators) == 0 or changedManipulators[-1] is not manipulator:
+                changedManipulators.append(manipulator)
+
+        addedManipulators = []
+        for parentPath, widgetName, layoutString in diff.addedWidgets:
+            parentManipulator = scene.getManipulatorByPath(parentPath)
+
+            widget = PyCEGUI.WindowManager.getSingleton().loadLayoutFromString(layoutString)
+            parentManipulator.widget.addChild(widget)
+            parentManipulator.createMissingChildManipulators(True, False)
+
+            addedManipulators.append(parentManipulator.getManipulatorByPath(widgetName))
+
+        if len(addedManipulators) > 0:
+            visual.notifyWidgetManipulatorsAdded(addedManipulators)
+
+        # properties of widgets can affect geometry of their ancestors (layout containers)
+        # and descendants, added widgets can change geometry of layout containers they are in
+        for manipulator in changedManipulators + addedManipulators:
+            manipulator.updateFromWidget(True, True)
+
+        scene.update()
+        PyCEGUI.System.getSingleton().getDefaultGUIContext().markAsDirty()
+
 # needs to be at the end, imported to get the singleton
 from ceed import mainwindow
@@ -76,6 +76,11 @@ def declare(settings):
                        defaultValue = QtGui.QColor(64, 64, 64, 192), widgetHint = "colour",
                        sortingWeight = 8)
 
+    visual.createEntry(name = "sibling_snap_distance", type_ = float, label = "Sibling edge snap distance",
+                       help_ = "When moving and resizing widgets, edges closer than this (in pixels) to an edge of a sibling widget snap to it. 0 disables snapping to siblings.",
+                       defaultValue = 0, widgetHint = "float",
+                       sortingWeight = 8)
+
     # TODO: Full restart is not actually needed, just a refresh on all layout visual editing modes
     visual.createEntry(name = "hide_deadend_autowidgets", type_ = bool, label = "Hide deadend auto widgets",
                        help_ = "Should auto widgets with no non-auto widgets descendants be hidden in the widget hierarchy?",
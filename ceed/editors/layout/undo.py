@@ -162,46 +162,33 @@ class DeleteCommand(commands.UndoCommand):
 
         self.visual = visual
 
-        self.widgetPaths = widgetPaths
         self.widgetData = {}
 
-        # we have to add all the child widgets of all widgets we are deleting
-        for widgetPath in self.widgetPaths:
+        # we have to add all the child widgets of all widgets we are deleting,
+        # widget path -> manipulator of everything that will be deleted
+        manipulators = {}
+        for widgetPath in widgetPaths:
+            if widgetPath in manipulators:
+                # descendant of a widget we have already gone through
+                continue
+
             manipulator = self.visual.scene.getManipulatorByPath(widgetPath)
-            dependencies = manipulator.getAllDescendantManipulators()
+            manipulators[widgetPath] = manipulator
 
-            for dependency in dependencies:
-                depencencyNamePath = dependency.widget.getNamePath()
-                if depencencyNamePath not in self.widgetPaths:
-                    self.widgetPaths.append(depencencyNamePath)
+            for dependency in manipulator.getAllDescendantManipulators():
+                manipulators[dependency.widget.getNamePath()] = dependency
 
         # now we have to sort them in a way that ensures the most depending widgets come first
-        # (the most deeply nested widgets get deleted first before their ancestors get deleted)
-        class ManipulatorDependencyKey(object):
-            def __init__(self, visual, path):
-                self.visual = visual
-
-                self.path = path
-                self.manipulator = self.visual.scene.getManipulatorByPath(path)
-
-            def __lt__(self, otherKey):
-                # if this is the ancestor of other manipulator, it comes after it
-                if self.manipulator.widget.isAncestor(otherKey.manipulator.widget):
-                    return True
-                # vice versa
-                if otherKey.manipulator.widget.isAncestor(self.manipulator.widget):
-                    return False
-
-                # otherwise, we don't care but lets define a precise order
-                return self.path < otherKey.path
-
-        self.widgetPaths = sorted(self.widgetPaths, key = lambda path: ManipulatorDependencyKey(self.visual, path))
+        # (the most deeply nested widgets get deleted first before their ancestors get deleted),
+        # descendants always have longer paths than their ancestors so sorting by depth does it,
+        # the path itself makes the order deterministic
+        self.widgetPaths = sorted(manipulators.iterkeys(), key = lambda path: (-path.count("/"), path))
 
         # we have to store everything about these widgets before we destroy them,
         # we want to be able to restore if user decides to undo
         for widgetPath in self.widgetPaths:
             # serialiseChildren is False because we have already included all the children and they are handled separately
-            self.widgetData[widgetPath] = widgethelpers.SerialisationData(self.visual, self.visual.scene.getManipulatorByPath(widgetPath).widget,
+            self.widgetData[widgetPath] = widgethelpers.SerialisationData(self.visual, manipulators[widgetPath].widget,
                                                                           serialiseChildren = False)
 
         self.refreshText()
@@ -274,9 +261,9 @@ class CreateCommand(commands.UndoCommand):
         manipulator = self.visual.scene.getManipulatorByPath(self.parentWidgetPath + "/" + self.widgetName if self.parentWidgetPath != "" else self.widgetName)
         manipulator.detach(destroyWidget = True)
 
-        self.visual.hierarchyDockWidget.refresh()
-
     def redo(self):
+        mainwindow.MainWindow.instance.ceguiInstance.ensureWidgetTypeAvailable(self.widgetType)
+
         data = widgethelpers.SerialisationData(self.visual)
 
         data.name = self.widgetName
@@ -293,7 +280,7 @@ class CreateCommand(commands.UndoCommand):
         # ensure this isn't obscured by it's parent
         result.moveToFront()
 
-        self.visual.hierarchyDockWidget.refresh()
+        self.visual.notifyWidgetManipulatorsAdded([result])
 
         super(CreateCommand, self).redo()
 
@@ -545,6 +532,7 @@ class ReparentCommand(commands.UndoCommand):
         self.visual.scene.clearSelection()
         self.visual.hierarchyDockWidget.treeView.clearSelection()
 
+        reparentedManipulators = []
         i = 0
         while i < len(self.newWidgetPaths):
             widgetPath = self.newWidgetPaths[i]
@@ -556,6 +544,9 @@ class ReparentCommand(commands.UndoCommand):
             oldParentPath = oldWidgetPath[0:oldWidgetPath.rfind("/")]
             oldParentManipulator = self.visual.scene.getManipulatorByPath(oldParentPath)
 
+            # the hierarchy item is recreated under the new parent below
+            self.visual.hierarchyDockWidget.removeManipulator(widgetManipulator)
+
             # remove it from the current CEGUI parent widget
             ceguiParentWidget = widgetManipulator.widget.getParent()
             if ceguiParentWidget is not None:
@@ -571,17 +562,21 @@ class ReparentCommand(commands.UndoCommand):
 
             # and sort out the manipulators
             widgetManipulator.setParentItem(oldParentManipulator)
+            # the whole subtree has new paths now
+            self.visual.scene.indexManipulator(widgetManipulator)
+            reparentedManipulators.append(widgetManipulator)
 
             widgetManipulator.updateFromWidget(True, True)
 
             i += 1
 
-        self.visual.hierarchyDockWidget.refresh()
+        self.visual.hierarchyDockWidget.addManipulators(reparentedManipulators)
 
     def redo(self):
         self.visual.scene.clearSelection()
         self.visual.hierarchyDockWidget.treeView.clearSelection()
 
+        reparentedManipulators = []
         i = 0
         while i < len(self.oldWidgetPaths):
             widgetPath = self.oldWidgetPaths[i]
@@ -593,6 +588,9 @@ class ReparentCommand(commands.UndoCommand):
             newParentPath = newWidgetPath[0:newWidgetPath.rfind("/")]
             newParentManipulator = self.visual.scene.getManipulatorByPath(newParentPath)
 
+            # the hierarchy item is recreated under the new parent below
+            self.visual.hierarchyDockWidget.removeManipulator(widgetManipulator)
+
             # remove it from the current CEGUI parent widget
             ceguiParentWidget = widgetManipulator.widget.getParent()
             if ceguiParentWidget is not None:
@@ -608,12 +606,15 @@ class ReparentCommand(commands.UndoCommand):
 
             # and sort out the manipulators
             widgetManipulator.setParentItem(newParentManipulator)
+            # the whole subtree has new paths now
+            self.visual.scene.indexManipulator(widgetManipulator)
+            reparentedManipulators.append(widgetManipulator)
 
             widgetManipulator.updateFromWidget(True, True)
 
             i += 1
 
-        self.visual.hierarchyDockWidget.refresh()
+        self.visual.hierarchyDockWidget.addManipulators(reparentedManipulators)
         super(ReparentCommand, self).redo()
 
 
@@ -666,18 +667,19 @@ class PasteCommand(commands.UndoCommand):
     def redo(self):
         targetManipulator = self.visual.scene.getManipulatorByPath(self.targetWidgetPath)
 
+        manipulators = []
         for serialisationData in self.clipboardData:
             # make sure the name is unique and we will be able to paste smoothly
             serialisationData.name = targetManipulator.getUniqueChildWidgetName(serialisationData.name)
             serialisationData.setParentPath(self.targetWidgetPath)
 
-            serialisationData.reconstruct(self.visual.scene.rootManipulator)
+            manipulators.append(serialisationData.reconstruct(self.visual.scene.rootManipulator))
 
         # Update the topmost parent widget recursively to get possible resize or
         # repositions of the pasted widgets into the manipulator data.
         targetManipulator.updateFromWidget(True, True)
 
-        self.visual.hierarchyDockWidget.refresh()
+        self.visual.notifyWidgetManipulatorsAdded(manipulators)
 
         super(PasteCommand, self).redo()
 
@@ -880,6 +882,7 @@ class RenameCommand(commands.UndoCommand):
         widgetManipulator.widget.setName(self.oldWidgetName)
         widgetManipulator.treeItem.setText(self.oldWidgetName)
         widgetManipulator.treeItem.refreshPathData()
+        self.visual.scene.indexManipulator(widgetManipulator)
 
         widgetManipulator.triggerPropertyManagerCallback({"Name", "NamePath"})
 
@@ -891,6 +894,7 @@ class RenameCommand(commands.UndoCommand):
         widgetManipulator.widget.setName(self.newWidgetName)
         widgetManipulator.treeItem.setText(self.newWidgetName)
         widgetManipulator.treeItem.refreshPathData()
+        self.visual.scene.indexManipulator(widgetManipulator)
 
         widgetManipulator.triggerPropertyManagerCallback({"Name", "NamePath"})
 
@@ -1008,7 +1012,9 @@ class MoveInParentWidgetListCommand(commands.UndoCommand):
                 assert(newPosition == parentManipulator.widget.getPositionOfChild(widgetManipulator.widget))
 
                 parentManipulator.updateFromWidget(True, True)
-                parentManipulator.treeItem.refreshOrderingData(True, True)
+                if parentManipulator.treeItem is not None:
+                    parentManipulator.treeItem.refreshChildrenOrderingData()
+                    parentManipulator.treeItem.sortChildren(0)
 
     def redo(self):
         if self.delta != 0:
@@ -1024,6 +1030,11 @@ class MoveInParentWidgetListCommand(commands.UndoCommand):
                 assert(newPosition == parentManipulator.widget.getPositionOfChild(widgetManipulator.widget))
 
                 parentManipulator.updateFromWidget(True, True)
-                parentManipulator.treeItem.refreshOrderingData(True, True)
+                if parentManipulator.treeItem is not None:
+                    parentManipulator.treeItem.refreshChildrenOrderingData()
+                    parentManipulator.treeItem.sortChildren(0)
 
         super(MoveInParentWidgetListCommand, self).redo()
+
+# needs to be at the end, imported to get the singleton
+from ceed import mainwindow
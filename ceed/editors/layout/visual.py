@@ -19,15 +19,19 @@
 ##############################################################################
 
 from collections import OrderedDict
+from collections import deque
 
 from PySide import QtCore
 from PySide import QtGui
 import cPickle
 import os
+import bisect
+import time
 
 import PyCEGUI
 
 from ceed import resizable
+from ceed import widgetpaths
 
 from ceed.editors import multi
 
@@ -127,6 +131,33 @@ class WidgetHierarchyItem(QtGui.QStandardItem):
             if resort:
                 self.sortChildren(0)
 
+    def refreshChildrenOrderingData(self):
+        """Updates the stored ordering data of the direct children, doesn't resort them
+
+        Unlike calling refreshOrderingData on each of the children this goes through
+        the children of the CEGUI parent widget only once.
+        """
+
+        # CEGUI parent widget name path -> {child widget name: index in the parent}
+        indices = {}
+
+        for i in range(self.rowCount()):
+            child = self.child(i)
+            if child.manipulator is None or child.manipulator.widget is None:
+                continue
+
+            widget = child.manipulator.widget
+            parent = widget.getParent()
+            if parent is None:
+                child.setData(0, QtCore.Qt.UserRole + 1)
+                continue
+
+            parentPath = parent.getNamePath()
+            if parentPath not in indices:
+                indices[parentPath] = dict((parent.getChildAtIdx(j).getName(), j) for j in range(parent.getChildCount()))
+
+            child.setData(indices[parentPath].get(widget.getName(), -1), QtCore.Qt.UserRole + 1)
+
     def setData(self, value, role):
         if role == QtCore.Qt.CheckStateRole and self.manipulator is not None:
             # synchronise the manipulator with the lock state
@@ -262,6 +293,7 @@ class WidgetHierarchyTreeModel(QtGui.QStandardItemModel):
                     i += 1
 
                 else:
+                    self.forgetSubtree(childHierarchyItem)
                     hierarchyItem.removeRow(i)
 
             for childManipulator in manipulatorsToRecreate:
@@ -283,11 +315,96 @@ class WidgetHierarchyTreeModel(QtGui.QStandardItemModel):
 
     def setRootManipulator(self, rootManipulator):
         if not self.synchroniseSubtree(self.getRootHierarchyItem(), rootManipulator):
+            if self.getRootHierarchyItem() is not None:
+                self.forgetSubtree(self.getRootHierarchyItem())
             self.clear()
 
             if rootManipulator is not None:
                 self.appendRow(self.constructSubtree(rootManipulator))
 
+    def forgetSubtree(self, hierarchyItem):
+        """Unlinks manipulators from hierarchy items of given subtree, call this before the items are removed
+
+        This keeps Manipulator.treeItem either None or pointing to an item that is in the model.
+        """
+
+        manipulator = hierarchyItem.manipulator
+        if manipulator is not None and getattr(manipulator, "treeItem", None) is hierarchyItem:
+            manipulator.treeItem = None
+
+        for i in range(hierarchyItem.rowCount()):
+            self.forgetSubtree(hierarchyItem.child(i))
+
+    def addManipulators(self, manipulators):
+        """Inserts hierarchy items of given new manipulators (and their descendants) into the tree,
+        the rest of the tree stays untouched.
+
+        Returns False if this wasn't possible (the root manipulator changed, the parent isn't in
+        the tree, ...), a full refresh is necessary in that case.
+        """
+
+        manipulatorSet = set(manipulators)
+        # id of parent hierarchy item -> (parent hierarchy item, list of child manipulators to add)
+        groups = {}
+
+        for manipulator in manipulators:
+            if getattr(manipulator, "treeItem", None) is not None:
+                # already in the tree, most likely added along with its ancestor
+                continue
+
+            parent = manipulator.parentItem()
+            if not isinstance(parent, widgethelpers.Manipulator):
+                return False
+
+            ancestor = parent
+            while isinstance(ancestor, widgethelpers.Manipulator) and ancestor not in manipulatorSet:
+                ancestor = ancestor.parentItem()
+
+            if ancestor in manipulatorSet:
+                # the subtree of the ancestor will contain this manipulator
+                continue
+
+            if self.shouldManipulatorBeSkipped(manipulator):
+                continue
+
+            parentItem = getattr(parent, "treeItem", None)
+            if parentItem is None:
+                return False
+
+            groups.setdefault(id(parentItem), (parentItem, []))[1].append(manipulator)
+
+        for parentItem, childManipulators in groups.itervalues():
+            # indices of the existing siblings might have shifted
+            parentItem.refreshChildrenOrderingData()
+
+            orderingValues = [parentItem.child(i).data(QtCore.Qt.UserRole + 1) for i in range(parentItem.rowCount())]
+
+            for manipulator in childManipulators:
+                subtree = self.constructSubtree(manipulator)
+
+                ordering = subtree.data(QtCore.Qt.UserRole + 1)
+                row = bisect.bisect_right(orderingValues, ordering)
+                orderingValues.insert(row, ordering)
+
+                parentItem.insertRow(row, subtree)
+
+        return True
+
+    def removeManipulator(self, manipulator):
+        """Removes hierarchy item of given manipulator (and its descendants) from the tree"""
+
+        item = getattr(manipulator, "treeItem", None)
+        if item is None:
+            return
+
+        self.forgetSubtree(item)
+
+        parentItem = item.parent()
+        if parentItem is None:
+            parentItem = self.invisibleRootItem()
+
+        parentItem.removeRow(item.row())
+
     def mimeData(self, indexes):
         # if the selection contains children of something that is also selected, we don't include that
         # (it doesn't make sense to move it anyways, it will be moved with its parent)
@@ -620,6 +737,21 @@ class HierarchyDockWidget(QtGui.QDockWidget):
         # this will resynchronise the entire model
         self.model.setRootManipulator(self.rootWidgetManipulator)
 
+    def addManipulators(self, manipulators):
+        """Adds new manipulators to the hierarchy, cheaper than refresh when only a few of them changed"""
+
+        self.treeView.setUpdatesEnabled(False)
+
+        try:
+            if not self.model.addManipulators(manipulators):
+                self.refresh()
+
+        finally:
+            self.treeView.setUpdatesEnabled(True)
+
+    def removeManipulator(self, manipulator):
+        self.model.removeManipulator(manipulator)
+
     def keyReleaseEvent(self, event):
         if event.key() == QtCore.Qt.Key_Delete:
             handled = self.visual.scene.deleteSelectedWidgets()
@@ -778,10 +910,7 @@ class WidgetTypeTreeWidget(QtGui.QTreeWidget):
 
     def viewportEvent(self, event):
         if event.type() == QtCore.QEvent.ToolTip:
-            # TODO: The big question is whether to reuse cached previews or always render them again.
-            #       I always render them again for now to avoid all sorts of caching issues
-            #       (when scheme/looknfeel editing is in place, etc...)
-
+            # previews are cached by the CEGUI instance, it renders them again when their resources change
             item = self.itemAt(event.pos())
 
             if item is not None and item.childCount() == 0:
@@ -870,6 +999,7 @@ class EditingScene(cegui_widgethelpers.GraphicsScene):
 
     def setRootWidgetManipulator(self, manipulator):
         self.clear()
+        self.clearManipulatorIndex()
 
         self.rootManipulator = manipulator
 
@@ -878,19 +1008,31 @@ class EditingScene(cegui_widgethelpers.GraphicsScene):
             self.rootManipulator.updateFromWidget(True)
 
             self.addItem(self.rootManipulator)
+            self.indexManipulator(self.rootManipulator)
 
     def getManipulatorByPath(self, widgetPath):
+        # whoever looks manipulators up is about to change them, they all have to exist by then
+        self.visual.finishManipulatorConstruction()
+
+        manipulator = self.getIndexedManipulator(widgetPath)
+        if manipulator is not None:
+            return manipulator
+
         path = widgetPath.split("/", 1)
         assert(len(path) >= 1)
 
         if len(path) == 1:
             assert(path[0] == self.rootManipulator.widget.getName())
 
-            return self.rootManipulator
+            manipulator = self.rootManipulator
 
         else:
             # path[1] is the remainder of the path
-            return self.rootManipulator.getManipulatorByPath(path[1])
+            manipulator = self.rootManipulator.getManipulatorByPath(path[1])
+
+        # next time this will be a simple lookup
+        self.indexManipulator(manipulator, False)
+        return manipulator
 
     def setCEGUIDisplaySize(self, width, height, lazyUpdate = True):
         # overridden to keep the manipulators in sync
@@ -899,15 +1041,27 @@ class EditingScene(cegui_widgethelpers.GraphicsScene):
 
         # FIXME: this won't do much with lazyUpdate = False
         if hasattr(self, "rootManipulator") and self.rootManipulator is not None:
-            self.rootManipulator.updateFromWidget()
+            # only sizes could have changed, subtrees that kept their size don't need updating
+            self.rootManipulator.updateFromWidget(skipUnchangedSubtrees = True)
 
-    def deleteSelectedWidgets(self):
-        widgetPaths = []
+    def getSelectedManipulators(self, topMostOnly = False):
+        """Returns list of (widgetPath, manipulator) tuples of all selected manipulators
 
-        selection = self.selectedItems()
-        for item in selection:
-            if isinstance(item, widgethelpers.Manipulator):
-                widgetPaths.append(item.widget.getNamePath())
+        topMostOnly - if True, manipulators that have an ancestor selected are left out,
+                      see widgetpaths.getTopMostPaths
+        """
+
+        ret = [(item.widget.getNamePath(), item) for item in self.selectedItems() if isinstance(item, widgethelpers.Manipulator)]
+
+        if topMostOnly:
+            topMostPaths = set(widgetpaths.getTopMostPaths([widgetPath for widgetPath, _ in ret]))
+            ret = [(widgetPath, manipulator) for widgetPath, manipulator in ret if widgetPath in topMostPaths]
+
+        return ret
+
+    def deleteSelectedWidgets(self):
+        # descendants of deleted widgets are deleted with them, see DeleteCommand
+        widgetPaths = [widgetPath for widgetPath, _ in self.getSelectedManipulators(True)]
 
         if len(widgetPaths) > 0:
             cmd = undo.DeleteCommand(self.visual, widgetPaths)
@@ -917,12 +1071,9 @@ class EditingScene(cegui_widgethelpers.GraphicsScene):
         widgetPaths = []
         oldAlignments = {}
 
-        selection = self.selectedItems()
-        for item in selection:
-            if isinstance(item, widgethelpers.Manipulator):
-                widgetPath = item.widget.getNamePath()
-                widgetPaths.append(widgetPath)
-                oldAlignments[widgetPath] = item.widget.getHorizontalAlignment()
+        for widgetPath, item in self.getSelectedManipulators():
+            widgetPaths.append(widgetPath)
+            oldAlignments[widgetPath] = item.widget.getHorizontalAlignment()
 
         if len(widgetPaths) > 0:
             cmd = undo.HorizontalAlignCommand(self.visual, widgetPaths, oldAlignments, alignment)
@@ -932,12 +1083,9 @@ class EditingScene(cegui_widgethelpers.GraphicsScene):
         widgetPaths = []
         oldAlignments = {}
 
-        selection = self.selectedItems()
-        for item in selection:
-            if isinstance(item, widgethelpers.Manipulator):
-                widgetPath = item.widget.getNamePath()
-                widgetPaths.append(widgetPath)
-                oldAlignments[widgetPath] = item.widget.getVerticalAlignment()
+        for widgetPath, item in self.getSelectedManipulators():
+            widgetPaths.append(widgetPath)
+            oldAlignments[widgetPath] = item.widget.getVerticalAlignment()
 
         if len(widgetPaths) > 0:
             cmd = undo.VerticalAlignCommand(self.visual, widgetPaths, oldAlignments, alignment)
@@ -950,17 +1098,13 @@ class EditingScene(cegui_widgethelpers.GraphicsScene):
         # if there will be no non-zero offsets, we will normalise to absolute
         undoCommand = undo.NormalisePositionToAbsoluteCommand
 
-        selection = self.selectedItems()
-        for item in selection:
-            if isinstance(item, widgethelpers.Manipulator):
-                widgetPath = item.widget.getNamePath()
-
-                widgetPaths.append(widgetPath)
-                oldPositions[widgetPath] = item.widget.getPosition()
+        for widgetPath, item in self.getSelectedManipulators():
+            widgetPaths.append(widgetPath)
+            oldPositions[widgetPath] = item.widget.getPosition()
 
-                # if we find any non-zero offset, normalise to relative
-                if (item.widget.getPosition().d_x.d_offset != 0) or (item.widget.getPosition().d_y.d_offset != 0):
-                    undoCommand = undo.NormalisePositionToRelativeCommand
+            # if we find any non-zero offset, normalise to relative
+            if (item.widget.getPosition().d_x.d_offset != 0) or (item.widget.getPosition().d_y.d_offset != 0):
+                undoCommand = undo.NormalisePositionToRelativeCommand
 
         if len(widgetPaths) > 0:
             cmd = undoCommand(self.visual, widgetPaths, oldPositions)
@@ -974,18 +1118,14 @@ class EditingScene(cegui_widgethelpers.GraphicsScene):
         # if there will be no non-zero offsets, we will normalise to absolute
         undoCommand = undo.NormaliseSizeToAbsoluteCommand
 
-        selection = self.selectedItems()
-        for item in selection:
-            if isinstance(item, widgethelpers.Manipulator):
-                widgetPath = item.widget.getNamePath()
-
-                widgetPaths.append(widgetPath)
-                oldPositions[widgetPath] = item.widget.getPosition()
-                oldSizes[widgetPath] = item.widget.getSize()
+        for widgetPath, item in self.getSelectedManipulators():
+            widgetPaths.append(widgetPath)
+            oldPositions[widgetPath] = item.widget.getPosition()
+            oldSizes[widgetPath] = item.widget.getSize()
 
-                # if we find any non-zero offset, normalise to relative
-                if (item.widget.getSize().d_width.d_offset != 0) or (item.widget.getSize().d_height.d_offset != 0):
-                    undoCommand = undo.NormaliseSizeToRelativeCommand
+            # if we find any non-zero offset, normalise to relative
+            if (item.widget.getSize().d_width.d_offset != 0) or (item.widget.getSize().d_height.d_offset != 0):
+                undoCommand = undo.NormaliseSizeToRelativeCommand
 
         if len(widgetPaths) > 0:
             cmd = undoCommand(self.visual, widgetPaths, oldPositions, oldSizes)
@@ -995,13 +1135,9 @@ class EditingScene(cegui_widgethelpers.GraphicsScene):
         widgetPaths = []
         oldPositions = {}
 
-        selection = self.selectedItems()
-        for item in selection:
-            if isinstance(item, widgethelpers.Manipulator):
-                widgetPath = item.widget.getNamePath()
-
-                widgetPaths.append(widgetPath)
-                oldPositions[widgetPath] = item.widget.getPosition()
+        for widgetPath, item in self.getSelectedManipulators():
+            widgetPaths.append(widgetPath)
+            oldPositions[widgetPath] = item.widget.getPosition()
 
         if len(widgetPaths) > 0:
             cmd = undo.RoundPositionCommand(self.visual, widgetPaths, oldPositions)
@@ -1012,14 +1148,10 @@ class EditingScene(cegui_widgethelpers.GraphicsScene):
         oldPositions = {}
         oldSizes = {}
 
-        selection = self.selectedItems()
-        for item in selection:
-            if isinstance(item, widgethelpers.Manipulator):
-                widgetPath = item.widget.getNamePath()
-
-                widgetPaths.append(widgetPath)
-                oldPositions[widgetPath] = item.widget.getPosition()
-                oldSizes[widgetPath] = item.widget.getSize()
+        for widgetPath, item in self.getSelectedManipulators():
+            widgetPaths.append(widgetPath)
+            oldPositions[widgetPath] = item.widget.getPosition()
+            oldSizes[widgetPath] = item.widget.getSize()
 
         if len(widgetPaths) > 0:
             cmd = undo.RoundSizeCommand(self.visual, widgetPaths, oldPositions, oldSizes)
@@ -1220,6 +1352,10 @@ class VisualEditing(QtGui.QWidget, multi.EditMode):
     see ceed.editors.multi.EditMode
     """
 
+    # seconds spent creating manipulators before the event loop gets control again,
+    # see startManipulatorConstruction
+    manipulatorConstructionTimeSlice = 0.02
+
     def __init__(self, tabbedEditor):
         super(VisualEditing, self).__init__()
 
@@ -1241,6 +1377,14 @@ class VisualEditing(QtGui.QWidget, multi.EditMode):
 
         self.oldViewState = None
 
+        # manipulators whose child manipulators are yet to be created, in breadth first order
+        self.pendingManipulators = deque()
+        self.constructedManipulatorCount = 0
+        self.constructionTimer = QtCore.QTimer(self)
+        self.constructionTimer.setInterval(0)
+        self.constructionTimer.timeout.connect(self.slot_continueManipulatorConstruction)
+        self.constructionProgressBar = None
+
     def setupActions(self):
         self.connectionGroup = action.ConnectionGroup(action.ActionManager.instance)
 
@@ -1328,7 +1472,7 @@ class VisualEditing(QtGui.QWidget, multi.EditMode):
         pmap = mainwindow.MainWindow.instance.project.propertyMap
         self.propertiesDockWidget.inspector.setPropertyManager(CEGUIWidgetPropertyManager(pmap, self))
 
-        self.setRootWidget(rootWidget)
+        self.setRootWidget(rootWidget, True)
         self.createWidgetDockWidget.populate()
 
     def getCurrentRootWidget(self):
@@ -1337,6 +1481,7 @@ class VisualEditing(QtGui.QWidget, multi.EditMode):
     def setRootWidgetManipulator(self, manipulator):
         oldRoot = self.getCurrentRootWidget()
 
+        self.stopManipulatorConstruction()
         self.scene.setRootWidgetManipulator(manipulator)
         self.hierarchyDockWidget.setRootWidgetManipulator(self.scene.rootManipulator)
 
@@ -1348,23 +1493,121 @@ class VisualEditing(QtGui.QWidget, multi.EditMode):
         # cause full redraw of the default GUI context to ensure nothing gets stuck
         PyCEGUI.System.getSingleton().getDefaultGUIContext().markAsDirty()
 
-    def setRootWidget(self, widget):
+    def setRootWidget(self, widget, progressive = False):
         """Sets the root widget we want to edit
+
+        progressive - if True, only manipulators of the top of the widget tree are created
+                      right away, see startManipulatorConstruction
         """
 
         if widget is None:
             self.setRootWidgetManipulator(None)
 
+        elif progressive:
+            manipulator = widgethelpers.Manipulator(self, None, widget, False)
+            self.setRootWidgetManipulator(manipulator)
+            self.startManipulatorConstruction(manipulator)
+
         else:
             self.setRootWidgetManipulator(widgethelpers.Manipulator(self, None, widget))
 
+    def startManipulatorConstruction(self, manipulator):
+        """Creates manipulators of all descendants of given manipulator's widget in time sliced
+        chunks, breadth first, so that the editor becomes interactive for the top of the widget tree
+        (usually what is visible) before big layouts are done. Hierarchy rows are added along.
+
+        Everything that changes manipulators looks them up via EditingScene.getManipulatorByPath
+        first, it finishes the construction so that nothing ever works with a partial tree.
+        """
+
+        self.pendingManipulators.append(manipulator)
+        self.constructedManipulatorCount = 1
+
+        # one chunk right away, small layouts are done without ever getting to the event loop
+        self.continueManipulatorConstruction(self.manipulatorConstructionTimeSlice)
+
+        if len(self.pendingManipulators) > 0:
+            self.constructionProgressBar = QtGui.QProgressBar()
+            # the number of widgets isn't known until they are all visited
+            self.constructionProgressBar.setRange(0, 0)
+            self.constructionProgressBar.setMaximumWidth(150)
+            mainwindow.MainWindow.instance.statusBar().addPermanentWidget(self.constructionProgressBar)
+
+            self.constructionTimer.start()
+
+    def continueManipulatorConstruction(self, timeSlice = None):
+        """Creates child manipulators of pending manipulators until given number of seconds
+        runs out (or until all are created if timeSlice is None)
+        """
+
+        deadline = time.time() + timeSlice if timeSlice is not None else None
+        created = []
+
+        while len(self.pendingManipulators) > 0:
+            if deadline is not None and time.time() >= deadline:
+                break
+
+            manipulator = self.pendingManipulators.popleft()
+
+            manipulator.createChildManipulators(False)
+            for child in manipulator.childItems():
+                if isinstance(child, widgethelpers.Manipulator):
+                    created.append(child)
+                    self.pendingManipulators.append(child)
+
+        if len(created) == 0:
+            return
+
+        # indexing each one alone, their descendants don't exist yet
+        for manipulator in created:
+            self.scene.indexManipulator(manipulator, False)
+        self.hierarchyDockWidget.addManipulators(created)
+
+        self.constructedManipulatorCount += len(created)
+        if self.constructionProgressBar is not None:
+            mainwindow.MainWindow.instance.statusBar().showMessage("Creating widget manipulators of '%s': %i done" %
+                                                                   (self.tabbedEditor.tabLabel, self.constructedManipulatorCount))
+
+    def slot_continueManipulatorConstruction(self):
+        self.continueManipulatorConstruction(self.manipulatorConstructionTimeSlice)
+
+        if len(self.pendingManipulators) == 0:
+            self.stopManipulatorConstruction()
+
+    def finishManipulatorConstruction(self):
+        """Creates all manipulators the progressive construction didn't get to yet"""
+
+        if len(self.pendingManipulators) == 0:
+            return
+
+        self.continueManipulatorConstruction()
+        self.stopManipulatorConstruction()
+
+    def stopManipulatorConstruction(self):
+        """Stops the progressive construction, manipulators that weren't created yet never will"""
+
+        self.pendingManipulators.clear()
+        self.constructionTimer.stop()
+
+        if self.constructionProgressBar is not None:
+            statusBar = mainwindow.MainWindow.instance.statusBar()
+            statusBar.removeWidget(self.constructionProgressBar)
+            statusBar.clearMessage()
+
+            self.constructionProgressBar.deleteLater()
+            self.constructionProgressBar = None
+
     def notifyWidgetManipulatorsAdded(self, manipulators):
-        self.hierarchyDockWidget.refresh()
+        for manipulator in manipulators:
+            self.scene.indexManipulator(manipulator)
+
+        self.hierarchyDockWidget.addManipulators(manipulators)
 
     def notifyWidgetManipulatorsRemoved(self, widgetPaths):
         """We are passing widget paths because manipulators might be destroyed at this point"""
 
-        self.hierarchyDockWidget.refresh()
+        # nothing to do, manipulators remove their hierarchy items when they are detached
+        pass
 
     def showEvent(self, event):
         mainwindow.MainWindow.instance.ceguiContainerWidget.activate(self, self.scene)
@@ -1433,34 +1676,15 @@ class VisualEditing(QtGui.QWidget, multi.EditMode):
         return ret
 
     def performCopy(self):
-        topMostSelected = []
-
-        for item in self.scene.selectedItems():
-            if not isinstance(item, widgethelpers.Manipulator):
-                continue
-
-            hasAncestorSelected = False
-
-            for item2 in self.scene.selectedItems():
-                if not isinstance(item2, widgethelpers.Manipulator):
-                    continue
-
-                if item is item2:
-                    continue
-
-                if item2.isAncestorOf(item):
-                    hasAncestorSelected = True
-                    break
-
-            if not hasAncestorSelected:
-                topMostSelected.append(item)
+        topMostSelected = self.scene.getSelectedManipulators(True)
 
         if len(topMostSelected) == 0:
             return False
 
-        # now we serialise the top most selected widgets (and thus their entire hierarchies)
+        # now we serialise the top most selected widgets (and thus their entire hierarchies),
+        # this reads the widgets and has to happen here in the GUI thread
         topMostSerialisationData = []
-        for wdt in topMostSelected:
+        for _, wdt in topMostSelected:
             serialisationData = widgethelpers.SerialisationData(self, wdt.widget)
             # we set the visual to None because we can't pickle QWidgets (also it would prevent copying across editors)
             # we will set it to the correct visual when we will be pasting it back
@@ -1468,8 +1692,25 @@ class VisualEditing(QtGui.QWidget, multi.EditMode):
 
             topMostSerialisationData.append(serialisationData)
 
+        # encoding is the slow part with huge selections, it holds the GIL so a worker thread wouldn't help,
+        # we keep the GUI repainting between the hierarchies instead
+        progress = QtGui.QProgressDialog(self)
+        progress.setWindowModality(QtCore.Qt.WindowModal)
+        progress.setWindowTitle(self.tabbedEditor.tabLabel)
+        progress.setLabelText("Copying %i widget hierarchies" % (len(topMostSerialisationData)))
+        progress.setCancelButton(None)
+        progress.setMinimumDuration(int(self.tabbedEditor.workerProgressDelay * 1000))
+        progress.setRange(0, len(topMostSerialisationData))
+
+        def progressCallback(encodedCount):
+            progress.setValue(encodedCount)
+            QtGui.QApplication.instance().processEvents(QtCore.QEventLoop.ExcludeUserInputEvents)
+
+        encodedData = widgethelpers.SerialisationData.encodeList(topMostSerialisationData, progressCallback)
+        progress.reset()
+
         data = QtCore.QMimeData()
-        data.setData("application/x-ceed-widget-hierarchy-list", QtCore.QByteArray(cPickle.dumps(topMostSerialisationData)))
+        data.setData("application/x-ceed-widget-hierarchy-list", QtCore.QByteArray(encodedData))
         QtGui.QApplication.clipboard().setMimeData(data)
 
         return True
@@ -1480,7 +1721,7 @@ class VisualEditing(QtGui.QWidget, multi.EditMode):
         if not data.hasFormat("application/x-ceed-widget-hierarchy-list"):
             return False
 
-        topMostSerialisationData = cPickle.loads(data.data("application/x-ceed-widget-hierarchy-list").data())
+        topMostSerialisationData = widgethelpers.SerialisationData.decodeList(data.data("application/x-ceed-widget-hierarchy-list").data())
 
         if len(topMostSerialisationData) == 0:
             return False
@@ -80,6 +80,8 @@ class Manipulator(cegui_widgethelpers.Manipulator):
     def __init__(self, visual, parent, widget, recursive = True, skipAutoWidgets = False):
         self.visual = visual
         self.showOutline = True
+        # WidgetHierarchyItem of this manipulator, None if it isn't in the hierarchy tree
+        self.treeItem = None
 
         super(Manipulator, self).__init__(parent, widget, recursive, skipAutoWidgets)
 
@@ -148,12 +150,16 @@ class Manipulator(cegui_widgethelpers.Manipulator):
 
     def createChildManipulator(self, childWidget, recursive = True, skipAutoWidgets = False):
         ret = Manipulator(self.visual, self, childWidget, recursive, skipAutoWidgets)
-        ret.updateFromWidget()
+        # children of the new manipulator have been updated when they were created
+        ret.updateFromWidget(skipUnchangedSubtrees = True)
         return ret
 
     def detach(self, detachWidget = True, destroyWidget = True, recursive = True):
         parentWidgetWasNone = self.widget.getParent() is None
 
+        # removes the hierarchy items of the whole subtree at once
+        self.visual.hierarchyDockWidget.removeManipulator(self)
+
         super(Manipulator, self).detach(detachWidget, destroyWidget, recursive)
 
         if parentWidgetWasNone:
@@ -261,10 +267,10 @@ class Manipulator(cegui_widgethelpers.Manipulator):
             painter.fillRect(qChildRect, Manipulator.getSnapGridBrush())
             painter.restore()
 
-    def updateFromWidget(self, callUpdate = False, updateAncestorLCs = False):
+    def updateGeometryFromWidget(self, callUpdate = False):
         # we are updating the position and size from widget, we don't want any snapping
         self.ignoreSnapGrid = True
-        super(Manipulator, self).updateFromWidget(callUpdate, updateAncestorLCs)
+        ret = super(Manipulator, self).updateGeometryFromWidget(callUpdate)
         self.ignoreSnapGrid = False
 
         self.showOutline = True
@@ -301,6 +307,8 @@ class Manipulator(cegui_widgethelpers.Manipulator):
             # any drag moving to be possible
             self.setFlags(self.flags() & ~QtGui.QGraphicsItem.ItemIsMovable)
 
+        return ret
+
     def snapXCoordToGrid(self, x):
         # we have to take the child rect into account
         childRect = self.widget.getChildContentArea(self.snapGridNonClientArea).get()
@@ -319,6 +327,33 @@ class Manipulator(cegui_widgethelpers.Manipulator):
         snapGridY = settings.getEntry("layout/visual/snap_grid_y").value
         return yOffset + round((y - yOffset) / snapGridY) * snapGridY
 
+    def getSiblingSnapIndex(self):
+        """Returns spatial index of siblings to snap edges to, None if snapping to siblings is off"""
+
+        if self.ignoreSnapGrid or settings.getEntry("layout/visual/sibling_snap_distance").value <= 0:
+            return None
+
+        parent = self.parentItem()
+        if not isinstance(parent, Manipulator):
+            return None
+
+        return parent.childIndex
+
+    def snapToSiblingEdge(self, coordinates, findNearestEdge):
+        """Returns the smallest offset that aligns one of given coordinates (in parent's space)
+        with an edge of a sibling, 0 if no sibling edge is close enough
+        """
+
+        distance = settings.getEntry("layout/visual/sibling_snap_distance").value
+
+        ret = None
+        for coordinate in coordinates:
+            edge = findNearestEdge(coordinate, distance, self)
+            if edge is not None and (ret is None or abs(edge - coordinate) < abs(ret)):
+                ret = edge - coordinate
+
+        return ret if ret is not None else 0
+
     def constrainMovePoint(self, point):
         if not self.ignoreSnapGrid and hasattr(self, "snapGridAction") and self.snapGridAction.isChecked():
             parent = self.parentItem()
@@ -329,6 +364,12 @@ class Manipulator(cegui_widgethelpers.Manipulator):
             if isinstance(parent, Manipulator):
                 point = QtCore.QPointF(parent.snapXCoordToGrid(point.x()), parent.snapYCoordToGrid(point.y()))
 
+        siblingIndex = self.getSiblingSnapIndex()
+        if siblingIndex is not None:
+            rect = self.rect()
+            point += QtCore.QPointF(self.snapToSiblingEdge([point.x() + rect.left(), point.x() + rect.right()], siblingIndex.findNearestVerticalEdge),
+                                    self.snapToSiblingEdge([point.y() + rect.top(), point.y() + rect.bottom()], siblingIndex.findNearestHorizontalEdge))
+
         point = super(Manipulator, self).constrainMovePoint(point)
 
         return point
@@ -358,6 +399,21 @@ class Manipulator(cegui_widgethelpers.Manipulator):
                 if rect.bottom() != oldRect.bottom():
                     rect.setBottom(parent.snapYCoordToGrid(self.pos().y() + rect.bottom()) - self.pos().y())
 
+        siblingIndex = self.getSiblingSnapIndex()
+        if siblingIndex is not None:
+            # same as with the snap grid, only the edges that have changed snap
+            pos = self.pos()
+
+            if rect.left() != oldRect.left():
+                rect.setLeft(rect.left() + self.snapToSiblingEdge([pos.x() + rect.left()], siblingIndex.findNearestVerticalEdge))
+            if rect.top() != oldRect.top():
+                rect.setTop(rect.top() + self.snapToSiblingEdge([pos.y() + rect.top()], siblingIndex.findNearestHorizontalEdge))
+
+            if rect.right() != oldRect.right():
+                rect.setRight(rect.right() + self.snapToSiblingEdge([pos.x() + rect.right()], siblingIndex.findNearestVerticalEdge))
+            if rect.bottom() != oldRect.bottom():
+                rect.setBottom(rect.bottom() + self.snapToSiblingEdge([pos.y() + rect.bottom()], siblingIndex.findNearestHorizontalEdge))
+
         rect = super(Manipulator, self).constrainResizeRect(rect, oldRect)
 
         return rect
@@ -377,17 +433,25 @@ class SerialisationData(cegui_widgethelpers.SerialisationData):
     The only reason for this class is that we need to create the correct Manipulator (not it's base class!)
     """
 
+    __slots__ = ("visual", )
+
     def __init__(self, visual, widget = None, serialiseChildren = True):
         self.visual = visual
 
         super(SerialisationData, self).__init__(widget, serialiseChildren)
 
+    def __setstate__(self, state):
+        # visual isn't pickled, it has to be set via setVisual after unpickling
+        self.visual = None
+
+        super(SerialisationData, self).__setstate__(state)
+
     def createChildData(self, widget = None, serialiseChildren = True):
         return SerialisationData(self.visual, widget, serialiseChildren)
 
     def createManipulator(self, parentManipulator, widget, recursive = True, skipAutoWidgets = True):
         ret = Manipulator(self.visual, parentManipulator, widget, recursive, skipAutoWidgets)
-        ret.updateFromWidget()
+        ret.updateFromWidget(skipUnchangedSubtrees = True)
         return ret
 
     def setVisual(self, visual):
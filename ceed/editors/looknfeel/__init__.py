@@ -26,8 +26,6 @@ from ceed import editors
 
 import ceed.compatibility.looknfeel as looknfeel_compatibility
 
-from ceed.editors.looknfeel.tabbed_editor import LookNFeelTabbedEditor
-
 class LookNFeelTabbedEditorFactory(editors.TabbedEditorFactory):
     def getFileExtensions(self):
         extensions = looknfeel_compatibility.manager.getAllPossibleExtensions()
@@ -43,4 +41,7 @@ class LookNFeelTabbedEditorFactory(editors.TabbedEditorFactory):
         return False
 
     def create(self, filePath):
+        # see the comment in LayoutTabbedEditor.__init__
+        from ceed.editors.looknfeel.tabbed_editor import LookNFeelTabbedEditor
+
         return LookNFeelTabbedEditor(filePath)
@@ -141,6 +141,9 @@ class LookNFeelTabbedEditor(MultiModeTabbedEditor):
         if not lookNFeelAsXMLString:
             return
 
+        # WidgetLooks resolve images, fonts and child widget types when they are parsed
+        self.mainWindow.ceguiInstance.ensureResourcesReferencedBy(lookNFeelAsXMLString)
+
         #Mapping all occuring references
         modifiedLookNFeelString = self.mapWidgetLookReferences(lookNFeelAsXMLString)
 
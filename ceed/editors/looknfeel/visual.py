@@ -84,6 +84,8 @@ class LookNFeelVisualEditing(QtGui.QWidget, multi.EditMode):
         # Remove the widget with the previous WidgetLook from the scene
         self.destroyCurrentPreviewWidget()
 
+        self.scene.releaseFBO()
+
     def setupActions(self):
         self.connectionGroup = action.ConnectionGroup(action.ActionManager.instance)
 
@@ -21,6 +21,10 @@
 from PySide import QtGui
 from ceed import editors
 
+# extensions of files this editor opens, the main window reads these without creating the factory,
+# scheme and font are just temporary, they will go away when scheme and font editors are in place
+FILE_EXTENSIONS = frozenset(["py", "lua", "txt", "xml", "scheme", "font"])
+
 # TODO: This could get replaced by QScintilla once PySide guys get it to work.
 #       Scintilla would probably be overkill though, I can't imagine anyone
 #       doing any serious text editing in this application
@@ -81,11 +85,7 @@ class TextTabbedEditor(editors.TabbedEditor):
 
 class TextTabbedEditorFactory(editors.TabbedEditorFactory):
     def getFileExtensions(self):
-        extensions = {"py", "lua", "txt", "xml"}
-        # this is just temporary, will go away when scheme, looknfeel and font editors are in place
-        temporaryExtensions = {"scheme", "font"}
-        extensions.update(temporaryExtensions)
-        return extensions
+        return set(FILE_EXTENSIONS)
 
     def canEditFile(self, filePath):
         extensions = self.getFileExtensions()
@@ -0,0 +1,133 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+"""Records how long frames of the embedded CEGUI take and what they spend the time on.
+
+Used to tell whether a slow layout is CEGUI-bound or Qt-bound, see cegui.container.DebugInfo
+"""
+
+import collections
+import math
+
+TIME_PULSE = "CEGUI time pulse"
+CEGUI_RENDERING = "CEGUI rendering"
+FBO_BLIT = "FBO blit"
+# everything else the view does when painting, the checkerboard, manipulators, ...
+QT_PAINTING = "Qt scene painting"
+TOTAL = "Total"
+
+PHASES = [TIME_PULSE, CEGUI_RENDERING, FBO_BLIT, QT_PAINTING, TOTAL]
+
+# upper bounds of histogram buckets in seconds, the last bucket has no upper bound
+HISTOGRAM_BOUNDS = [0.001, 0.002, 0.004, 0.008, 0.016, 0.033, 0.066]
+
+class FrameTimingRecorder(object):
+    """Keeps durations of phases of the last maximumFrames frames.
+
+    A frame is recorded by calling beginFrame, addPhaseTime for any of the phases
+    and endFrame with the total duration. Phase times added outside of a frame are ignored.
+    """
+
+    def __init__(self, maximumFrames = 1000):
+        # list of dicts mapping phases to durations in seconds
+        self.frames = collections.deque(maxlen = maximumFrames)
+        self.currentFrame = None
+
+    def beginFrame(self):
+        self.currentFrame = dict((phase, 0.0) for phase in PHASES)
+
+    def addPhaseTime(self, phase, duration):
+        if self.currentFrame is not None:
+            self.currentFrame[phase] += duration
+
+    def endFrame(self, totalDuration):
+        if self.currentFrame is None:
+            return
+
+        self.currentFrame[TOTAL] = totalDuration
+        measured = sum(self.currentFrame[phase] for phase in [TIME_PULSE, CEGUI_RENDERING, FBO_BLIT])
+        self.currentFrame[QT_PAINTING] = max(0.0, totalDuration - measured)
+
+        self.frames.append(self.currentFrame)
+        self.currentFrame = None
+
+    def reset(self):
+        self.frames.clear()
+        self.currentFrame = None
+
+    def getDurations(self, phase):
+        return [frame[phase] for frame in self.frames]
+
+    def getPercentiles(self, phase, percentiles = (50, 95, 99)):
+        """Returns durations of given phase at given percentiles (nearest rank), None if nothing was recorded"""
+
+        durations = sorted(self.getDurations(phase))
+        if len(durations) == 0:
+            return None
+
+        return [durations[max(0, int(math.ceil(percentile / 100.0 * len(durations))) - 1)] for percentile in percentiles]
+
+    def getHistogram(self, phase):
+        """Returns list of (upperBound, count) tuples, see HISTOGRAM_BOUNDS.
+        upperBound of the last bucket is None.
+        """
+
+        bounds = HISTOGRAM_BOUNDS + [None]
+        counts = [0] * len(bounds)
+
+        for duration in self.getDurations(phase):
+            for i, bound in enumerate(bounds):
+                if bound is None or duration < bound:
+                    counts[i] += 1
+                    break
+
+        return zip(bounds, counts)
+
+    def formatSummary(self, histogramWidth = 40):
+        """Returns a plain text table of percentiles of all phases followed by a histogram of frame times"""
+
+        if len(self.frames) == 0:
+            return "No frames recorded"
+
+        lines = ["%i frames, milliseconds" % (len(self.frames)), ""]
+
+        lines.append("%-20s %10s %10s %10s" % ("", "p50", "p95", "p99"))
+        for phase in PHASES:
+            lines.append("%-20s %10.3f %10.3f %10.3f" % tuple([phase] + [duration * 1000 for duration in self.getPercentiles(phase)]))
+
+        lines.append("")
+        lines.append("Frame times")
+
+        histogram = self.getHistogram(TOTAL)
+        maximumCount = max(count for _, count in histogram)
+        for bound, count in histogram:
+            label = "< %g ms" % (bound * 1000) if bound is not None else ">= %g ms" % (HISTOGRAM_BOUNDS[-1] * 1000)
+            bar = "#" * int(round(float(count) / maximumCount * histogramWidth)) if maximumCount > 0 else ""
+            lines.append(("%-10s %6i %s" % (label, count, bar)).rstrip())
+
+        return "\n".join(lines)
+
+    def export(self, file_):
+        """Writes all recorded frames as CSV (durations in milliseconds) to given file-like object"""
+
+        file_.write(",".join(["Frame"] + PHASES) + "\n")
+
+        for index, frame in enumerate(self.frames):
+            file_.write(",".join([str(index)] + ["%.6f" % (frame[phase] * 1000) for phase in PHASES]) + "\n")
@@ -0,0 +1,193 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+"""Structural diff of two layout documents, lets the Code mode apply just the changes
+to the live widgets instead of reloading the whole layout.
+
+Works on the XML alone, this doesn't depend on CEGUI or Qt.
+"""
+
+from xml.etree import cElementTree as ElementTree
+
+class LayoutDiff(object):
+    """Changes turning one layout document into another
+
+    Only changes that can be applied to the live widget tree are supported, see diffLayouts.
+    """
+
+    def __init__(self, layoutAttributes):
+        # attributes of the GUILayout element, added widgets are wrapped in it
+        self.layoutAttributes = layoutAttributes
+
+        # list of (widgetPath, propertyName, value) tuples in document order,
+        # value is None if the property was removed and should revert to its default
+        self.propertyChanges = []
+        # list of widget paths, only the top-most removed widgets are listed
+        self.removedWidgets = []
+        # list of (parentPath, widgetName, layoutString) tuples, layoutString is a whole layout
+        # document containing just the added widget (and its children)
+        self.addedWidgets = []
+
+    def __len__(self):
+        return len(self.propertyChanges) + len(self.removedWidgets) + len(self.addedWidgets)
+
+    def wrapElement(self, element):
+        layout = ElementTree.Element("GUILayout", self.layoutAttributes)
+        layout.append(element)
+        element.tail = None
+
+        return ElementTree.tostring(layout)
+
+    def compareElements(self, path, oldElement, newElement):
+        """Compares two Window or AutoWindow elements at given path and records the changes
+
+        Returns False if the changes can't be applied incrementally
+        """
+
+        if oldElement.attrib != newElement.attrib:
+            return False
+
+        oldContents = ElementContents(oldElement)
+        newContents = ElementContents(newElement)
+
+        if not oldContents.isValid or not newContents.isValid or oldContents.others != newContents.others:
+            return False
+
+        for name, value in newContents.properties:
+            if oldContents.propertyValues.get(name) != value:
+                self.propertyChanges.append((path, name, value))
+
+        for name, _ in oldContents.properties:
+            if name not in newContents.propertyValues:
+                self.propertyChanges.append((path, name, None))
+
+        if set(oldContents.autoWindows.iterkeys()) != set(newContents.autoWindows.iterkeys()):
+            return False
+
+        for namePath, element in newContents.autoWindows.iteritems():
+            if not self.compareElements(path + "/" + namePath, oldContents.autoWindows[namePath], element):
+                return False
+
+        oldNames = [name for name, _ in oldContents.windows]
+        newNames = [name for name, _ in newContents.windows]
+        oldNameSet = set(oldNames)
+        newNameSet = set(newNames)
+
+        keptNames = [name for name in oldNames if name in newNameSet]
+        # CEGUI can only append children, added widgets have to come after the kept ones
+        # and the kept ones have to stay in the same order
+        if newNames[:len(keptNames)] != keptNames:
+            return False
+
+        for name in oldNames:
+            if name not in newNameSet:
+                self.removedWidgets.append(path + "/" + name)
+
+        oldWindows = dict(oldContents.windows)
+        for name, element in newContents.windows:
+            if name in oldNameSet:
+                if not self.compareElements(path + "/" + name, oldWindows[name], element):
+                    return False
+
+            else:
+                self.addedWidgets.append((path, name, self.wrapElement(element)))
+
+        return True
+
+class ElementContents(object):
+    """Child elements of a Window or AutoWindow element sorted by what they are"""
+
+    def __init__(self, element):
+        # list of (name, value) tuples and a dict for lookups
+        self.properties = []
+        self.propertyValues = {}
+        # list of (name, element) tuples in document order
+        self.windows = []
+        # namePath -> element
+        self.autoWindows = {}
+        # everything else (events, user strings, ...) serialised
+        self.others = []
+
+        # False if there are duplicate names
+        self.isValid = True
+
+        windowNames = set()
+        for child in element:
+            if child.tag == "Property":
+                name = child.get("name")
+                value = child.get("value") if "value" in child.attrib else (child.text or "")
+
+                self.properties.append((name, value))
+                self.propertyValues[name] = value
+
+            elif child.tag == "Window":
+                name = child.get("name")
+                if name is None or name in windowNames:
+                    self.isValid = False
+                windowNames.add(name)
+
+                self.windows.append((name, child))
+
+            elif child.tag == "AutoWindow":
+                namePath = child.get("namePath")
+                if namePath is None or namePath in self.autoWindows:
+                    self.isValid = False
+
+                self.autoWindows[namePath] = child
+
+            else:
+                self.others.append(serialiseIgnoringTail(child))
+
+def serialiseIgnoringTail(element):
+    tail = element.tail
+    element.tail = None
+
+    try:
+        return ElementTree.tostring(element)
+
+    finally:
+        element.tail = tail
+
+def diffLayouts(oldCode, newCode):
+    """Returns LayoutDiff of given layout documents or None if the changes can't be
+    applied incrementally (the documents can't be parsed, the root widget or its type changed,
+    widgets got reordered, events changed, ...)
+    """
+
+    try:
+        oldLayout = ElementTree.fromstring(oldCode.encode("utf-8") if isinstance(oldCode, unicode) else oldCode)
+        newLayout = ElementTree.fromstring(newCode.encode("utf-8") if isinstance(newCode, unicode) else newCode)
+
+    except ElementTree.ParseError:
+        return None
+
+    if oldLayout.tag != "GUILayout" or oldLayout.tag != newLayout.tag or oldLayout.attrib != newLayout.attrib:
+        return None
+
+    oldChildren = list(oldLayout)
+    newChildren = list(newLayout)
+    if len(oldChildren) != 1 or len(newChildren) != 1 or oldChildren[0].tag != "Window" or newChildren[0].tag != "Window":
+        return None
+
+    ret = LayoutDiff(dict(newLayout.attrib))
+    if not ret.compareElements(newChildren[0].get("name"), oldChildren[0], newChildren[0]):
+        return None
+
+    return ret
@@ -41,9 +41,23 @@ from ceed import messages
 #from ceed import help
 from ceed import recentlyused
 from ceed import about
+from ceed import startupprofile
 
 import ceed.ui.mainwindow
 
+def getCompatibilityManager(name):
+    """Returns compatibility manager of given ceed.compatibility submodule, importing it if necessary"""
+
+    return __import__("ceed.compatibility.%s" % (name), fromlist = ["manager"]).manager
+
+def getEditorFileExtensions(name):
+    """Returns FILE_EXTENSIONS of given ceed.editors subpackage, importing it if necessary
+
+    The packages only import their heavy modules when an editor is created, this is cheap.
+    """
+
+    return __import__("ceed.editors.%s" % (name), fromlist = ["FILE_EXTENSIONS"]).FILE_EXTENSIONS
+
 class MainWindow(QtGui.QMainWindow):
     """The central window of the application.
 
@@ -101,37 +115,27 @@ class MainWindow(QtGui.QMainWindow):
                 "The editor will run but you may experience rendering artifacts.",
                 "no_fbo_support")
 
-        import ceed.editors.animation_list as animation_list_editor
-        import ceed.editors.bitmap as bitmap_editor
-        import ceed.editors.imageset as imageset_editor
-        import ceed.editors.layout as layout_editor
-        import ceed.editors.looknfeel as looknfeel_editor
-        #import ceed.editors.property_mappings as property_mappings_editor
-        import ceed.editors.text as text_editor
-
-        self.editorFactories = [
-            animation_list_editor.AnimationListTabbedEditorFactory(),
-            bitmap_editor.BitmapTabbedEditorFactory(),
-            imageset_editor.ImagesetTabbedEditorFactory(),
-            layout_editor.LayoutTabbedEditorFactory(),
-            looknfeel_editor.LookNFeelTabbedEditorFactory(),
-            #property_mappings_editor.PropertyMappingsTabbedEditorFactory(),
-            text_editor.TextTabbedEditorFactory()
-        ]
-        # File dialog filters, keep indices in sync with the list above
-        self.editorFactoryFileFilters = [
-            "Animation files (%s)" % ("*." + " *.".join(self.editorFactories[0].getFileExtensions())),
-            "Bitmap files (%s)" % ("*." + " *.".join(self.editorFactories[1].getFileExtensions())),
-            "Imageset files (%s)" % ("*." + " *.".join(self.editorFactories[2].getFileExtensions())),
-            "Layout files (%s)" % ("*." + " *.".join(self.editorFactories[3].getFileExtensions())),
-            #"Property Mapping files (%s)" % ("*." + " *.".join(self.editorFactories[4].getFileExtensions())),
-            "Text files (%s)" % ("*." + " *.".join(self.editorFactories[4].getFileExtensions()))
-        ]
-        allExt = []
-        for factory in self.editorFactories:
-            allExt.extend(factory.getFileExtensions())
-        self.editorFactoryFileFilters.insert(0, "All known files (*." + " *.".join(allExt) + ")")
-        self.editorFactoryFileFilters.insert(1, "All files (*)")
+        with startupprofile.phase("Editor factory registration"):
+            # editor packages are only imported when their extensions are first needed,
+            # their visual/code modules only when the first editor of their kind is opened
+            self.editorFactories = [
+                editors.LazyTabbedEditorFactory("Animation list", "ceed.editors.animation_list", "AnimationListTabbedEditorFactory",
+                                                lambda: getEditorFileExtensions("animation_list")),
+                editors.LazyTabbedEditorFactory("Bitmap", "ceed.editors.bitmap", "BitmapTabbedEditorFactory",
+                                                lambda: getEditorFileExtensions("bitmap")),
+                editors.LazyTabbedEditorFactory("Imageset", "ceed.editors.imageset", "ImagesetTabbedEditorFactory",
+                                                lambda: getCompatibilityManager("imageset").getAllPossibleExtensions()),
+                editors.LazyTabbedEditorFactory("Layout", "ceed.editors.layout", "LayoutTabbedEditorFactory",
+                                                lambda: getCompatibilityManager("layout").getAllPossibleExtensions()),
+                editors.LazyTabbedEditorFactory("Look n' Feel", "ceed.editors.looknfeel", "LookNFeelTabbedEditorFactory",
+                                                lambda: getCompatibilityManager("looknfeel").getAllPossibleExtensions()),
+                #editors.LazyTabbedEditorFactory("Property mappings", "ceed.editors.property_mappings", "PropertyMappingsTabbedEditorFactory",
+                #                                set(["pmappings"])),
+                editors.LazyTabbedEditorFactory("Text", "ceed.editors.text", "TextTabbedEditorFactory",
+                                                lambda: getEditorFileExtensions("text"))
+            ]
+        # File dialog filters, built when first needed, see getEditorFactoryFileFilters
+        self.editorFactoryFileFilters = None
 
         self._activeEditor = None
         self._project = None
@@ -1139,6 +1143,28 @@ Details of this error: %s""" % (e))
     def slot_openFile(self, absolutePath):
         self.openEditorTab(absolutePath)
 
+    def getEditorFactoryFileFilters(self):
+        """Returns file dialog filters of all registered editor factories
+
+        This is not done when the main window is constructed because extensions
+        of some factories are only known after their compatibility managers are imported.
+        """
+
+        if self.editorFactoryFileFilters is None:
+            filters = []
+            allExt = []
+            for factory in self.editorFactories:
+                extensions = sorted(factory.getFileExtensions())
+                filters.append("%s files (%s)" % (factory.getName(), "*." + " *.".join(extensions)))
+                allExt.extend(extensions)
+
+            filters.insert(0, "All known files (*." + " *.".join(allExt) + ")")
+            filters.insert(1, "All files (*)")
+
+            self.editorFactoryFileFilters = filters
+
+        return self.editorFactoryFileFilters
+
     def slot_openFileDialog(self):
         defaultDir = ""
         if self.project:
@@ -1147,8 +1173,8 @@ Details of this error: %s""" % (e))
         fileName, _ = QtGui.QFileDialog.getOpenFileName(self,
                                                        "Open File",
                                                        defaultDir,
-                                                       ";;".join(self.editorFactoryFileFilters),
-                                                       self.editorFactoryFileFilters[0])
+                                                       ";;".join(self.getEditorFactoryFileFilters()),
+                                                       self.getEditorFactoryFileFilters()[0])
         if fileName:
             self.openEditorTab(fileName)
 
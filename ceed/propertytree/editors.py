@@ -471,6 +471,16 @@ PropertyEditorRegistry.addStandardEditor(FontEditor)
 
 
 class ImageEditor(DynamicChoicesEditor):
+    """Editor for image references.
+
+    Projects can have tens of thousands of images so only images starting with
+    a prefix are listed, the prefix is typed into the combobox. Initially it's
+    the imageset of the current value.
+    """
+
+    # how many images are listed at most
+    maximumChoices = 500
+
     @classmethod
     def getSupportedValueTypes(cls):
         return {ct.ImageRef: 0}
@@ -478,16 +488,61 @@ class ImageEditor(DynamicChoicesEditor):
     def __init__(self, boundProperty, instantApply=True, ownsProperty=False):
         super(ImageEditor, self).__init__(boundProperty, instantApply=instantApply, ownsProperty=ownsProperty)
 
+        self.prefix = ""
+        currentImage = self.property.value.value if isinstance(self.property.value, ct.ImageRef) else ""
+        if "/" in currentImage:
+            self.prefix = currentImage.split("/", 1)[0] + "/"
+
     def getChoices(self):
         ceguiInstance = mainwindow.MainWindow.instance.ceguiInstance
 
         ret = [("", ct.ImageRef(""))]  # GUI Context default font
 
         if ceguiInstance is not None:
-            ret.extend([(image, ct.ImageRef(image)) for image in ceguiInstance.getAvailableImages()])
+            images = ceguiInstance.getAvailableImagesWithPrefix(self.prefix, self.maximumChoices)
+
+            # the current value has to be listed for setWidgetValueFromProperty to find it
+            currentImage = self.property.value.value if isinstance(self.property.value, ct.ImageRef) else ""
+            if currentImage != "" and currentImage not in images:
+                ret.append((currentImage, ct.ImageRef(currentImage)))
+
+            ret.extend([(image, ct.ImageRef(image)) for image in images])
 
         return ret
 
+    def createEditWidget(self, parent):
+        super(ImageEditor, self).createEditWidget(parent)
+
+        self.editWidget.setEditable(True)
+        self.editWidget.setInsertPolicy(QtGui.QComboBox.NoInsert)
+        self.editWidget.lineEdit().textEdited.connect(self.filterChoices)
+
+        return self.editWidget
+
+    def getWidgetValue(self):
+        idx = self.editWidget.currentIndex()
+        # a typed prefix isn't a value until one of the listed images is chosen
+        if idx == -1 or self.editWidget.itemText(idx) != self.editWidget.currentText():
+            return (None, False)
+
+        return super(ImageEditor, self).getWidgetValue()
+
+    def filterChoices(self, prefix):
+        self.prefix = prefix
+
+        # repopulating must not change the value
+        self.editWidget.blockSignals(True)
+        try:
+            self.editWidget.clear()
+            for name, value in self.getChoices():
+                self.editWidget.addItem(name, value)
+
+            # clearing the combobox cleared the typed text as well
+            self.editWidget.setEditText(prefix)
+
+        finally:
+            self.editWidget.blockSignals(False)
+
 
 PropertyEditorRegistry.addStandardEditor(ImageEditor)
 
@@ -0,0 +1,203 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+"""Spatial index of rectangles, used to find overlapping siblings and sibling edges
+without going through all the items.
+
+Rectangles are plain (left, top, right, bottom) tuples, this doesn't depend on Qt.
+"""
+
+import bisect
+import math
+
+class EdgeList(object):
+    """Sorted list of edge coordinates along one axis, each edge belongs to an item"""
+
+    def __init__(self):
+        self.coordinates = []
+        self.items = []
+
+    def add(self, coordinate, item):
+        index = bisect.bisect_right(self.coordinates, coordinate)
+        self.coordinates.insert(index, coordinate)
+        self.items.insert(index, item)
+
+    def remove(self, coordinate, item):
+        index = bisect.bisect_left(self.coordinates, coordinate)
+        while index < len(self.coordinates) and self.coordinates[index] == coordinate:
+            if self.items[index] is item:
+                del self.coordinates[index]
+                del self.items[index]
+                return
+
+            index += 1
+
+        raise ValueError("Edge %f of given item isn't in the list" % (coordinate))
+
+    def clear(self):
+        self.coordinates = []
+        self.items = []
+
+    def findNearest(self, coordinate, tolerance, exclude = None):
+        """Returns the edge coordinate nearest to given coordinate that is at most tolerance
+        away from it, None if there is no such edge. Edges of the exclude item are skipped.
+        """
+
+        start = bisect.bisect_left(self.coordinates, coordinate - tolerance)
+        end = bisect.bisect_right(self.coordinates, coordinate + tolerance)
+
+        ret = None
+        for index in xrange(start, end):
+            if self.items[index] is exclude:
+                continue
+
+            candidate = self.coordinates[index]
+            if ret is None or abs(candidate - coordinate) < abs(ret - coordinate):
+                ret = candidate
+
+        return ret
+
+class SpatialIndex(object):
+    """Uniform grid of rectangles of items, typically of siblings under one parent.
+
+    Each item is put into all grid cells its rectangle touches, queries only
+    look at the cells the query rectangle touches. Left and right edges as well
+    as top and bottom edges are also kept sorted for snapping.
+    """
+
+    def __init__(self, cellSize = 64.0):
+        self.cellSize = float(cellSize)
+
+        # item -> (left, top, right, bottom)
+        self.rects = {}
+        # (column, row) -> set of items
+        self.cells = {}
+
+        self.horizontalEdges = EdgeList()
+        self.verticalEdges = EdgeList()
+
+    def __len__(self):
+        return len(self.rects)
+
+    def __contains__(self, item):
+        return item in self.rects
+
+    def getCellRange(self, rect):
+        left, top, right, bottom = rect
+
+        return (int(math.floor(left / self.cellSize)), int(math.floor(top / self.cellSize)),
+                int(math.floor(right / self.cellSize)), int(math.floor(bottom / self.cellSize)))
+
+    def iterateCells(self, rect):
+        firstColumn, firstRow, lastColumn, lastRow = self.getCellRange(rect)
+
+        for column in xrange(firstColumn, lastColumn + 1):
+            for row in xrange(firstRow, lastRow + 1):
+                yield (column, row)
+
+    def getRect(self, item):
+        return self.rects.get(item)
+
+    def update(self, item, rect):
+        """Inserts given item or moves it if it's already in the index"""
+
+        rect = tuple(rect)
+        oldRect = self.rects.get(item)
+        if oldRect == rect:
+            return
+
+        if oldRect is not None:
+            self.remove(item)
+
+        self.rects[item] = rect
+        for cell in self.iterateCells(rect):
+            self.cells.setdefault(cell, set()).add(item)
+
+        left, top, right, bottom = rect
+        self.verticalEdges.add(left, item)
+        self.verticalEdges.add(right, item)
+        self.horizontalEdges.add(top, item)
+        self.horizontalEdges.add(bottom, item)
+
+    def remove(self, item):
+        """Removes given item, does nothing if it isn't in the index"""
+
+        rect = self.rects.pop(item, None)
+        if rect is None:
+            return
+
+        for cell in self.iterateCells(rect):
+            items = self.cells[cell]
+            items.discard(item)
+            if len(items) == 0:
+                del self.cells[cell]
+
+        left, top, right, bottom = rect
+        self.verticalEdges.remove(left, item)
+        self.verticalEdges.remove(right, item)
+        self.horizontalEdges.remove(top, item)
+        self.horizontalEdges.remove(bottom, item)
+
+    def clear(self):
+        self.rects = {}
+        self.cells = {}
+        self.verticalEdges.clear()
+        self.horizontalEdges.clear()
+
+    def query(self, rect):
+        """Returns set of items whose rectangles intersect given rectangle
+
+        Rectangles that just touch don't intersect, same as with QRectF.intersects
+        """
+
+        left, top, right, bottom = rect
+
+        ret = set()
+        checked = set()
+
+        firstColumn, firstRow, lastColumn, lastRow = self.getCellRange(rect)
+        # the query rect can easily be much bigger than what's in the index,
+        # don't go through heaps of empty cells in that case
+        if (lastColumn - firstColumn + 1) * (lastRow - firstRow + 1) > len(self.cells):
+            cells = [cell for cell in self.cells.iterkeys() if firstColumn <= cell[0] <= lastColumn and firstRow <= cell[1] <= lastRow]
+        else:
+            cells = self.iterateCells(rect)
+
+        for cell in cells:
+            for item in self.cells.get(cell, ()):
+                if item in checked:
+                    continue
+                checked.add(item)
+
+                itemLeft, itemTop, itemRight, itemBottom = self.rects[item]
+                if itemLeft < right and left < itemRight and itemTop < bottom and top < itemBottom:
+                    ret.add(item)
+
+        return ret
+
+    def findNearestVerticalEdge(self, x, tolerance, exclude = None):
+        """Returns X coordinate of the left or right edge nearest to x, see EdgeList.findNearest"""
+
+        return self.verticalEdges.findNearest(x, tolerance, exclude)
+
+    def findNearestHorizontalEdge(self, y, tolerance, exclude = None):
+        """Returns Y coordinate of the top or bottom edge nearest to y, see EdgeList.findNearest"""
+
+        return self.horizontalEdges.findNearest(y, tolerance, exclude)
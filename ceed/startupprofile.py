@@ -0,0 +1,222 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+"""Measures where the time goes when the editor starts up.
+
+Enabled by passing --profile-startup to ceed-gui or by setting the CEED_PROFILE_STARTUP
+environment variable. Records how long startup phases took (see the phase function)
+and how long importing each module took. Unlike bin/profile.sh this has practically
+no overhead, the report is printed once the main window is shown, the requested project
+and files are opened and CEGUI is initialised.
+"""
+
+# NOTE: This is imported before prerequisites are checked, it must not depend on PySide or anything else!
+
+import __builtin__
+import contextlib
+import os
+import sys
+import time
+
+ENVIRONMENT_VARIABLE = "CEED_PROFILE_STARTUP"
+
+class StartupProfile(object):
+    """Holds durations of startup phases and module imports.
+
+    Durations of imports are "self" durations, time spent importing other modules
+    from the module being imported is only accounted to those other modules.
+    """
+
+    def __init__(self):
+        self.startTime = time.time()
+
+        # list of (name, depth, duration) tuples in the order the phases started
+        self.phases = []
+        self.phaseDepth = 0
+        # names of phases that ended
+        self.finishedPhases = set()
+        # (phaseName, stream) if the report is to be written when that phase ends, see finishAfterPhase
+        self.pendingFinish = None
+
+        # module name -> duration in seconds
+        self.imports = {}
+        # stack of [moduleName, timeSpentInNestedImports] lists
+        self.importStack = []
+
+        self.originalImport = None
+
+    def installImportHook(self):
+        if self.originalImport is not None:
+            return
+
+        self.originalImport = __builtin__.__import__
+        __builtin__.__import__ = self.profiledImport
+
+    def uninstallImportHook(self):
+        if self.originalImport is None:
+            return
+
+        __builtin__.__import__ = self.originalImport
+        self.originalImport = None
+
+    def getLoadedName(self, name, fromlist):
+        """Returns name of what importing given module name with given fromlist would load,
+        None if everything is loaded already.
+
+        "from package import module" imports an already loaded package, the module is
+        what gets loaded in that case.
+        """
+
+        if name not in sys.modules:
+            return name
+
+        if not fromlist:
+            return None
+
+        module = sys.modules[name]
+        # anything the module has is either an attribute or a submodule that was loaded before
+        missing = ["%s.%s" % (name, item) for item in fromlist if item != "*" and not hasattr(module, item)]
+        if len(missing) == 0:
+            return None
+
+        # the submodules are loaded in one go, they can't be told apart
+        return ", ".join(missing)
+
+    def profiledImport(self, name, globals = None, locals = None, fromlist = None, level = -1):
+        loadedName = self.getLoadedName(name, fromlist)
+
+        # modules already imported cost next to nothing, don't bother measuring them
+        if loadedName is None:
+            return self.originalImport(name, globals, locals, fromlist, level)
+
+        self.importStack.append([loadedName, 0.0])
+        start = time.time()
+
+        try:
+            return self.originalImport(name, globals, locals, fromlist, level)
+
+        finally:
+            duration = time.time() - start
+            _, nested = self.importStack.pop()
+
+            self.imports[loadedName] = self.imports.get(loadedName, 0.0) + duration - nested
+            if len(self.importStack) > 0:
+                self.importStack[-1][1] += duration
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        index = len(self.phases)
+        self.phases.append((name, self.phaseDepth, 0.0))
+        self.phaseDepth += 1
+        start = time.time()
+
+        try:
+            yield
+
+        finally:
+            self.phaseDepth -= 1
+            self.phases[index] = (name, self.phaseDepth, time.time() - start)
+            self.finishedPhases.add(name)
+
+            if self.pendingFinish is not None and self.pendingFinish[0] == name:
+                finish(self.pendingFinish[1])
+
+    def getSlowestImports(self, count):
+        """Returns list of (moduleName, duration) tuples of count slowest imports, slowest first"""
+
+        return sorted(self.imports.iteritems(), key = lambda item: item[1], reverse = True)[:count]
+
+    def formatReport(self, importCount = 30):
+        lines = ["Startup took %.1f ms" % ((time.time() - self.startTime) * 1000), ""]
+
+        lines.append("Phases (ms)")
+        for name, depth, duration in self.phases:
+            lines.append("%10.1f  %s%s" % (duration * 1000, "  " * depth, name))
+
+        lines.append("")
+        lines.append("Imports, %i slowest of %i (ms, excluding nested imports)" % (min(importCount, len(self.imports)), len(self.imports)))
+        for name, duration in self.getSlowestImports(importCount):
+            lines.append("%10.1f  %s" % (duration * 1000, name))
+
+        return "\n".join(lines)
+
+# the StartupProfile of this run, None if profiling startup isn't enabled
+profile = None
+
+def isRequested(argv = None, environ = None):
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+
+    return "--profile-startup" in argv or environ.get(ENVIRONMENT_VARIABLE, "") not in ("", "0")
+
+def start():
+    """Starts profiling, call this as early as possible so that imports are measured"""
+
+    global profile
+
+    if profile is None:
+        profile = StartupProfile()
+        profile.installImportHook()
+
+    return profile
+
+def phase(name):
+    """Returns context manager measuring a startup phase of given name
+
+    This is a no-op if startup isn't being profiled, so it is fine to leave it
+    in code paths that run after startup as well.
+    """
+
+    if profile is None:
+        return _noPhase()
+
+    return profile.phase(name)
+
+@contextlib.contextmanager
+def _noPhase():
+    yield
+
+def finish(stream = None):
+    """Stops profiling and writes the report to given stream (stderr by default)"""
+
+    global profile
+
+    if profile is None:
+        return
+
+    profile.uninstallImportHook()
+    (stream if stream is not None else sys.stderr).write(profile.formatReport() + "\n")
+
+    profile = None
+
+def finishAfterPhase(name, stream = None):
+    """Like finish but if the phase of given name hasn't ended yet, the report is only
+    written once it does. Phases that happen on demand (CEGUI initialisation for example)
+    are included in the report that way.
+    """
+
+    if profile is None:
+        return
+
+    if name in profile.finishedPhases:
+        finish(stream)
+
+    else:
+        profile.pendingFinish = (name, stream)
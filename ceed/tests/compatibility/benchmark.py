@@ -0,0 +1,43 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+
+import unittest
+
+from ceed.benchmark import compatibility
+
+class test_CompatibilityBenchmark(unittest.TestCase):
+    def test_generatedDocumentsAreDetected(self):
+        suite = compatibility.Suite(scale = 0.01)
+
+        for _, manager, type_, data in suite.generateDocuments():
+            try:
+                guessed = [manager.guessType(data)]
+            except compatibility.compatibility.MultiplePossibleTypesError as e:
+                guessed = e.possibleTypes
+
+            self.assertIn(type_, guessed)
+
+    def test_run(self):
+        report = compatibility.Suite(scale = 0.01, repeat = 1).run()
+
+        self.assertNotEqual(len(report.results), 0)
+        for result in report.results:
+            self.assertNotIn("error", result)
@@ -21,9 +21,11 @@
 import unittest
 
 from ceed.compatibility.layout import cegui
+from ceed import xmlbackend
 from xml.etree import cElementTree as ElementTree
 
 import os
+import io
 
 class test_Layout3To4Layer(unittest.TestCase):
     def setUp(self):
@@ -51,6 +53,44 @@ class test_Layout3To4Layer(unittest.TestCase):
         self.assertEqual(element.get("Name"), "Root")
         self.assertEqual(childElement.get("Name"), "Child")
 
+class test_PropertyMigration(unittest.TestCase):
+    def migrate(self, migration, name, value, windowType):
+        property_ = ElementTree.Element("Property")
+        property_.set("name", name)
+        property_.set("value", value)
+
+        migration.migrateProperty(property_, "name", "value", windowType)
+        return property_.get("name"), property_.get("value")
+
+    def test_renames(self):
+        for oldName, newName in cegui.PROPERTY_RENAMES:
+            self.assertEqual(self.migrate(cegui.migration3To4, oldName, "x", "")[0], newName)
+            self.assertEqual(self.migrate(cegui.migration4To3, newName, "x", "")[0], oldName)
+
+        self.assertEqual(self.migrate(cegui.migration3To4, "Text", "x", ""), ("Text", "x"))
+
+    def test_imageProperties(self):
+        self.assertEqual(self.migrate(cegui.migration3To4, "Image", "set:TL image: A ", "TaharezLook/StaticImage"), ("Image", "TL/A"))
+        self.assertEqual(self.migrate(cegui.migration4To3, "Image", "TL/A", "TaharezLook/StaticImage"), ("Image", "set:TL image:A"))
+        self.assertEqual(self.migrate(cegui.migration3To4, "EWSizingCursorImage", "set:TL image:A", "TaharezLook/FrameWindow"), ("EWSizingCursorImage", "TL/A"))
+        # explicit rules don't guess
+        self.assertEqual(self.migrate(cegui.migration3To4, "BackgroundImage", "set:TL image:A", "TaharezLook/StaticImage"), ("BackgroundImage", "set:TL image:A"))
+        self.assertRaises(RuntimeError, self.migrate, cegui.migration3To4, "Image", "A", "TaharezLook/StaticImage")
+
+    def test_guessedImageProperties(self):
+        self.assertEqual(self.migrate(cegui.migration3To4, "BackgroundImage", "set:TL image:A", "Custom/Window"), ("BackgroundImage", "TL/A"))
+        self.assertEqual(self.migrate(cegui.migration3To4, "BackgroundImage", "A", "Custom/Window"), ("BackgroundImage", "A"))
+
+    def test_propertyDefinition(self):
+        propertyDefinition = ElementTree.Element("PropertyDefinition")
+        propertyDefinition.set("name", "ArrowImage")
+        propertyDefinition.set("initialValue", "set:TL image:Arrow")
+
+        cegui.migration3To4.migratePropertyDefinition(propertyDefinition)
+        self.assertEqual(propertyDefinition.get("initialValue"), "TL/Arrow")
+        cegui.migration4To3.migratePropertyDefinition(propertyDefinition)
+        self.assertEqual(propertyDefinition.get("initialValue"), "set:TL image:Arrow")
+
 class test_Layout3and4Layers(unittest.TestCase):
     def setUp(self):
         self.maxDiff = None
@@ -81,3 +121,58 @@ class test_Layout3and4Layers(unittest.TestCase):
 
     def test_vanillaWindows(self):
         self._test_conversion("VanillaWindows")
+
+@unittest.skipUnless(xmlbackend.isAvailable(xmlbackend.LXML), "lxml is not installed")
+class test_Layout3and4LayersLXML(test_Layout3and4Layers):
+    def setUp(self):
+        super(test_Layout3and4LayersLXML, self).setUp()
+
+        self.previousBackend = xmlbackend.backend
+        xmlbackend.select(xmlbackend.LXML)
+
+    def tearDown(self):
+        xmlbackend.select(self.previousBackend)
+
+        super(test_Layout3and4LayersLXML, self).tearDown()
+
+class test_LayoutStreaming(unittest.TestCase):
+    def setUp(self):
+        self.maxDiff = None
+
+        self.layer3to4 = cegui.Layout3To4Layer()
+        self.layer4to3 = cegui.Layout4To3Layer()
+
+    def _test_streamedConversion(self, layer, path):
+        data = file(os.path.join(os.path.dirname(__file__), "layout_data", path), "r").read()
+
+        target = io.BytesIO()
+        layer.transformStream(io.BytesIO(data), target)
+
+        self.assertMultiLineEqual(layer.transform(unicode(data, encoding = "utf-8")).encode("utf-8"), target.getvalue())
+
+    def _test_conversion(self, layout):
+        self._test_streamedConversion(self.layer3to4, "%s_0_7.layout" % (layout))
+        self._test_streamedConversion(self.layer4to3, "%s_1_0.layout" % (layout))
+
+    def test_tabPage1(self):
+        self._test_conversion("TabPage1")
+
+    def test_textDemo(self):
+        self._test_conversion("TextDemo")
+
+    def test_vanillaWindows(self):
+        self._test_conversion("VanillaWindows")
+
+@unittest.skipUnless(xmlbackend.isAvailable(xmlbackend.LXML), "lxml is not installed")
+class test_LayoutStreamingLXML(test_LayoutStreaming):
+    def setUp(self):
+        super(test_LayoutStreamingLXML, self).setUp()
+
+        self.previousBackend = xmlbackend.backend
+        xmlbackend.select(xmlbackend.LXML)
+
+    def tearDown(self):
+        xmlbackend.select(self.previousBackend)
+
+        super(test_LayoutStreamingLXML, self).tearDown()
+
@@ -0,0 +1,302 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+import unittest
+
+from ceed.compatibility import resources
+from ceed.benchmark import compatibility as benchmark_compatibility
+
+import os
+import shutil
+import tempfile
+
+# Font version 3 (CEGUI 0.8), the native version has a Fonts root element instead
+FONT_TEMPLATE = """<?xml version="1.0" ?>
+<Font version="3" name="%s" filename="DejaVuSans.ttf" type="FreeType" size="10" nativeHorzRes="1280" nativeVertRes="720" autoScaled="vertical"/>
+"""
+
+class test_PrepareResources(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        self.files = {}
+        for kind, fileName, data in [(resources.SCHEME, "Generated.scheme", benchmark_compatibility.generateScheme(10)),
+                                     (resources.IMAGESET, "Generated.imageset", benchmark_compatibility.generateImageset(50)),
+                                     (resources.LOOKNFEEL, "Generated.looknfeel", benchmark_compatibility.generateLookNFeel(3))]:
+            path = os.path.join(self.directory, fileName)
+            with open(path, "w") as f:
+                f.write(data)
+
+            self.files[path] = kind
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def prepare(self, jobs):
+        return dict((preparedResource.path, preparedResource) for preparedResource in resources.prepareResources([(kind, path) for path, kind in self.files.iteritems()], "0.8", jobs))
+
+    def test_serial(self):
+        prepared = self.prepare(1)
+
+        self.assertEqual(sorted(prepared.keys()), sorted(self.files.keys()))
+        for path, preparedResource in prepared.iteritems():
+            self.assertFalse(preparedResource.hasError())
+            self.assertEqual(preparedResource.kind, self.files[path])
+
+    def test_parallel(self):
+        serial = self.prepare(1)
+        parallel = self.prepare(2)
+
+        for path in serial:
+            self.assertEqual(serial[path].nativeData, parallel[path].nativeData)
+
+    def test_unknownType(self):
+        path = os.path.join(self.directory, "Broken.imageset")
+        with open(path, "w") as f:
+            f.write("<NotAnImageset />")
+
+        preparedResource = resources.prepareResource(resources.IMAGESET, path, "0.8")
+        self.assertTrue(preparedResource.hasError())
+        self.assertIsNone(preparedResource.nativeData)
+
+    def test_getSchemeReferences(self):
+        path = os.path.join(self.directory, "Generated.scheme")
+        nativeData = resources.prepareResource(resources.SCHEME, path, "0.8").nativeData
+
+        self.assertEqual(resources.getSchemeReferences(nativeData), [
+            (resources.IMAGESET, "Generated.imageset", "imagesets"),
+            (resources.FONT, "DejaVuSans-10.font", "fonts"),
+            (resources.LOOKNFEEL, "Generated.looknfeel", "looknfeels")
+        ])
+
+class test_ResourceManifest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.manifest = resources.ResourceManifest({"schemes": self.directory}, "0.8")
+
+        self.schemePath = self.write("Generated.scheme", benchmark_compatibility.generateScheme(10))
+        # generated looknfeels take their images from TaharezLook
+        self.imagesetPath = self.write("Generated.imageset", benchmark_compatibility.generateImageset(10).replace('Name="Generated"', 'Name="TaharezLook"'))
+        self.looknfeelPath = self.write("Generated.looknfeel", benchmark_compatibility.generateLookNFeel(3))
+        self.otherImagesetPath = self.write("Other.imageset", benchmark_compatibility.generateImageset(10).replace('Name="Generated"', 'Name="Other"'))
+
+        for kind, path in [(resources.SCHEME, self.schemePath), (resources.IMAGESET, self.imagesetPath),
+                           (resources.LOOKNFEEL, self.looknfeelPath), (resources.IMAGESET, self.otherImagesetPath)]:
+            self.manifest.addResource(resources.prepareResource(kind, path, "0.8"))
+
+        self.manifest.setSchemeReferences(self.schemePath, [self.imagesetPath, self.looknfeelPath, self.otherImagesetPath])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, fileName, data):
+        path = os.path.join(self.directory, fileName)
+        with open(path, "w") as f:
+            f.write(data)
+
+        return path
+
+    def test_describeNativeData(self):
+        self.assertEqual(self.manifest.entries[self.imagesetPath].names, ["TaharezLook"])
+        self.assertEqual(self.manifest.entries[self.schemePath].names, ["Generated"])
+        self.assertEqual(len(self.manifest.entries[self.looknfeelPath].names), 3)
+        self.assertEqual(self.manifest.entries[self.looknfeelPath].imagesets, ["TaharezLook"])
+
+    def test_getChangedPaths(self):
+        self.assertEqual(self.manifest.getChangedPaths(), [])
+
+        # touching without changing the content doesn't count
+        os.utime(self.imagesetPath, (0, 0))
+        self.assertEqual(self.manifest.getChangedPaths(), [])
+
+        with open(self.imagesetPath, "a") as f:
+            f.write("\n")
+        os.remove(self.looknfeelPath)
+
+        self.assertEqual(self.manifest.getChangedPaths(), sorted([self.imagesetPath, self.looknfeelPath]))
+
+    def test_planImagesetChange(self):
+        plan = self.manifest.planResync([self.imagesetPath])
+
+        self.assertEqual(plan.schemes, [])
+        self.assertEqual(plan.imagesets, [self.imagesetPath])
+        # the looknfeel takes images from the changed imageset
+        self.assertEqual(plan.looknfeels, [self.looknfeelPath])
+
+        plan = self.manifest.planResync([self.otherImagesetPath])
+        self.assertEqual(plan.imagesets, [self.otherImagesetPath])
+        self.assertEqual(plan.looknfeels, [])
+
+    def test_planSchemeChange(self):
+        plan = self.manifest.planResync([self.schemePath, self.imagesetPath])
+
+        self.assertEqual(plan.schemes, [self.schemePath])
+        # recreated along with the scheme
+        self.assertEqual(plan.imagesets, [])
+        self.assertEqual(plan.looknfeels, [])
+
+    def test_planSharedResourcesOfChangedScheme(self):
+        fontPath = self.write("Generated.font", FONT_TEMPLATE % ("DejaVuSans-10"))
+        self.manifest.addResource(resources.prepareResource(resources.FONT, fontPath, "0.8"))
+        self.manifest.setSchemeReferences(self.schemePath, [self.imagesetPath, self.looknfeelPath, self.otherImagesetPath, fontPath])
+
+        otherSchemePath = self.write("Other.scheme", benchmark_compatibility.generateScheme(10).replace('<GUIScheme Name="Generated"', '<GUIScheme Name="Other"'))
+        self.manifest.addResource(resources.prepareResource(resources.SCHEME, otherSchemePath, "0.8"))
+        self.manifest.setSchemeReferences(otherSchemePath, [self.otherImagesetPath, fontPath])
+
+        plan = self.manifest.planResync([self.schemePath])
+
+        self.assertEqual(plan.schemes, [self.schemePath])
+        # destroying the changed scheme unloads these, the other scheme still needs them
+        self.assertEqual(plan.imagesets, [self.otherImagesetPath])
+        self.assertEqual(plan.fonts, [fontPath])
+        self.assertEqual(plan.looknfeels, [])
+
+    def test_recreateChangedFont(self):
+        fontPath = self.write("Generated.font", FONT_TEMPLATE % ("DejaVuSans-10"))
+        self.manifest.addResource(resources.prepareResource(resources.FONT, fontPath, "0.8"))
+
+        # the font gets renamed, the old one has to go and the new one has to be created
+        self.write("Generated.font", FONT_TEMPLATE % ("DejaVuSans-12"))
+        plan = self.manifest.planResync(self.manifest.getChangedPaths())
+        self.assertEqual(plan.fonts, [fontPath])
+
+        destroyed = []
+        created = []
+        registry = resources.ResourceRegistry()
+        self.manifest.recreateResource(resources.prepareResource(resources.FONT, fontPath, "0.8"), registry, destroyed.append, created.append)
+
+        self.assertEqual(destroyed, ["DejaVuSans-10"])
+        self.assertEqual(len(created), 1)
+        self.assertEqual(registry.names, {(resources.FONT, "DejaVuSans-12"): resources.normalisePath(fontPath)})
+        self.assertEqual(self.manifest.entries[fontPath].names, ["DejaVuSans-12"])
+
+    def test_getWidgetLookSourceHash(self):
+        widgetLook = self.manifest.entries[self.looknfeelPath].names[0]
+        sourceHash = self.manifest.getWidgetLookSourceHash(widgetLook)
+
+        self.assertIsNotNone(sourceHash)
+        self.assertIsNone(self.manifest.getWidgetLookSourceHash("Unknown/Look"))
+
+        # unrelated imagesets don't matter, the one the looknfeel takes images from does
+        self.manifest.addResource(resources.prepareResource(resources.IMAGESET, self.write("Other.imageset", benchmark_compatibility.generateImageset(20).replace('Name="Generated"', 'Name="Other"')), "0.8"))
+        self.assertEqual(self.manifest.getWidgetLookSourceHash(widgetLook), sourceHash)
+
+        self.manifest.addResource(resources.prepareResource(resources.IMAGESET, self.write("Generated.imageset", benchmark_compatibility.generateImageset(20).replace('Name="Generated"', 'Name="TaharezLook"')), "0.8"))
+        self.assertNotEqual(self.manifest.getWidgetLookSourceHash(widgetLook), sourceHash)
+
+    def test_isCompatibleWith(self):
+        self.assertTrue(self.manifest.isCompatibleWith({"schemes": self.directory}, "0.8", [self.schemePath]))
+        self.assertFalse(self.manifest.isCompatibleWith({"schemes": self.directory}, "0.7", [self.schemePath]))
+        self.assertFalse(self.manifest.isCompatibleWith({"schemes": self.directory}, "0.8", [self.schemePath, self.imagesetPath]))
+
+class test_ResourceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.registry = resources.ResourceRegistry()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_samePathIsLoadedOnce(self):
+        path = os.path.join(self.directory, "a.imageset")
+
+        self.assertTrue(self.registry.register(resources.IMAGESET, path, ["A"]))
+        self.assertTrue(self.registry.isRegistered(os.path.join(self.directory, "subdirectory", "..", "a.imageset")))
+        self.assertFalse(self.registry.register(resources.IMAGESET, os.path.join(self.directory, ".", "a.imageset"), ["A"]))
+        self.assertEqual(self.registry.conflicts, [])
+
+    def test_conflicts(self):
+        self.assertTrue(self.registry.register(resources.IMAGESET, os.path.join(self.directory, "a.imageset"), ["A"]))
+        # different kinds don't conflict
+        self.assertTrue(self.registry.register(resources.FONT, os.path.join(self.directory, "a.font"), ["A"]))
+
+        self.assertFalse(self.registry.register(resources.IMAGESET, os.path.join(self.directory, "b.imageset"), ["A"]))
+        # the conflict is reported only once
+        self.assertFalse(self.registry.register(resources.IMAGESET, os.path.join(self.directory, "b.imageset"), ["A"]))
+
+        self.assertEqual(len(self.registry.conflicts), 1)
+        conflict = self.registry.conflicts[0]
+        self.assertEqual((conflict.kind, conflict.name), (resources.IMAGESET, "A"))
+        self.assertEqual(conflict.loadedPath, resources.normalisePath(os.path.join(self.directory, "a.imageset")))
+
+    def test_fonts(self):
+        paths = []
+        for name in ["DejaVuSans-10", "DejaVuSans-12"]:
+            path = os.path.join(self.directory, name + ".font")
+            with open(path, "w") as f:
+                f.write(FONT_TEMPLATE % (name))
+
+            paths.append(path)
+
+        preparedResources = [resources.prepareResource(resources.FONT, path, "0.8") for path in paths]
+        self.assertEqual([preparedResource.names for preparedResource in preparedResources], [["DejaVuSans-10"], ["DejaVuSans-12"]])
+
+        for preparedResource in preparedResources:
+            self.assertTrue(self.registry.register(resources.FONT, preparedResource.path, preparedResource.names))
+
+        self.assertEqual(self.registry.conflicts, [])
+
+class test_SchemeIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = resources.SchemeIndex()
+
+        self.index.addScheme(resources.indexScheme("/schemes/TaharezLook.scheme", """<GUIScheme name="TaharezLook" version="5">
+    <Imageset name="TaharezLook" filename="TaharezLook.imageset" />
+    <Font name="DejaVuSans-10" filename="DejaVuSans-10.font" />
+    <FalagardMapping windowType="TaharezLook/Button" targetType="CEGUI/PushButton" renderer="Core/Button" lookNFeel="TaharezLook/Button" />
+    <FalagardMapping windowType="TaharezLook/Label" targetType="DefaultWindow" renderer="Core/Default" lookNFeel="TaharezLook/Label" />
+    <WindowAlias alias="TaharezLook/PushButton" target="TaharezLook/Button" />
+</GUIScheme>"""))
+        self.index.addScheme(resources.indexScheme("/schemes/Vanilla.scheme", """<GUIScheme name="Vanilla" version="5">
+    <Imageset name="Vanilla" filename="Vanilla.imageset" />
+    <Font name="DejaVuSans-12" filename="DejaVuSans-12.font" />
+    <FalagardMapping windowType="Vanilla/Button" targetType="CEGUI/PushButton" renderer="Core/Button" lookNFeel="Vanilla/Button" />
+</GUIScheme>"""))
+
+    def test_lookups(self):
+        self.assertEqual(self.index.getSchemeOfWindowType("TaharezLook/Button"), "/schemes/TaharezLook.scheme")
+        self.assertEqual(self.index.getSchemeOfWindowType("TaharezLook/PushButton"), "/schemes/TaharezLook.scheme")
+        self.assertEqual(self.index.getSchemeOfWindowType("DefaultWindow"), None)
+        self.assertEqual(self.index.getSchemeOfFont("DejaVuSans-12"), "/schemes/Vanilla.scheme")
+        self.assertEqual(self.index.getSchemeOfImage("Vanilla/Background"), "/schemes/Vanilla.scheme")
+        self.assertEqual(self.index.getSchemeOfImage("Vanilla"), None)
+
+    def test_skins(self):
+        self.assertEqual(self.index.getSkins(), ["TaharezLook", "Vanilla"])
+        self.assertEqual(self.index.getSchemesOfSkin("Vanilla"), ["/schemes/Vanilla.scheme"])
+        # aliases aren't widgets
+        self.assertEqual(self.index.getWidgetsBySkin(), {"TaharezLook": ["Button", "Label"], "Vanilla": ["Button"]})
+
+    def test_getSchemesReferencedBy(self):
+        self.assertEqual(self.index.getSchemesReferencedBy("""<GUILayout version="4">
+    <Window type="DefaultWindow" name="Root">
+        <Property name="Font" value="DejaVuSans-10" />
+        <Window type="TaharezLook/Label" name="Label" />
+    </Window>
+</GUILayout>"""), ["/schemes/TaharezLook.scheme"])
+
+        self.assertEqual(self.index.getSchemesReferencedBy("""<GUILayout version="4">
+    <Window type="DefaultWindow" name="Root">
+        <Property name="Image">Vanilla/Background</Property>
+    </Window>
+</GUILayout>"""), ["/schemes/Vanilla.scheme"])
+
+        self.assertEqual(self.index.getSchemesReferencedBy("""<GUILayout version="4"><Window type="DefaultWindow" name="Root" /></GUILayout>"""), [])
@@ -0,0 +1,83 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+import unittest
+
+from ceed.compatibility import verification
+from ceed.compatibility.layout import cegui
+
+import os
+import shutil
+import tempfile
+
+class test_diffXML(unittest.TestCase):
+    def test_equivalent(self):
+        self.assertEqual(verification.diffXML('<A b="1" c="2"><D>  x  y </D></A>', '<A c="2" b="1">\n    <D>x y</D>\n</A>'), [])
+
+    def test_differences(self):
+        differences = verification.diffXML('<A b="1"><D /><D e="1" /></A>', '<A b="2"><D /><D /><F /></A>')
+
+        self.assertEqual(differences, [
+            "/A: attribute 'b' changed from '1' to '2'",
+            "/A/D[2]: attribute 'e' (value '1') is missing",
+            "/A: child element 'F' was added"
+        ])
+
+class test_verifyFiles(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        dataDirectory = os.path.join(os.path.dirname(__file__), "layout_data")
+        shutil.copy(os.path.join(dataDirectory, "TextDemo_0_7.layout"), self.directory)
+
+        with open(os.path.join(self.directory, "Lossy.layout"), "w") as f:
+            f.write('<GUILayout><Window Type="DefaultWindow" Name="Root"><LayoutImport Filename="a.layout" Prefix="x" /></Window></GUILayout>')
+
+        with open(os.path.join(self.directory, "Broken.layout"), "w") as f:
+            f.write('<GUILayout><Window')
+
+        # not a layout, should be ignored
+        with open(os.path.join(self.directory, "readme.txt"), "w") as f:
+            f.write("readme")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def verify(self, jobs):
+        reports = verification.verifyFiles("layout", [self.directory], cegui.CEGUILayout3, cegui.CEGUILayout4, jobs)
+        return dict((os.path.basename(report.path), report) for report in reports)
+
+    def test_serial(self):
+        reports = self.verify(1)
+
+        self.assertEqual(sorted(reports.keys()), ["Broken.layout", "Lossy.layout", "TextDemo_0_7.layout"])
+        self.assertEqual(reports["TextDemo_0_7.layout"].status, verification.FileReport.OK)
+        self.assertEqual(reports["Lossy.layout"].status, verification.FileReport.DIFFERENT)
+        self.assertEqual(len(reports["Lossy.layout"].differences), 1)
+        self.assertEqual(reports["Broken.layout"].status, verification.FileReport.ERROR)
+
+    def test_parallel(self):
+        serial = self.verify(1)
+        parallel = self.verify(2)
+
+        self.assertEqual(sorted(serial.keys()), sorted(parallel.keys()))
+        for name in serial:
+            self.assertEqual(serial[name].status, parallel[name].status)
+            self.assertEqual(serial[name].differences, parallel[name].differences)
@@ -0,0 +1,66 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+import unittest
+
+from ceed import frametiming
+
+import io
+
+class test_FrameTimingRecorder(unittest.TestCase):
+    def setUp(self):
+        self.recorder = frametiming.FrameTimingRecorder(maximumFrames = 100)
+
+        for i in xrange(1, 101):
+            self.recorder.beginFrame()
+            self.recorder.addPhaseTime(frametiming.CEGUI_RENDERING, i * 0.0001)
+            self.recorder.endFrame(i * 0.0002)
+
+    def test_phases(self):
+        self.assertAlmostEqual(self.recorder.frames[9][frametiming.QT_PAINTING], 0.001)
+        # phase times outside of frames are ignored
+        self.recorder.addPhaseTime(frametiming.FBO_BLIT, 1)
+        self.assertEqual(len(self.recorder.frames), 100)
+
+    def test_percentiles(self):
+        self.assertEqual(self.recorder.getPercentiles(frametiming.TOTAL, (50, 95, 99, 100)), [0.01, 0.019, 0.0198, 0.02])
+
+        self.recorder.beginFrame()
+        self.recorder.endFrame(1)
+        # the oldest frame was dropped
+        self.assertEqual(min(self.recorder.getDurations(frametiming.TOTAL)), 0.0004)
+
+        self.recorder.reset()
+        self.assertIsNone(self.recorder.getPercentiles(frametiming.TOTAL))
+
+    def test_histogram(self):
+        histogram = self.recorder.getHistogram(frametiming.TOTAL)
+
+        self.assertEqual(sum(count for _, count in histogram), 100)
+        self.assertEqual(histogram[0], (0.001, 4))
+        self.assertEqual(histogram[-1], (None, 0))
+
+    def test_export(self):
+        output = io.BytesIO()
+        self.recorder.export(output)
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 101)
+        self.assertEqual(lines[0], "Frame," + ",".join(frametiming.PHASES))
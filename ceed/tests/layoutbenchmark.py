@@ -0,0 +1,76 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+import sys
+import unittest
+
+from ceed.benchmark import layout
+from ceed.benchmark import fakecegui
+
+class test_LayoutBenchmark(unittest.TestCase):
+    def tearDown(self):
+        # in case a test left the fake installed, later tests must not import it
+        fakecegui.uninstall()
+
+    def test_generatedTree(self):
+        root = layout.generateWidgetTree(depth = 3, fanOut = 4)
+        windows = layout.getAllWindows(root)
+
+        # scrollable panes have an auto window
+        self.assertEqual(len([window for window in windows if not window.isAutoWindow()]), 1 + 4 + 16)
+
+        for window in windows[1:]:
+            self.assertIs(root.getChild(window.getNamePath().split("/", 1)[1]), window)
+
+    def test_layoutRoundTrip(self):
+        windowManager = fakecegui.WindowManager.getSingleton()
+
+        code = layout.generateLayout(depth = 3, fanOut = 3)
+        root = windowManager.loadLayoutFromString(code)
+
+        self.assertEqual(windowManager.getLayoutAsString(root), code)
+        self.assertEqual(root.getChild("Widget1").getProperty("Area"), "{{0,2},{0.1,2},{0.333333,-2},{0.9,-2}}")
+
+    def test_geometry(self):
+        root = layout.generateWidgetTree(depth = 2, fanOut = 2)
+        rect = root.getChildAtIdx(1).getUnclippedOuterRect().get()
+
+        # the root is 4 pixels narrower than the display, the child takes the right half of it
+        self.assertAlmostEqual(rect.getPosition().d_x, 2 + 796 * 0.5 + 2)
+        self.assertAlmostEqual(rect.getSize().d_height, (480 - 4) * 0.8 - 4)
+
+    def test_headlessOperations(self):
+        report = layout.Suite(depth = 2, fanOut = 3, repeat = 1).run()
+        results = dict((result["name"], result) for result in report.results)
+
+        # these don't need PySide nor CEGUI, they have to work anywhere
+        for name in ["getChildByPath", "topMostPaths", "spatialIndexBuild", "spatialIndexQuery", "spatialIndexSnap", "codeDiff"]:
+            self.assertNotIn("error", results[name], name)
+
+        self.assertIsNot(sys.modules.get("PyCEGUI"), fakecegui)
+
+    def test_uninstall(self):
+        previous = sys.modules.get("PyCEGUI")
+
+        self.assertIs(fakecegui.install(), fakecegui)
+        self.assertIs(sys.modules["PyCEGUI"], fakecegui)
+
+        fakecegui.uninstall()
+        self.assertIs(sys.modules.get("PyCEGUI"), previous)
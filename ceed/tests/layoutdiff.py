@@ -0,0 +1,97 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+import unittest
+
+from ceed import layoutdiff
+
+LAYOUT = """<?xml version="1.0" ?>
+<GUILayout version="4">
+    <Window type="TaharezLook/FrameWindow" name="Root">
+        <Property name="Text" value="Root" />
+        <Property name="Alpha" value="0.5" />
+        <AutoWindow namePath="__auto_titlebar__">
+            <Property name="Text" value="Title" />
+        </AutoWindow>
+        <Window type="TaharezLook/Button" name="First">
+            <Property name="Text" value="First" />
+        </Window>
+        <Window type="TaharezLook/Button" name="Second" />
+    </Window>
+</GUILayout>
+"""
+
+class test_diffLayouts(unittest.TestCase):
+    def diff(self, old, new):
+        return layoutdiff.diffLayouts(LAYOUT, LAYOUT.replace(old, new, 1))
+
+    def test_unchanged(self):
+        self.assertEqual(len(layoutdiff.diffLayouts(LAYOUT, LAYOUT)), 0)
+
+    def test_propertyChanges(self):
+        diff = self.diff('<Property name="Text" value="First" />', '<Property name="Text" value="Changed" />')
+        self.assertEqual(diff.propertyChanges, [("Root/First", "Text", "Changed")])
+
+        diff = self.diff('<Window type="TaharezLook/Button" name="Second" />',
+                         '<Window type="TaharezLook/Button" name="Second"><Property name="Alpha">0.2</Property></Window>')
+        self.assertEqual(diff.propertyChanges, [("Root/Second", "Alpha", "0.2")])
+
+        # removed properties revert to their defaults
+        diff = self.diff('<Property name="Alpha" value="0.5" />', '')
+        self.assertEqual(diff.propertyChanges, [("Root", "Alpha", None)])
+        self.assertEqual(diff.removedWidgets, [])
+        self.assertEqual(diff.addedWidgets, [])
+
+    def test_autoWindows(self):
+        diff = self.diff('<Property name="Text" value="Title" />', '<Property name="Text" value="Changed" />')
+        self.assertEqual(diff.propertyChanges, [("Root/__auto_titlebar__", "Text", "Changed")])
+
+        # auto windows can't be added or removed
+        self.assertIsNone(self.diff('namePath="__auto_titlebar__"', 'namePath="__auto_closebutton__"'))
+
+    def test_children(self):
+        diff = self.diff('<Window type="TaharezLook/Button" name="Second" />', '')
+        self.assertEqual(diff.removedWidgets, ["Root/Second"])
+
+        diff = self.diff('<Window type="TaharezLook/Button" name="Second" />',
+                         '<Window type="TaharezLook/Button" name="Second" /><Window type="TaharezLook/Label" name="Third" />')
+        self.assertEqual([(parentPath, name) for parentPath, name, _ in diff.addedWidgets], [("Root", "Third")])
+        self.assertIn('<Window name="Third" type="TaharezLook/Label" />', diff.addedWidgets[0][2])
+        self.assertTrue(diff.addedWidgets[0][2].startswith("<GUILayout"))
+
+    def test_insertedOrReordered(self):
+        # CEGUI can only append children
+        self.assertIsNone(self.diff('<Window type="TaharezLook/Button" name="First">',
+                                    '<Window type="TaharezLook/Label" name="Inserted" /><Window type="TaharezLook/Button" name="First">'))
+
+        reordered = LAYOUT.replace('<Window type="TaharezLook/Button" name="Second" />', '', 1).replace(
+            '<Window type="TaharezLook/Button" name="First">', '<Window type="TaharezLook/Button" name="Second" /><Window type="TaharezLook/Button" name="First">', 1)
+        self.assertIsNone(layoutdiff.diffLayouts(LAYOUT, reordered))
+
+    def test_notIncremental(self):
+        # renaming or changing the type of a widget needs a reload
+        self.assertIsNone(self.diff('name="Root"', 'name="Renamed"'))
+        self.assertIsNone(self.diff('type="TaharezLook/Button" name="Second"', 'type="TaharezLook/Label" name="Second"'))
+        # so do events and anything else that isn't a property or a widget
+        self.assertIsNone(self.diff('<Property name="Alpha" value="0.5" />', '<Event name="Clicked" function="onClicked" />'))
+
+    def test_unparsable(self):
+        self.assertIsNone(layoutdiff.diffLayouts(LAYOUT, LAYOUT.replace("</GUILayout>", "")))
+        self.assertIsNone(layoutdiff.diffLayouts(LAYOUT, "<Imageset />"))
@@ -0,0 +1,57 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+import unittest
+
+from ceed import spatialindex
+
+class test_SpatialIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = spatialindex.SpatialIndex(cellSize = 10)
+
+        # a row of 20x20 items with 10 pixel gaps
+        for i in xrange(100):
+            self.index.update(i, (i * 30, 0, i * 30 + 20, 20))
+
+    def test_query(self):
+        self.assertEqual(self.index.query((25, 5, 65, 10)), set([1, 2]))
+        # touching isn't intersecting
+        self.assertEqual(self.index.query((20, 0, 30, 20)), set())
+        self.assertEqual(self.index.query((-1000, -1000, 10000, 10000)), set(xrange(100)))
+
+    def test_update(self):
+        self.index.update(1, (35, 100, 45, 110))
+        self.assertEqual(self.index.query((25, 5, 65, 10)), set([2]))
+        self.assertEqual(self.index.query((0, 90, 100, 200)), set([1]))
+
+        self.index.remove(1)
+        self.index.remove(1)
+        self.assertEqual(len(self.index), 99)
+        self.assertNotIn(1, self.index)
+        self.assertEqual(self.index.query((0, 90, 100, 200)), set())
+
+    def test_edges(self):
+        self.assertEqual(self.index.findNearestVerticalEdge(48, 3), 50)
+        self.assertEqual(self.index.findNearestVerticalEdge(48, 3, exclude = 1), None)
+        self.assertEqual(self.index.findNearestVerticalEdge(45, 1), None)
+        self.assertEqual(self.index.findNearestHorizontalEdge(19, 2), 20)
+
+        self.index.update(1, (100, 100, 101, 101))
+        self.assertEqual(self.index.findNearestVerticalEdge(48, 3), None)
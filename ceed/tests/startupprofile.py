@@ -0,0 +1,91 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+import unittest
+
+from ceed import startupprofile
+
+import sys
+import io
+
+class test_StartupProfile(unittest.TestCase):
+    def tearDown(self):
+        startupprofile.finish(io.BytesIO())
+
+    def test_isRequested(self):
+        self.assertTrue(startupprofile.isRequested(["ceed-gui", "--profile-startup"], {}))
+        self.assertTrue(startupprofile.isRequested(["ceed-gui"], {startupprofile.ENVIRONMENT_VARIABLE: "1"}))
+        self.assertFalse(startupprofile.isRequested(["ceed-gui"], {startupprofile.ENVIRONMENT_VARIABLE: "0"}))
+
+    def test_phases(self):
+        # phases are no-ops when not profiling
+        with startupprofile.phase("Ignored"):
+            pass
+
+        profile = startupprofile.start()
+        with startupprofile.phase("Outer"):
+            with startupprofile.phase("Inner"):
+                pass
+
+        self.assertEqual([(name, depth) for name, depth, _ in profile.phases], [("Outer", 0), ("Inner", 1)])
+
+    def test_imports(self):
+        profile = startupprofile.start()
+
+        sys.modules.pop("colorsys", None)
+        import colorsys
+
+        self.assertIn("colorsys", profile.imports)
+
+        output = io.BytesIO()
+        startupprofile.finish(output)
+        self.assertIn("colorsys", output.getvalue())
+        self.assertIsNone(startupprofile.profile)
+
+    def test_importFromPackage(self):
+        import json
+        sys.modules.pop("json.tool", None)
+        if hasattr(json, "tool"):
+            del json.tool
+
+        profile = startupprofile.start()
+
+        # the package is loaded already, the submodule is what gets imported
+        from json import tool
+
+        self.assertIn("json.tool", profile.imports)
+        self.assertNotIn("json", profile.imports)
+
+        # attributes of loaded modules aren't imports
+        from json import dumps
+        self.assertNotIn("json.dumps", profile.imports)
+
+    def test_finishAfterPhase(self):
+        startupprofile.start()
+
+        output = io.BytesIO()
+        startupprofile.finishAfterPhase("Late", output)
+        self.assertIsNotNone(startupprofile.profile)
+
+        with startupprofile.phase("Late"):
+            pass
+
+        self.assertIsNone(startupprofile.profile)
+        self.assertIn("Late", output.getvalue())
@@ -0,0 +1,37 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+import unittest
+
+from ceed import widgetpaths
+
+class test_getTopMostPaths(unittest.TestCase):
+    def test_ancestorsSelected(self):
+        paths = ["Root/Frame/Button", "Root/Other", "Root/Frame", "Root/Frame/Pane/Label", "Root/Other"]
+
+        self.assertEqual(widgetpaths.getTopMostPaths(paths), ["Root/Other", "Root/Frame"])
+        self.assertEqual(widgetpaths.getTopMostPaths(paths + ["Root"]), ["Root"])
+
+    def test_similarNames(self):
+        # a name prefix isn't an ancestor
+        paths = ["Root/Frame2/Button", "Root/Frame", "Root/Frame2"]
+
+        self.assertEqual(widgetpaths.getTopMostPaths(paths), ["Root/Frame", "Root/Frame2"])
+        self.assertEqual(widgetpaths.getTopMostPaths([]), [])
@@ -0,0 +1,54 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+"""Helpers working with CEGUI widget name paths ("Root/Frame/Button").
+
+Paths are plain strings, this doesn't depend on CEGUI or Qt.
+"""
+
+def getTopMostPaths(widgetPaths):
+    """Returns given widget paths without those that have an ancestor among them,
+    in the original order and without duplicates.
+
+    Each path is only checked against the set of all the paths, the time is linear in the number
+    of paths (times their depth) rather than quadratic as with comparing each pair.
+    """
+
+    pathSet = set(widgetPaths)
+
+    ret = []
+    seen = set()
+    for widgetPath in widgetPaths:
+        if widgetPath in seen:
+            continue
+        seen.add(widgetPath)
+
+        # go through all the ancestor paths, from the parent up
+        separator = widgetPath.rfind("/")
+        while separator != -1:
+            if widgetPath[:separator] in pathSet:
+                break
+
+            separator = widgetPath.rfind("/", 0, separator)
+
+        else:
+            ret.append(widgetPath)
+
+    return ret
@@ -0,0 +1,192 @@
+##############################################################################
+#   CEED - Unified CEGUI asset editor
+#
+#   Copyright (C) 2011-2012   Martin Preisler <martin@preisler.me>
+#                             and contributing authors (see AUTHORS file)
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+"""Pluggable XML implementation used to parse and serialise data files.
+
+lxml is used when it's installed because it parses and pretty prints in C,
+cElementTree is the fallback. Call select to switch the backend, everything
+going through this module follows the switch.
+
+Both backends produce byte-identical output for the data files of CEGUI. Known
+exceptions:
+ - tabs and carriage returns in attribute values and text, lxml writes them as
+   character references. These can only appear if they were character
+   references in the source data as well.
+ - namespace prefixes, lxml keeps the prefixes of the source data while
+   cElementTree only knows a few well-known ones (xsi, xml, ...) and writes
+   ns0, ns1, ... for the others. It also declares all namespaces on the root
+   element. CEGUI formats don't use namespaces apart from xsi.
+"""
+
+# NOTE: This has to stay importable without PySide, compatibility layers
+#       and the command line migration tool depend on it!
+
+from xml.etree import cElementTree
+
+try:
+    from lxml import etree as lxmlEtree
+
+except ImportError:
+    lxmlEtree = None
+
+from io import BytesIO
+
+LXML = "lxml"
+CELEMENTTREE = "cElementTree"
+
+# name of the selected backend, use select to change it
+backend = None
+# ElementTree compatible module of the selected backend
+ElementTree = None
+
+def isAvailable(name):
+    """Checks whether backend of given name can be selected"""
+
+    if name == LXML:
+        return lxmlEtree is not None
+
+    return name == CELEMENTTREE
+
+def select(name = None):
+    """Selects the backend, passing None picks lxml if it is available
+    and falls back to cElementTree otherwise.
+    """
+
+    global backend
+    global ElementTree
+
+    if name is None:
+        name = LXML if isAvailable(LXML) else CELEMENTTREE
+
+    if name == LXML:
+        if lxmlEtree is None:
+            raise RuntimeError("Can't select the lxml XML backend, lxml is not installed")
+
+        ElementTree = lxmlEtree
+
+    elif name == CELEMENTTREE:
+        ElementTree = cElementTree
+
+    else:
+        raise ValueError("Unknown XML backend '%s'" % (name))
+
+    backend = name
+
+def _lxmlParser():
+    # ElementTree drops comments and processing instructions when parsing,
+    # lxml has to do the same to keep the output identical
+    return lxmlEtree.XMLParser(remove_comments = True, remove_pis = True, huge_tree = True)
+
+def Element(tag, attrib = {}, **extra):
+    return ElementTree.Element(tag, attrib, **extra)
+
+def SubElement(parent, tag, attrib = {}, **extra):
+    return ElementTree.SubElement(parent, tag, attrib, **extra)
+
+def fromstring(data):
+    """Parses given XML data and returns the root element"""
+
+    if isinstance(data, unicode):
+        data = data.encode("utf-8")
+
+    if backend == LXML:
+        return lxmlEtree.fromstring(data, _lxmlParser())
+
+    return cElementTree.fromstring(data)
+
+def iterparse(source, events = ("end",)):
+    """Incrementally parses XML from file-like source, see ElementTree.iterparse"""
+
+    if backend == LXML:
+        return lxmlEtree.iterparse(source, events = events, remove_comments = True, remove_pis = True, huge_tree = True)
+
+    return cElementTree.iterparse(source, events = events)
+
+# taken from ElementLib and slightly tweaked for readability
+def _indentPython(elem, level = 0, tabImpostor = "    "):
+    i = "\n" + level * tabImpostor
+    if len(elem):
+        if not elem.text or not elem.text.strip():
+            elem.text = i + tabImpostor
+
+        last = None
+        for e in elem:
+            _indentPython(e, level + 1, tabImpostor)
+            if not e.tail or not e.tail.strip():
+                e.tail = i + tabImpostor
+
+            last = e
+
+        if not last.tail or not last.tail.strip():
+            last.tail = i
+    else:
+        if level and (not elem.tail or not elem.tail.strip()):
+            elem.tail = i
+
+def indent(elem, level = 0, tabImpostor = "    "):
+    """Replaces whitespace-only text and tails of given element and its
+    descendants with newlines and indentation.
+
+    Works with elements of both backends, lxml elements are indented in C
+    whenever lxml supports it (it has to be at least 4.5).
+    """
+
+    if lxmlEtree is not None and level == 0 and isinstance(elem, lxmlEtree._Element) and hasattr(lxmlEtree, "indent"):
+        # lxml only touches elements with children, same as we do
+        if len(elem):
+            lxmlEtree.indent(elem, space = tabImpostor)
+
+    else:
+        _indentPython(elem, level, tabImpostor)
+
+def _sortAttributes(rootElement):
+    # ElementTree writes attributes sorted by name, lxml keeps document order
+    for element in rootElement.iter():
+        if len(element.attrib) < 2:
+            continue
+
+        items = element.items()
+        sortedItems = sorted(items)
+        if items != sortedItems:
+            element.attrib.clear()
+            for name, value in sortedItems:
+                element.set(name, value)
+
+def prettyPrint(rootElement):
+    """Takes a root element of either backend and returns a pretty printed
+    UTF-8 XML file with the XML declaration on top as string.
+    """
+
+    indent(rootElement)
+
+    if lxmlEtree is not None and isinstance(rootElement, lxmlEtree._Element):
+        _sortAttributes(rootElement)
+        ret = lxmlEtree.tostring(rootElement, encoding = "utf-8", xml_declaration = True)
+
+        # ElementTree puts a space before the closing slash of empty elements,
+        # "/>" can't appear anywhere else because '>' is escaped in text and attributes
+        return ret.replace("/>", " />")
+
+    tempFile = BytesIO()
+    elementTree = cElementTree.ElementTree(rootElement)
+    elementTree.write(tempFile, encoding = "utf-8", xml_declaration = True)
+    return tempFile.getvalue()
+
+select()
@@ -21,26 +21,10 @@
 from PySide import QtGui
 from PySide import QtCore
 
-# taken from ElementLib and slightly tweaked for readability
-def indent(elem, level = 0, tabImpostor = "    "):
-    i = "\n" + level * tabImpostor
-    if len(elem):
-        if not elem.text or not elem.text.strip():
-            elem.text = i + tabImpostor
-
-        last = None
-        for e in elem:
-            indent(e, level + 1)
-            if not e.tail or not e.tail.strip():
-                e.tail = i + tabImpostor
-
-            last = e
-
-        if not last.tail or not last.tail.strip():
-            last.tail = i
-    else:
-        if level and (not elem.tail or not elem.tail.strip()):
-            elem.tail = i
+from ceed import xmlbackend
+
+# kept here because editors have always used it from here
+indent = xmlbackend.indent
 
 class XMLSyntaxHighlighter(QtGui.QSyntaxHighlighter):
     def __init__(self, parent = None):